@@ -1,7 +1,5 @@
-from flask import Flask, render_template, request, redirect, flash, send_file
-import pandas as pd
+from flask import Flask, render_template, request, redirect, flash, send_file, jsonify, url_for
 import os
-from datetime import datetime
 import sys
 import tempfile
 
@@ -10,16 +8,32 @@ from core.dashboard import obtener_datos_dashboard, obtener_habitaciones_ocupada
 from core.consumos import (
     obtener_resumen_habitacion, 
     agregar_consumo, 
-    eliminar_consumo_por_indice
+    eliminar_consumo_por_indice,
+    centavos_de
 )
 from core.reserva_express import crear_reserva_express, obtener_habitaciones_disponibles, validar_datos_reserva
+from core.datos import leer_csv, guardar_csv, agregar_registro, reiniciar_csv, bloqueo
+from core import reloj, perfil, metricas, estaticos, inventario, categorias, dinero
 
 app = Flask(__name__)
 app.secret_key = 'temporada_2026_recepcion_key_secreta'
+perfil.instalar(app)
+metricas.instalar(app)
+estaticos.instalar(app)
+# Montos en centavos (core/dinero.py): ${{ total|moneda }}
+app.add_template_filter(dinero.moneda, 'moneda')
 
-# Archivos de datos
-DB_PASAJEROS = 'data/pasajeros.csv'
-DB_CONSUMOS = 'data/consumos_diarios.csv'
+# Archivos de datos (en el directorio del alojamiento seleccionado, ver core/inventario.py)
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+
+# pandas se importa dentro de las rutas de análisis y reportes (cierres,
+# exportaciones, carga de rooming). Las rutas frecuentes (dashboard, fichas,
+# carga de consumos) no lo necesitan, así el arranque es rápido.
+
+def _bootstrap_css():
+    """URL de Bootstrap (local, con hash) para las páginas armadas en el código"""
+    return url_for('static', filename='vendor/bootstrap-5.3.0/css/bootstrap.min.css')
 
 def validar_pasajero(habitacion):
     """
@@ -29,13 +43,33 @@ def validar_pasajero(habitacion):
     if not os.path.exists(DB_PASAJEROS):
         return None
     
-    df_pasajeros = pd.read_csv(DB_PASAJEROS)
-    pasajero = df_pasajeros[df_pasajeros['Nro. habitación'] == int(habitacion)]
-    
-    if pasajero.empty:
-        return None
-    
-    return pasajero.iloc[0]['Apellido y nombre']
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_pasajeros=DB_PASAJEROS).pasajero_de(int(habitacion))
+
+@app.before_request
+def _seleccionar_alojamiento():
+    """Cada terminal trabaja con el alojamiento que eligió (por defecto, el primero)"""
+    from flask import g, session
+    g.token_alojamiento = inventario.usar(session.get('alojamiento'))
+
+@app.teardown_request
+def _liberar_alojamiento(error=None):
+    from flask import g
+    token = g.pop('token_alojamiento', None)
+    if token is not None:
+        inventario.restablecer(token)
+
+@app.route('/alojamiento/<int:codigo>')
+def elegir_alojamiento(codigo):
+    """Cambia el alojamiento con el que trabaja esta terminal"""
+    from flask import session
+    alojamiento = inventario.obtener(codigo)
+    if alojamiento is None:
+        flash(f'❌ El alojamiento {codigo} no está en el inventario', 'danger')
+    else:
+        session['alojamiento'] = alojamiento.codigo
+        flash(f'🏨 Trabajando con {alojamiento.nombre}', 'info')
+    return redirect('/dashboard')
 
 @app.route('/')
 def index():
@@ -44,20 +78,49 @@ def index():
 
 @app.route('/dashboard')
 def dashboard():
-    """Dashboard principal con las 53 habitaciones"""
+    """Dashboard principal con todas las habitaciones del alojamiento"""
+    from markupsafe import Markup
+
+    from core import fragmentos
+    from core.dashboard import datos_mosaico
+
     datos = obtener_datos_dashboard()
+    # Cada mosaico y el encabezado se renderizan solo si cambiaron sus datos
+    mosaicos = {
+        piso: Markup('\n'.join(fragmentos.renderizar_varios(
+            'fragmentos/habitacion.html', [datos_mosaico(num_hab, datos) for num_hab in habitaciones])))
+        for piso, habitaciones in datos['pisos'].items()
+    }
+    actual = inventario.actual()
+    encabezado = fragmentos.renderizar(
+        'fragmentos/estadisticas.html',
+        alojamiento=actual.nombre,
+        # Botones para pasar a los demás alojamientos (si hay más de uno)
+        otros=tuple((a.codigo, a.nombre) for a in inventario.alojamientos().values() if a is not actual),
+        **datos['estadisticas'])
     return render_template('dashboard.html', 
                          pisos=datos['pisos'],
-                         estados=datos['estados'],
-                         ocupadas=datos['ocupadas'],
-                         reservadas=datos['reservadas'],
-                         estadisticas=datos['estadisticas'],
-                         checkouts_hoy=datos['checkouts_hoy'])
+                         mosaicos=mosaicos,
+                         encabezado=encabezado)
+
+@app.route('/buscar')
+def buscar():
+    """Búsqueda de pasajeros por nombre, DNI o voucher (con resultados mientras se tipea)"""
+    from core.busqueda import buscar_pasajeros
+    from core.historial import contar_anteriores
+
+    consulta = request.args.get('q', '').strip()
+    resultados = contar_anteriores(buscar_pasajeros(consulta)) if consulta else []
+    if request.args.get('formato') == 'json':
+        return jsonify(resultados)
+    return render_template('buscar.html', consulta=consulta, resultados=resultados)
 
 @app.route('/habitacion/<int:num_habitacion>')
 def ficha_habitacion(num_habitacion):
     """Muestra la ficha individual de una habitación"""
-    from core.dashboard import es_checkout_hoy
+    from core import fragmentos
+    from core.dashboard import es_checkout_hoy, obtener_grupo_habitacion
+    from core.historial import huespedes_que_regresan
     
     # Obtener datos del pasajero
     habitaciones_ocupadas = obtener_habitaciones_ocupadas()
@@ -72,9 +135,22 @@ def ficha_habitacion(num_habitacion):
     resumen = obtener_resumen_habitacion(num_habitacion, datos_pasajero)
     
     # Verificar si es checkout hoy
-    resumen['es_checkout_hoy'] = es_checkout_hoy(datos_pasajero['egreso'])
+    resumen.es_checkout_hoy = es_checkout_hoy(datos_pasajero.egreso)
+    resumen.grupo = obtener_grupo_habitacion(num_habitacion)
+    
+    # Estadías anteriores de los pasajeros de la habitación
+    resumen.regresan = huespedes_que_regresan(num_habitacion)
+    
+    # La tabla de consumos se vuelve a renderizar solo si cambiaron sus filas (o el catálogo)
+    catalogo = categorias.catalogo()
+    resumen.tabla_consumos = fragmentos.renderizar(
+        'fragmentos/consumos_habitacion.html',
+        clave=(num_habitacion, tuple(c.como_tupla() for c in resumen.consumos), catalogo.version),
+        numero=num_habitacion,
+        consumos=resumen.consumos,
+        categorias=catalogo)
     
-    return render_template('ficha_habitacion.html', habitacion=resumen)
+    return render_template('ficha_habitacion.html', habitacion=resumen, categorias=catalogo)
 
 @app.route('/habitacion/<int:num_habitacion>/agregar', methods=['POST'])
 def agregar_consumo_habitacion(num_habitacion):
@@ -86,6 +162,14 @@ def agregar_consumo_habitacion(num_habitacion):
     if not categoria or not monto:
         flash('Todos los campos son obligatorios', 'danger')
         return redirect(f'/habitacion/{num_habitacion}')
+    if categoria not in categorias.catalogo():
+        flash(f'❌ Categoría desconocida: {categoria}', 'danger')
+        return redirect(f'/habitacion/{num_habitacion}')
+    try:
+        centavos = dinero.a_centavos(monto)
+    except ValueError:
+        flash(f'❌ Monto inválido: {monto}', 'danger')
+        return redirect(f'/habitacion/{num_habitacion}')
     
     # Obtener nombre del pasajero
     habitaciones_ocupadas = obtener_habitaciones_ocupadas()
@@ -93,11 +177,11 @@ def agregar_consumo_habitacion(num_habitacion):
         flash('Habitación no encontrada', 'danger')
         return redirect('/dashboard')
     
-    pasajero = habitaciones_ocupadas[num_habitacion]['pasajero']
+    pasajero = habitaciones_ocupadas[num_habitacion].pasajero
     
     # Agregar el consumo
     if agregar_consumo(num_habitacion, categoria, monto, pasajero):
-        flash(f'✅ Consumo de ${monto} agregado correctamente', 'success')
+        flash(f'✅ Consumo de ${dinero.formatear(centavos)} agregado correctamente', 'success')
     else:
         flash('❌ Error al agregar el consumo', 'danger')
     
@@ -116,7 +200,7 @@ def eliminar_consumo_habitacion(num_habitacion, indice):
 @app.route('/checkout/<int:num_habitacion>')
 def checkout(num_habitacion):
     """Muestra la pantalla de check-out con resumen final"""
-    from core.dashboard import es_checkout_hoy
+    from core.dashboard import es_checkout_hoy, obtener_grupo_habitacion
     
     # Obtener datos del pasajero
     habitaciones_ocupadas = obtener_habitaciones_ocupadas()
@@ -130,13 +214,16 @@ def checkout(num_habitacion):
     resumen = obtener_resumen_habitacion(num_habitacion, datos_pasajero)
     
     # Verificar si es checkout hoy o anticipado
-    resumen['es_checkout_hoy'] = es_checkout_hoy(datos_pasajero['egreso'])
+    resumen.es_checkout_hoy = es_checkout_hoy(datos_pasajero.egreso)
+    resumen.grupo = obtener_grupo_habitacion(num_habitacion)
     
-    return render_template('checkout.html', checkout=resumen)
+    return render_template('checkout.html', checkout=resumen, categorias=categorias.catalogo())
 
 @app.route('/checkout/<int:num_habitacion>/confirmar', methods=['POST'])
 def confirmar_checkout(num_habitacion):
-    """Procesa el check-out individual: elimina al pasajero y sus consumos pagados"""
+    """Procesa el check-out individual: archiva el folio y elimina al pasajero y sus consumos pagados"""
+    from core import folios
+    
     habitaciones_ocupadas = obtener_habitaciones_ocupadas()
     
     if num_habitacion not in habitaciones_ocupadas:
@@ -144,19 +231,24 @@ def confirmar_checkout(num_habitacion):
         return redirect('/dashboard')
     
     try:
-        # 1. Eliminar consumos de la habitación (se consideran pagados)
-        if os.path.exists(DB_CONSUMOS):
-            df_consumos = pd.read_csv(DB_CONSUMOS)
-            df_consumos = df_consumos[df_consumos['habitacion'] != num_habitacion]
-            df_consumos.to_csv(DB_CONSUMOS, index=False)
+        # 1. Archivar el folio y eliminar los consumos de la habitación (se consideran pagados)
+        with bloqueo(DB_CONSUMOS):
+            folio = obtener_resumen_habitacion(num_habitacion, habitaciones_ocupadas[num_habitacion])
+            numero_folio, = folios.archivar([folio])
+            if os.path.exists(DB_CONSUMOS):
+                df_consumos = leer_csv(DB_CONSUMOS)
+                df_consumos = df_consumos[df_consumos['habitacion'] != num_habitacion]
+                guardar_csv(df_consumos, DB_CONSUMOS)
         
         # 2. Eliminar pasajero del registro
         if os.path.exists(DB_PASAJEROS):
-            df_pasajeros = pd.read_csv(DB_PASAJEROS)
-            df_pasajeros = df_pasajeros[df_pasajeros['Nro. habitación'] != num_habitacion]
-            df_pasajeros.to_csv(DB_PASAJEROS, index=False)
+            with bloqueo(DB_PASAJEROS):
+                df_pasajeros = leer_csv(DB_PASAJEROS)
+                df_pasajeros = df_pasajeros[df_pasajeros['Nro. habitación'] != num_habitacion]
+                guardar_csv(df_pasajeros, DB_PASAJEROS)
         
-        flash(f'✅ Check-out realizado exitosamente. Habitación {num_habitacion} ahora disponible.', 'success')
+        flash(f'✅ Check-out realizado exitosamente. Habitación {num_habitacion} ahora disponible. '
+              f'Folio N° {numero_folio} archivado.', 'success')
         return redirect('/dashboard')
         
     except Exception as e:
@@ -164,11 +256,63 @@ def confirmar_checkout(num_habitacion):
         return redirect(f'/checkout/{num_habitacion}')
 
 
+@app.route('/checkout-grupo/<voucher>')
+def checkout_grupo(voucher):
+    """Folio consolidado y check-out de todas las habitaciones de un voucher (familias y grupos)"""
+    from core.consumos import obtener_resumen_grupo
+    from core.dashboard import es_checkout_hoy
+    
+    grupo = obtener_resumen_grupo(voucher)
+    if grupo is None:
+        flash(f'El voucher {voucher} no tiene habitaciones ocupadas', 'warning')
+        return redirect('/dashboard')
+    
+    grupo.es_checkout_hoy = all(es_checkout_hoy(f.pasajero.egreso) for f in grupo.folios)
+    return render_template('checkout_grupo.html', grupo=grupo, categorias=categorias.catalogo())
+
+@app.route('/checkout-grupo/<voucher>/confirmar', methods=['POST'])
+def confirmar_checkout_grupo(voucher):
+    """Procesa el check-out del grupo: archiva los folios de todas sus habitaciones y las libera juntas"""
+    from core import folios
+    from core.consumos import obtener_resumen_grupo
+    
+    try:
+        # 1. Archivar los folios del grupo y eliminar sus consumos (se consideran pagados)
+        with bloqueo(DB_CONSUMOS):
+            grupo = obtener_resumen_grupo(voucher)
+            if grupo is None:
+                flash(f'El voucher {voucher} no tiene habitaciones ocupadas', 'warning')
+                return redirect('/dashboard')
+            habitaciones = list(grupo.habitaciones)
+            numeros_folio = folios.archivar(grupo.folios)
+            if os.path.exists(DB_CONSUMOS):
+                df_consumos = leer_csv(DB_CONSUMOS)
+                df_consumos = df_consumos[~df_consumos['habitacion'].isin(habitaciones)]
+                guardar_csv(df_consumos, DB_CONSUMOS)
+        
+        # 2. Eliminar a los pasajeros de todas las habitaciones del grupo
+        if os.path.exists(DB_PASAJEROS):
+            with bloqueo(DB_PASAJEROS):
+                df_pasajeros = leer_csv(DB_PASAJEROS)
+                df_pasajeros = df_pasajeros[~df_pasajeros['Nro. habitación'].isin(habitaciones)]
+                guardar_csv(df_pasajeros, DB_PASAJEROS)
+        
+        flash(f'✅ Check-out del grupo {voucher} realizado: habitaciones {", ".join(map(str, habitaciones))} '
+              f'disponibles. Folios N° {", ".join(map(str, numeros_folio))} archivados '
+              f'(total ${dinero.formatear(grupo.totales["total"])}).', 'success')
+        return redirect('/dashboard')
+        
+    except Exception as e:
+        flash(f'❌ Error al procesar check-out del grupo: {str(e)}', 'danger')
+        return redirect(f'/checkout-grupo/{voucher}')
+
+
 @app.route('/checkout-masivo')
 def vista_checkout_masivo():
     """Vista previa del checkout masivo con resumen de habitaciones y consumos"""
     from core.dashboard import obtener_habitaciones_checkout, es_checkout_hoy
     from core.consumos import obtener_total_consumos
+    from core.modelos import Folio
     
     # Obtener todas las habitaciones con checkout hoy
     habitaciones_ocupadas = obtener_habitaciones_ocupadas()
@@ -184,19 +328,8 @@ def vista_checkout_masivo():
     
     for num_hab in sorted(checkouts_hoy):
         if num_hab in habitaciones_ocupadas:
-            datos = habitaciones_ocupadas[num_hab]
             totales_consumos = obtener_total_consumos(num_hab)
-            
-            resumen_checkouts.append({
-                'habitacion': num_hab,
-                'pasajero': datos['pasajero'],
-                'plazas': datos['plazas'],
-                'ingreso': datos['ingreso'],
-                'egreso': datos['egreso'],
-                'voucher': datos.get('voucher', 'N/A'),
-                'total_consumos': totales_consumos['total'],
-                'detalle_consumos': totales_consumos
-            })
+            resumen_checkouts.append(Folio(num_hab, habitaciones_ocupadas[num_hab], (), totales_consumos))
             total_consumos_general += totales_consumos['total']
     
     return render_template('checkout_masivo.html', 
@@ -207,7 +340,8 @@ def vista_checkout_masivo():
 
 @app.route('/checkout-masivo/confirmar', methods=['POST'])
 def confirmar_checkout_masivo():
-    """Procesa el checkout masivo: elimina todos los pasajeros con egreso hoy y sus consumos pagados"""
+    """Procesa el checkout masivo: archiva los folios y elimina todos los pasajeros con egreso hoy y sus consumos pagados"""
+    from core import folios
     from core.dashboard import obtener_habitaciones_checkout
     
     try:
@@ -220,26 +354,33 @@ def confirmar_checkout_masivo():
         
         cantidad_procesada = len(checkouts_hoy)
         
-        # 1. Eliminar consumos de todas las habitaciones con checkout hoy
+        # 1. Archivar los folios y eliminar los consumos de todas las habitaciones con checkout hoy
         consumos_eliminados = 0
-        if os.path.exists(DB_CONSUMOS):
-            df_consumos = pd.read_csv(DB_CONSUMOS)
-            consumos_antes = len(df_consumos)
-            df_consumos = df_consumos[~df_consumos['habitacion'].isin(checkouts_hoy)]
-            consumos_eliminados = consumos_antes - len(df_consumos)
-            df_consumos.to_csv(DB_CONSUMOS, index=False)
+        with bloqueo(DB_CONSUMOS):
+            habitaciones_ocupadas = obtener_habitaciones_ocupadas()
+            numeros_folio = folios.archivar(
+                [obtener_resumen_habitacion(num_hab, habitaciones_ocupadas[num_hab])
+                 for num_hab in sorted(checkouts_hoy) if num_hab in habitaciones_ocupadas])
+            if os.path.exists(DB_CONSUMOS):
+                df_consumos = leer_csv(DB_CONSUMOS)
+                consumos_antes = len(df_consumos)
+                df_consumos = df_consumos[~df_consumos['habitacion'].isin(checkouts_hoy)]
+                consumos_eliminados = consumos_antes - len(df_consumos)
+                guardar_csv(df_consumos, DB_CONSUMOS)
         
         # 2. Eliminar pasajeros con fecha de egreso = hoy
         if os.path.exists(DB_PASAJEROS):
-            df_pasajeros = pd.read_csv(DB_PASAJEROS)
-            fecha_hoy = datetime.now().strftime('%d/%m/%Y')
-            
-            # Eliminar todas las filas con egreso = hoy
-            df_pasajeros = df_pasajeros[df_pasajeros['Fecha de egreso'] != fecha_hoy]
-            df_pasajeros.to_csv(DB_PASAJEROS, index=False)
+            with bloqueo(DB_PASAJEROS):
+                df_pasajeros = leer_csv(DB_PASAJEROS)
+                fecha_hoy = reloj.fecha_hoy()
+                
+                # Eliminar todas las filas con egreso = hoy
+                df_pasajeros = df_pasajeros[df_pasajeros['Fecha de egreso'] != fecha_hoy]
+                guardar_csv(df_pasajeros, DB_PASAJEROS)
         
         flash(f'✅ Checkout masivo completado: {cantidad_procesada} habitaciones liberadas. '
               f'Consumos pagados: {consumos_eliminados} registros eliminados. '
+              f'Folios archivados: {len(numeros_folio)}. '
               f'Las habitaciones están listas para el nuevo rooming.', 'success')
         
         return redirect('/dashboard')
@@ -259,6 +400,14 @@ def cargar_consumo():
     if not habitacion or not categoria or not monto:
         flash('Todos los campos son obligatorios', 'danger')
         return redirect('/')
+    if categoria not in categorias.catalogo():
+        flash(f'❌ Categoría desconocida: {categoria}', 'danger')
+        return redirect('/')
+    try:
+        centavos = dinero.a_centavos(monto)
+    except ValueError:
+        flash(f'❌ Monto inválido: {monto}', 'danger')
+        return redirect('/')
     
     # Validar que el pasajero exista
     nombre_pasajero = validar_pasajero(habitacion)
@@ -268,228 +417,213 @@ def cargar_consumo():
     
     # Registrar el consumo
     nuevo_registro = {
-        'fecha': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        'fecha': reloj.ahora().strftime('%d/%m/%Y %H:%M'),
         'habitacion': habitacion,
         'pasajero': nombre_pasajero,
         'categoria': categoria,
-        'monto': float(monto)
+        'monto': dinero.a_texto(centavos)
     }
     
     # Guardar en el CSV
-    df_nuevo = pd.DataFrame([nuevo_registro])
+    agregar_registro(nuevo_registro, DB_CONSUMOS)
+    metricas.consumo_cargado(DB_CONSUMOS, categoria, centavos)
     
-    if os.path.exists(DB_CONSUMOS):
-        df_nuevo.to_csv(DB_CONSUMOS, mode='a', header=False, index=False)
-    else:
-        df_nuevo.to_csv(DB_CONSUMOS, mode='w', header=True, index=False)
-    
-    flash(f'✅ Consumo registrado: {categoria} - ${monto} para {nombre_pasajero} (Hab. {habitacion})', 'success')
+    flash(f'✅ Consumo registrado: {categoria} - ${dinero.formatear(centavos)} para {nombre_pasajero} (Hab. {habitacion})', 'success')
     return redirect('/')
 
+def _fecha_parametro():
+    """
+    Fecha pedida con ?fecha=DD/MM/YYYY (None si no se indicó).
+    Lanza ValueError si el formato es inválido.
+    """
+    from datetime import datetime
+
+    fecha = request.args.get('fecha', '').strip()
+    if not fecha:
+        return None
+    datetime.strptime(fecha, '%d/%m/%Y')
+    return fecha
+
+def _encolar(tipo, descripcion, parametros, extension):
+    """Crea la tarea en segundo plano y muestra su avance (o descarga el reporte si ya estaba generado)"""
+    from core import tareas
+
+    id_tarea = tareas.enviar(tipo, descripcion, parametros, extension=extension)
+    if tareas.obtener(id_tarea)['estado'] == tareas.TERMINADA:
+        return redirect(f'/tareas/{id_tarea}/descargar')
+    return redirect(f'/tareas/{id_tarea}')
+
 @app.route('/cierre-dia')
 def cierre_dia():
-    """Generar archivo de consulta de consumos agrupados por categoría (CSV)"""
+    """Generar archivo de consulta de consumos agrupados por categoría (CSV), en segundo plano"""
     if not os.path.exists(DB_CONSUMOS):
         flash("No hay consumos registrados para realizar el cierre.", "warning")
         return redirect('/')
 
-    # 1. Leer los consumos registrados
-    df = pd.read_csv(DB_CONSUMOS)
-
-    # 2. Pivotear datos: Habitaciones como filas, solo 3 categorías como columnas
-    tabla_cierre = df.pivot_table(
-        index=['habitacion', 'pasajero'], 
-        columns='categoria', 
-        values='monto', 
-        aggfunc='sum', 
-        fill_value=0
-    )
-    
-    # 3. Asegurar que existan las 3 columnas principales
-    for col in ['Bebidas', 'Estadía', 'Map']:
-        if col not in tabla_cierre.columns:
-            tabla_cierre[col] = 0
-    
-    # 4. Seleccionar solo las columnas que nos interesan
-    columnas_orden = ['Bebidas', 'Estadía', 'Map']
-    tabla_cierre = tabla_cierre[columnas_orden]
-
-    # 5. Calcular el total acumulado por habitación
-    tabla_cierre['TOTAL_GENERAL'] = tabla_cierre.sum(axis=1)
-
-    # 6. Guardar temporalmente para la descarga
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as tmp:
-        archivo_salida = tmp.name
-        tabla_cierre.to_csv(archivo_salida)
+    try:
+        fecha = _fecha_parametro()
+    except ValueError:
+        flash('❌ Fecha inválida (usar DD/MM/YYYY)', 'danger')
+        return redirect('/')
 
-    return send_file(archivo_salida, as_attachment=True, download_name=f"consulta_consumos_{datetime.now().strftime('%d-%m-%Y')}.csv")
+    # Sin ?fecha: todos los consumos pendientes (como siempre); con ?fecha: solo los de ese día
+    descripcion = f'Consulta de consumos del {fecha}' if fecha else 'Consulta de consumos (CSV)'
+    return _encolar('cierre_csv', descripcion, {
+        'fecha': fecha or reloj.fecha_hoy(),
+        'fecha_consumos': fecha,
+        'archivo_consumos': os.path.abspath(DB_CONSUMOS),
+    }, '.csv')
 
 @app.route('/cierre-xlsx')
 def cierre_xlsx():
-    """Generar archivo de salidas en formato XLSX (Excel) - Cada categoría en su columna"""
+    """Generar archivo de salidas en formato XLSX (Excel), en segundo plano"""
     if not os.path.exists(DB_CONSUMOS):
         flash("No hay consumos registrados para generar el archivo de salidas.", "warning")
         return redirect('/')
-    
+
     try:
-        # Leer consumos
-        df_consumos = pd.read_csv(DB_CONSUMOS)
-        
-        # Crear tabla pivote: habitaciones en filas, categorías en columnas
-        tabla_pivot = df_consumos.pivot_table(
-            index=['habitacion', 'pasajero'],
-            columns='categoria',
-            values='monto',
-            aggfunc='sum',
-            fill_value=0
-        ).reset_index()
-        
-        # Asegurar que existan todas las columnas (aunque estén vacías)
-        for col in ['Estadía', 'Map', 'Bebidas']:
-            if col not in tabla_pivot.columns:
-                tabla_pivot[col] = 0
-        
-        # Calcular total por habitación
-        tabla_pivot['Total'] = tabla_pivot['Estadía'] + tabla_pivot['Map'] + tabla_pivot['Bebidas']
-        
-        # Crear estructura del archivo (replica salidas.xlsx)
-        max_filas = 30
-        data = [[None] * 6 for _ in range(max_filas)]
-        
-        # Fila 0: Título
-        data[0] = ['Pase de caja e información a turno mañana', None, None, None, None, None]
-        data[2] = [None, None, 'Turno:   00 A 08 HS', None, None, None]
-        data[3] = [None, None, None, None, f'Fecha: {datetime.now().strftime("%Y-%m-%d")}', None]
-        data[4] = ['Detalle a cobrar de habitaciones con salida', None, None, None, None, None]
-        data[5] = ['HAB', 'Estadía', 'Map', 'Bebidas', 'Forma de pago', 'Total']
-        data[6] = [None, None, None, None, None, None]
-        
-        # Datos de habitaciones - Cada categoría en su columna
-        fila_actual = 7
-        for idx, row in tabla_pivot.iterrows():
-            habitacion = row['habitacion']
-            estadia = row['Estadía'] if row['Estadía'] > 0 else None
-            map_val = row['Map'] if row['Map'] > 0 else None
-            bebidas = row['Bebidas'] if row['Bebidas'] > 0 else None
-            total = row['Total']
-            
-            # Distribuir valores en sus respectivas columnas
-            data[fila_actual] = [
-                int(habitacion),  # HAB (col 0)
-                estadia,          # Estadía (col 1)
-                map_val,          # Map (col 2)
-                bebidas,          # Bebidas (col 3)
-                None,             # Forma de pago (col 4)
-                total             # Total (col 5)
-            ]
-            fila_actual += 1
-        
-        # Rellenar filas vacías
-        for i in range(fila_actual, max_filas):
-            data[i] = [None, None, None, None, None, 0.0]
-        
-        # Guardar como XLSX in archivo temporal
-        df_salidas = pd.DataFrame(data)
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.xlsx', delete=False) as tmp:
-            archivo_salida = tmp.name
-            df_salidas.to_excel(archivo_salida, engine='openpyxl', index=False, header=False)
-        
-        return send_file(os.path.abspath(archivo_salida), as_attachment=True, download_name=f'salidas_{datetime.now().strftime("%d-%m-%Y")}.xlsx')
-        
-    except Exception as e:
-        flash(f"Error al generar archivo Excel: {str(e)}", "danger")
+        fecha = _fecha_parametro()
+    except ValueError:
+        flash('❌ Fecha inválida (usar DD/MM/YYYY)', 'danger')
         return redirect('/')
 
+    descripcion = f'Planilla de salidas del {fecha}' if fecha else 'Planilla de salidas (Excel)'
+    return _encolar('cierre_xlsx', descripcion, {
+        'fecha': fecha or reloj.fecha_hoy(),
+        'fecha_consumos': fecha,
+        'archivo_consumos': os.path.abspath(DB_CONSUMOS),
+    }, '.xlsx')
+
 @app.route('/generar-salidas-checkouts')
 def generar_salidas_checkouts():
-    """Generar archivo consolidado de checkouts del día (XLSX) - Descarga automática"""
-    from core.dashboard import obtener_habitaciones_checkout, obtener_habitaciones_ocupadas
-    
+    """Generar archivo consolidado de checkouts del día (XLSX), en segundo plano"""
+    from core.dashboard import obtener_habitaciones_checkout
+
     try:
-        # Obtener habitaciones con checkout hoy
-        checkouts_hoy = obtener_habitaciones_checkout()
-        
-        if not checkouts_hoy:
+        fecha = _fecha_parametro()
+    except ValueError:
+        flash('❌ Fecha inválida (usar DD/MM/YYYY)', 'danger')
+        return redirect('/dashboard')
+
+    # Para hoy el snapshot ya sabe si hay checkouts: avisar sin crear la tarea
+    if fecha is None:
+        if not obtener_habitaciones_checkout():
             flash("No hay habitaciones con check-out programado para hoy.", "warning")
             return redirect('/dashboard')
-        
-        # Obtener datos de las habitaciones ocupadas
-        habitaciones_ocupadas = obtener_habitaciones_ocupadas()
-        
-        # Crear lista de habitaciones con checkout y sus consumos
-        datos_checkouts = []
-        for num_hab in checkouts_hoy:
-            if num_hab in habitaciones_ocupadas:
-                from core.consumos import obtener_resumen_habitacion
-                resumen = obtener_resumen_habitacion(num_hab, habitaciones_ocupadas[num_hab])
-                datos_checkouts.append({
-                    'habitacion': num_hab,
-                    'pasajero': habitaciones_ocupadas[num_hab]['pasajero'],
-                    'Estadía': resumen['totales']['Estadía'],
-                    'Map': resumen['totales']['Map'],
-                    'Bebidas': resumen['totales']['Bebidas'],
-                    'Total': resumen['totales']['total']
-                })
-        
-        # Si no hay datos, generar archivo vacío indicando que no hay consumos
-        if not datos_checkouts:
-            # Aún así crear estructura para las habitaciones con checkout
-            for num_hab in checkouts_hoy:
-                datos_checkouts.append({
-                    'habitacion': num_hab,
-                    'pasajero': 'Sin datos',
-                    'Estadía': 0,
-                    'Map': 0,
-                    'Bebidas': 0,
-                    'Total': 0
-                })
-        
-        # Crear estructura del archivo (replica salidas.xlsx)
-        max_filas = 30
-        data = [[None] * 6 for _ in range(max_filas)]
-        
-        # Encabezados
-        data[0] = ['Pase de caja e información a turno mañana', None, None, None, None, None]
-        data[2] = [None, None, 'Turno:   00 A 08 HS', None, None, None]
-        data[3] = [None, None, None, None, f'Fecha: {datetime.now().strftime("%d/%m/%Y")}', None]
-        data[4] = ['Detalle a cobrar de habitaciones con salida HOY', None, None, None, None, None]
-        data[5] = ['HAB', 'Estadía', 'Map', 'Bebidas', 'Forma de pago', 'Total']
-        data[6] = [None, None, None, None, None, None]
-        
-        # Datos de habitaciones con checkout - Cada categoría en su columna
-        fila_actual = 7
-        for item in sorted(datos_checkouts, key=lambda x: x['habitacion']):
-            estadia = item['Estadía'] if item['Estadía'] > 0 else None
-            map_val = item['Map'] if item['Map'] > 0 else None
-            bebidas = item['Bebidas'] if item['Bebidas'] > 0 else None
-            total = item['Total']
-            
-            data[fila_actual] = [
-                int(item['habitacion']),  # HAB (col 0)
-                estadia,                   # Estadía (col 1)
-                map_val,                   # Map (col 2)
-                bebidas,                   # Bebidas (col 3)
-                None,                      # Forma de pago (col 4)
-                total                      # Total (col 5)
-            ]
-            fila_actual += 1
-        
-        # Rellenar filas vacías
-        for i in range(fila_actual, max_filas):
-            data[i] = [None, None, None, None, None, None]
-        
-        # Guardar como XLSX en archivo temporal
-        df_salidas = pd.DataFrame(data)
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.xlsx', delete=False) as tmp:
-            archivo_salida = tmp.name
-            df_salidas.to_excel(archivo_salida, engine='openpyxl', index=False, header=False)
-        
-        # Descargar automáticamente (usar ruta absoluta)
-        return send_file(os.path.abspath(archivo_salida), as_attachment=True, download_name=f'checkouts_{datetime.now().strftime("%d-%m-%Y")}.xlsx')
-        
-    except Exception as e:
-        flash(f"Error al generar archivo de checkouts: {str(e)}", "danger")
-        return redirect('/dashboard')
+        fecha = reloj.fecha_hoy()
+
+    return _encolar('salidas_checkouts', f'Checkouts del {fecha} (Excel)', {
+        'fecha': fecha,
+        'archivo_pasajeros': os.path.abspath(DB_PASAJEROS),
+        'archivo_consumos': os.path.abspath(DB_CONSUMOS),
+    }, '.xlsx')
+
+@app.route('/tareas')
+def lista_tareas():
+    """Tareas en segundo plano (cierres, exportaciones, importaciones)"""
+    from core import tareas
+
+    lista = tareas.listar()
+    if request.args.get('formato') == 'json':
+        return jsonify(lista)
+    return render_template('tareas.html', tareas=lista)
+
+@app.route('/tareas/<id_tarea>')
+def ver_tarea(id_tarea):
+    """Avance de una tarea; descarga el resultado cuando está listo"""
+    from core import tareas
+
+    tarea = tareas.obtener(id_tarea)
+    if tarea is None:
+        if request.args.get('formato') == 'json':
+            return jsonify({'error': 'Tarea inexistente'}), 404
+        flash('⚠️ La tarea no existe o ya fue eliminada', 'warning')
+        return redirect('/tareas')
+    if request.args.get('formato') == 'json':
+        return jsonify(tarea)
+    return render_template('tareas.html', tarea=tarea, tareas=tareas.listar(limite=10))
+
+@app.route('/tareas/<id_tarea>/descargar')
+def descargar_tarea(id_tarea):
+    """Archivo generado por una tarea terminada"""
+    from core import tareas
+
+    tarea = tareas.obtener(id_tarea)
+    if tarea is None or not tarea.get('archivo') or not os.path.exists(tarea['archivo']):
+        flash('⚠️ El archivo de esa tarea no está disponible', 'warning')
+        return redirect('/tareas')
+    return send_file(tarea['archivo'], as_attachment=True, download_name=tarea['nombre_descarga'])
+
+@app.route('/respaldos')
+def lista_respaldos():
+    """Respaldos de pasajeros y consumos (ver core/respaldos.py)"""
+    from core import respaldos
+
+    lista = respaldos.listar()
+    if request.args.get('formato') == 'json':
+        return jsonify(lista)
+    return render_template('respaldos.html', respaldos=lista, restaurables=respaldos.RESTAURABLES)
+
+@app.route('/respaldos/<id_respaldo>/descargar')
+def descargar_respaldo(id_respaldo):
+    """CSV tal como estaba en un respaldo"""
+    import io
+    from datetime import datetime
+    from core import respaldos
+
+    entrada = respaldos.obtener(id_respaldo)
+    if entrada is None:
+        flash('⚠️ El respaldo no existe o ya fue descartado', 'warning')
+        return redirect('/respaldos')
+    try:
+        datos = respaldos.leer(entrada)
+    except (OSError, ValueError) as e:
+        flash(f'❌ No se pudo leer el respaldo: {str(e)}', 'danger')
+        return redirect('/respaldos')
+    nombre = entrada['archivo'].replace('.csv', '_' + datetime.fromtimestamp(entrada['ts']).strftime('%d-%m-%Y_%H-%M') + '.csv')
+    return send_file(io.BytesIO(datos), mimetype='text/csv', as_attachment=True, download_name=nombre)
+
+@app.route('/respaldos/<id_respaldo>/restaurar', methods=['POST'])
+def restaurar_respaldo(id_respaldo):
+    """Vuelve pasajeros.csv o consumos_diarios.csv al contenido de un respaldo"""
+    from core import respaldos
+
+    try:
+        entrada = respaldos.restaurar(id_respaldo)
+        flash(f"✅ {entrada['archivo']} restaurado al {entrada['momento']} ({entrada['filas']} registros). "
+              f"El estado anterior quedó respaldado.", 'success')
+    except (OSError, ValueError) as e:
+        flash(f'❌ No se pudo restaurar: {str(e)}', 'danger')
+    return redirect('/respaldos')
+
+@app.route('/folios')
+def lista_folios():
+    """Folios cerrados en los check-outs, por pasajero (nombre o DNI) y fecha (ver core/folios.py)"""
+    from core import folios
+
+    texto = request.args.get('q', '').strip()
+    try:
+        fecha = _fecha_parametro()
+    except ValueError:
+        flash('❌ Fecha inválida. Use el formato DD/MM/YYYY', 'danger')
+        return redirect('/folios')
+    lista = folios.buscar(texto, fecha)
+    if request.args.get('formato') == 'json':
+        return jsonify(lista)
+    return render_template('folios.html', folios=lista, q=texto, fecha=fecha or '')
+
+@app.route('/folios/<int:numero>')
+def ver_folio(numero):
+    """Reimpresión de un folio cerrado"""
+    from core import folios
+
+    folio = folios.obtener(numero)
+    if folio is None:
+        flash(f'⚠️ No existe el folio N° {numero}', 'warning')
+        return redirect('/folios')
+    if request.args.get('formato') == 'json':
+        return jsonify(folio)
+    return render_template('folio.html', folio=folio, categorias=categorias.catalogo())
 
 @app.route('/ver-consumos')
 def ver_consumos():
@@ -499,7 +633,7 @@ def ver_consumos():
         <!DOCTYPE html>
         <html>
         <head>
-            <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+            <link href='""" + _bootstrap_css() + """' rel="stylesheet">
             <title>Consumos Registrados</title>
         </head>
         <body>
@@ -513,14 +647,14 @@ def ver_consumos():
         </html>
         """
     
-    df = pd.read_csv(DB_CONSUMOS)
+    df = leer_csv(DB_CONSUMOS)
     
     # Construir tabla HTML con botón de eliminar
     html = """
     <!DOCTYPE html>
     <html>
     <head>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+        <link href='""" + _bootstrap_css() + """' rel="stylesheet">
         <title>Consumos Registrados</title>
         <script>
             function confirmarEliminacion(indice) {
@@ -554,7 +688,8 @@ def ver_consumos():
                     <tbody>
     """
     
-    for idx, row in df.iterrows():
+    montos = centavos_de(df, DB_CONSUMOS)
+    for (idx, row), centavos in zip(df.iterrows(), montos):
         html += f"""
                         <tr>
                             <td>{idx + 1}</td>
@@ -562,7 +697,7 @@ def ver_consumos():
                             <td>{row['habitacion']}</td>
                             <td>{row['pasajero']}</td>
                             <td><span class="badge bg-primary">{row['categoria']}</span></td>
-                            <td>${row['monto']:.2f}</td>
+                            <td>${dinero.formatear(centavos)}</td>
                             <td>
                                 <button onclick="confirmarEliminacion({idx})" class="btn btn-danger btn-sm btn-eliminar">
                                     🗑️ Eliminar
@@ -596,23 +731,25 @@ def eliminar_consumo(indice):
         return redirect('/ver-consumos')
     
     try:
-        # Leer el archivo
-        df = pd.read_csv(DB_CONSUMOS)
-        
-        # Verificar que el índice existe
-        if indice < 0 or indice >= len(df):
-            flash(f'❌ Índice inválido: {indice}', 'danger')
-            return redirect('/ver-consumos')
-        
-        # Guardar información del consumo eliminado para mostrar
-        consumo_eliminado = df.iloc[indice]
-        info = f"Hab {consumo_eliminado['habitacion']} - {consumo_eliminado['categoria']} - ${consumo_eliminado['monto']}"
-        
-        # Eliminar la fila
-        df = df.drop(indice)
-        
-        # Guardar el archivo actualizado
-        df.to_csv(DB_CONSUMOS, index=False)
+        with bloqueo(DB_CONSUMOS):
+            # Leer el archivo
+            df = leer_csv(DB_CONSUMOS)
+            
+            # Verificar que el índice existe
+            if indice < 0 or indice >= len(df):
+                flash(f'❌ Índice inválido: {indice}', 'danger')
+                return redirect('/ver-consumos')
+            
+            # Guardar información del consumo eliminado para mostrar
+            consumo_eliminado = df.iloc[indice]
+            centavos = centavos_de(df.iloc[[indice]], DB_CONSUMOS, filas_csv=len(df))[0]
+            info = f"Hab {consumo_eliminado['habitacion']} - {consumo_eliminado['categoria']} - ${dinero.formatear(centavos)}"
+            
+            # Eliminar la fila
+            df = df.drop(indice)
+            
+            # Guardar el archivo actualizado
+            guardar_csv(df, DB_CONSUMOS)
         
         flash(f'✅ Consumo eliminado correctamente: {info}', 'success')
         
@@ -631,7 +768,7 @@ def reiniciar_temporada():
         <!DOCTYPE html>
         <html>
         <head>
-            <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+            <link href='""" + _bootstrap_css() + """' rel="stylesheet">
             <title>Reiniciar Temporada</title>
         </head>
         <body>
@@ -645,7 +782,7 @@ def reiniciar_temporada():
                         <hr>
                         <p><strong>¿Qué sucederá?</strong></p>
                         <ul>
-                            <li>Se creará un archivo de respaldo: <code>consumos_diarios_BACKUP_DD-MM-YYYY_HH-MM.csv</code></li>
+                            <li>Se guardará un respaldo de los consumos (se puede restaurar desde <a href="/respaldos">Respaldos</a>)</li>
                             <li>El archivo <code>consumos_diarios.csv</code> se reiniciará vacío</li>
                             <li>Las nuevas 40 habitaciones podrán empezar con cuenta en cero</li>
                         </ul>
@@ -666,20 +803,17 @@ def reiniciar_temporada():
         flash("No hay consumos para archivar. El sistema ya está limpio.", "info")
         return redirect('/')
     
+    from core.respaldos import respaldar
+
     try:
-        # Crear nombre de archivo de backup con timestamp
-        timestamp = datetime.now().strftime('%d-%m-%Y_%H-%M')
-        archivo_backup = f'data/consumos_diarios_BACKUP_{timestamp}.csv'
-        
-        # Copiar el archivo actual al backup
-        import shutil
-        shutil.copy(DB_CONSUMOS, archivo_backup)
-        
-        # Reiniciar el archivo de consumos
-        with open(DB_CONSUMOS, 'w', encoding='utf-8') as f:
-            f.write('fecha,habitacion,pasajero,categoria,monto\n')
+        with bloqueo(DB_CONSUMOS):
+            # Archivar la temporada (respaldo comprimido, restaurable desde /respaldos)
+            entrada = respaldar(DB_CONSUMOS, 'Reinicio de temporada', tipo='temporada')
+            
+            # Reiniciar el archivo de consumos
+            reiniciar_csv(DB_CONSUMOS, 'fecha,habitacion,pasajero,categoria,monto')
         
-        flash(f'✅ Temporada reiniciada correctamente. Backup guardado en: {archivo_backup}', 'success')
+        flash(f"✅ Temporada reiniciada correctamente. Respaldo del {entrada['momento']} guardado en Respaldos", 'success')
         return redirect('/')
         
     except Exception as e:
@@ -689,7 +823,7 @@ def reiniciar_temporada():
 @app.route('/gestionar-pasajeros')
 def gestionar_pasajeros():
     """Página para gestionar archivos de pasajeros (cambiar entre temporada alta/baja)"""
-    from core.dashboard import es_checkout_hoy
+    from core.esquema import cargar_pasajeros
     
     # Obtener información del archivo actual
     info_actual = {
@@ -703,28 +837,30 @@ def gestionar_pasajeros():
     }
     
     if os.path.exists(DB_PASAJEROS):
-        df = pd.read_csv(DB_PASAJEROS)
+        # Solo habitación y fechas (ya parseadas), no las 28 columnas
+        df = cargar_pasajeros('disponibilidad')
         info_actual['total'] = len(df)
         info_actual['habitaciones'] = df['Nro. habitación'].tolist()
         
         # Contar checkouts hoy
-        checkouts_hoy = 0
-        for _, row in df.iterrows():
-            if es_checkout_hoy(row['Fecha de egreso']):
-                checkouts_hoy += 1
-        info_actual['checkouts_hoy'] = checkouts_hoy
+        hoy = reloj.ahora().replace(hour=0, minute=0, second=0, microsecond=0)
+        info_actual['checkouts_hoy'] = int((df['Fecha de egreso'] == hoy).sum())
         
         # Rango de fechas
-        info_actual['fecha_ingreso_min'] = df['Fecha de ingreso'].min()
-        info_actual['fecha_ingreso_max'] = df['Fecha de ingreso'].max()
-        info_actual['fecha_egreso_min'] = df['Fecha de egreso'].min()
-        info_actual['fecha_egreso_max'] = df['Fecha de egreso'].max()
+        for campo, columna in (('ingreso', 'Fecha de ingreso'), ('egreso', 'Fecha de egreso')):
+            fechas = df[columna].dropna()
+            if not fechas.empty:
+                info_actual[f'fecha_{campo}_min'] = fechas.min().strftime('%d/%m/%Y')
+                info_actual[f'fecha_{campo}_max'] = fechas.max().strftime('%d/%m/%Y')
     
     return render_template('gestionar_pasajeros.html', info_actual=info_actual)
 
 @app.route('/subir-pasajeros', methods=['POST'])
 def subir_pasajeros():
-    """Permite subir un archivo CSV de pasajeros personalizado"""
+    """Permite subir un archivo CSV de pasajeros personalizado (se procesa en segundo plano)"""
+    import csv
+    from core import tareas
+
     try:
         if 'archivo' not in request.files:
             flash('❌ No se seleccionó ningún archivo', 'danger')
@@ -740,70 +876,34 @@ def subir_pasajeros():
             flash('❌ El archivo debe ser CSV', 'danger')
             return redirect('/gestionar-pasajeros')
         
-        # Crear backup del archivo actual
-        if os.path.exists(DB_PASAJEROS):
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = f'data/backups/pasajeros_backup_{timestamp}.csv'
-            os.makedirs('data/backups', exist_ok=True)
-            
-            import shutil
-            shutil.copy(DB_PASAJEROS, backup_path)
+        # Guardar el archivo subido para la tarea
+        os.makedirs(tareas.DIRECTORIO, exist_ok=True)
+        fd, origen = tempfile.mkstemp(dir=tareas.DIRECTORIO, prefix='rooming_', suffix='.csv')
+        os.close(fd)
+        archivo.save(origen)
         
-        # Validar estructura del CSV
-        df_nuevo = pd.read_csv(archivo)
+        # Validar estructura del CSV (solo el encabezado, en el momento)
+        with open(origen, newline='', encoding='utf-8-sig') as f:
+            columnas = next(csv.reader(f), [])
         columnas_requeridas = ['Nro. habitación', 'Fecha de ingreso', 'Fecha de egreso', 
                                'Apellido y nombre', 'Servicios']
         
         for col in columnas_requeridas:
-            if col not in df_nuevo.columns:
+            if col not in columnas:
+                os.remove(origen)
                 flash(f'❌ Falta la columna requerida: {col}', 'danger')
                 return redirect('/gestionar-pasajeros')
         
         # Determinar modo de carga
         modo = request.form.get('modo_carga', 'agregar')
-        
-        if modo == 'reemplazar':
-            # MODO REEMPLAZAR: Sobreescribir todo (como antes)
-            df_nuevo.to_csv(DB_PASAJEROS, index=False)
-            
-            # Limpiar consumos
-            if os.path.exists(DB_CONSUMOS):
-                with open(DB_CONSUMOS, 'w') as f:
-                    f.write('fecha,habitacion,pasajero,categoria,monto\n')
-            
-            flash(f'✅ Archivo reemplazado completamente ({len(df_nuevo)} pasajeros). Consumos limpiados.', 'success')
-        else:
-            # MODO AGREGAR: Mantener reservas existentes y agregar/actualizar nuevas
-            if os.path.exists(DB_PASAJEROS):
-                df_existente = pd.read_csv(DB_PASAJEROS)
-                
-                # Obtener habitaciones del archivo nuevo
-                habitaciones_nuevas = df_nuevo['Nro. habitación'].unique()
-                
-                # Mantener solo las habitaciones que NO están en el archivo nuevo
-                df_mantener = df_existente[~df_existente['Nro. habitación'].isin(habitaciones_nuevas)]
-                
-                # Combinar: mantener existentes + agregar nuevas
-                df_final = pd.concat([df_mantener, df_nuevo], ignore_index=True)
-                
-                # Eliminar consumos SOLO de las habitaciones que se están reemplazando
-                if os.path.exists(DB_CONSUMOS):
-                    df_consumos = pd.read_csv(DB_CONSUMOS)
-                    df_consumos = df_consumos[~df_consumos['habitacion'].isin(habitaciones_nuevas)]
-                    df_consumos.to_csv(DB_CONSUMOS, index=False)
-                
-                flash(f'✅ Archivo agregado: {len(df_nuevo)} nuevos pasajeros. '
-                      f'Mantenidas: {len(df_mantener)} reservas existentes. '
-                      f'Total: {len(df_final)} pasajeros.', 'success')
-            else:
-                # Si no existe archivo previo, crear nuevo
-                df_final = df_nuevo
-                flash(f'✅ Archivo creado con {len(df_nuevo)} pasajeros.', 'success')
-            
-            # Guardar archivo combinado
-            df_final.to_csv(DB_PASAJEROS, index=False)
-        
-        return redirect('/dashboard')
+        descripcion = f'Importación de rooming ({modo}): {archivo.filename}'
+        id_tarea = tareas.enviar('importar_rooming', descripcion, {
+            'modo': 'reemplazar' if modo == 'reemplazar' else 'agregar',
+            'archivo_pasajeros': os.path.abspath(DB_PASAJEROS),
+            'archivo_consumos': os.path.abspath(DB_CONSUMOS),
+            'directorio_backups': os.path.abspath(inventario.DIR_BACKUPS),
+        }, origen=os.path.abspath(origen))
+        return redirect(f'/tareas/{id_tarea}')
         
     except Exception as e:
         flash(f'❌ Error al subir archivo: {str(e)}', 'danger')
@@ -834,7 +934,7 @@ def reserva_express():
         if tiene_reserva_futura and habitacion_preseleccionada:
             reservas_futuras = obtener_habitaciones_reservadas_futuras()
             if habitacion_preseleccionada in reservas_futuras:
-                fecha_reserva_futura = reservas_futuras[habitacion_preseleccionada]['ingreso']
+                fecha_reserva_futura = reservas_futuras[habitacion_preseleccionada].ingreso
         
         return render_template('reserva_express.html', 
                              habitaciones=habitaciones_disponibles,
@@ -889,8 +989,8 @@ def cambiar_habitacion_route(num_habitacion):
         
         # Obtener consumos para mostrar cuántos hay
         if os.path.exists(DB_CONSUMOS):
-            df_consumos = pd.read_csv(DB_CONSUMOS)
-            cantidad_consumos = len(df_consumos[df_consumos['habitacion'] == num_habitacion])
+            from core.snapshot import obtener_snapshot
+            cantidad_consumos = obtener_snapshot(archivo_consumos=DB_CONSUMOS).cantidad_consumos(num_habitacion)
         else:
             cantidad_consumos = 0
         
@@ -930,5 +1030,89 @@ def cambiar_habitacion_route(num_habitacion):
         flash(f'❌ {mensaje}', 'danger')
         return redirect(f'/cambiar-habitacion/{num_habitacion}')
 
+@app.route('/reubicacion-masiva', methods=['GET', 'POST'])
+def reubicacion_masiva():
+    """Mueve a los huéspedes de varias habitaciones (un piso o ala cerrada) a habitaciones libres"""
+    from core import reubicacion
+    
+    alojamiento = inventario.actual()
+    
+    if request.method == 'GET':
+        # Habitaciones a cerrar: un piso entero o las marcadas
+        try:
+            cerradas = {int(h) for h in request.args.getlist('habitaciones')}
+            if request.args.get('piso'):
+                cerradas.update(alojamiento.pisos.get(int(request.args['piso']), ()))
+        except ValueError:
+            flash('❌ Habitaciones inválidas', 'danger')
+            return redirect('/reubicacion-masiva')
+        
+        plan = reubicacion.planificar(cerradas) if cerradas else None
+        return render_template('reubicacion_masiva.html',
+                             pisos=alojamiento.pisos,
+                             ocupadas=obtener_habitaciones_ocupadas(),
+                             cerradas=sorted(cerradas),
+                             plan=plan)
+    
+    # POST: aplicar el plan confirmado
+    try:
+        movimientos = dict(tuple(int(h) for h in m.split('-')) for m in request.form.getlist('movimiento'))
+        cerradas = {int(h) for h in request.form.getlist('cerrada')}
+    except ValueError:
+        flash('❌ Plan de reubicación inválido', 'danger')
+        return redirect('/reubicacion-masiva')
+    
+    motivo = request.form.get('motivo', '')
+    observaciones = request.form.get('observaciones', '')
+    if observaciones:
+        motivo += f" - {observaciones}"
+    
+    exito, mensaje = reubicacion.aplicar(movimientos, motivo, cerradas)
+    if exito:
+        flash(f'✅ {mensaje}', 'success')
+        return redirect('/dashboard')
+    flash(f'❌ {mensaje}', 'danger')
+    return redirect('/reubicacion-masiva?' + '&'.join(f'habitaciones={h}' for h in sorted(cerradas)))
+
+@app.route('/metrics')
+def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    texto = metricas.exponer()
+    return texto, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/debug/perf')
+def debug_perf():
+    """Requests recientes y resumen por ruta (tiempos y lecturas de CSV)"""
+    if request.args.get('formato') == 'json':
+        return jsonify({'resumen': perfil.resumen_por_ruta(), 'requests': perfil.registros()})
+    return render_template('debug_perf.html',
+                         activo=perfil.ACTIVO,
+                         resumen=perfil.resumen_por_ruta(),
+                         registros=perfil.registros(),
+                         contadores=perfil.CONTADORES)
+
+@app.route('/debug/perf/<int:id_registro>')
+def debug_perf_detalle(id_registro):
+    """Detalle de un request, con el reporte de cProfile si se pidió ?perfil=1"""
+    registro = perfil.registro(id_registro)
+    if registro is None:
+        flash('⚠️ Ese request ya no está en el buffer', 'warning')
+        return redirect('/debug/perf')
+    if request.args.get('formato') == 'json':
+        return jsonify(registro)
+    return render_template('debug_perf.html',
+                         activo=perfil.ACTIVO,
+                         detalle=registro,
+                         contadores=perfil.CONTADORES)
+
+@app.route('/debug/perf/vaciar', methods=['POST'])
+def debug_perf_vaciar():
+    """Descarta los requests registrados"""
+    perfil.vaciar()
+    flash('🧹 Registro de requests vaciado', 'info')
+    return redirect('/debug/perf')
+
 if __name__ == '__main__':
+    # Servidor de desarrollo (debug + recargador).
+    # En recepción usar el modo producción: python3 wsgi.py (ver run_hotel.sh)
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
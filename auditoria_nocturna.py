@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Auditoría nocturna del turno noche, sin navegador (ver core/auditoria.py).
+
+Corre en un solo proceso, con el servidor andando o parado:
+    1. Respaldo de pasajeros.csv y consumos_diarios.csv
+    2. Cargo de estadía de la noche a cada habitación que pernocta (con --tarifa)
+    3. Lectura de los CSV (una sola vez)
+    4. En paralelo: consulta de consumos (CSV), planilla de salidas (Excel),
+       checkouts del día (Excel) y estado de habitaciones para la mañana
+
+Los archivos quedan en data/auditorias/DD-MM-YYYY/ (o en --destino), con
+reporte.json. Al final imprime el tiempo de cada etapa.
+
+Uso:
+    python3 auditoria_nocturna.py --tarifa 25000
+    python3 auditoria_nocturna.py --fecha 18/10/2026 --solo-del-dia
+    python3 auditoria_nocturna.py --alojamiento HOTEL2 --destino /mnt/pendrive/auditoria
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from datetime import datetime
+
+from core import auditoria, dinero, inventario, reloj
+
+ICONOS = {
+    auditoria.OK: '✅',
+    auditoria.AVISO: '⚠️ ',
+    auditoria.ERROR: '❌',
+    auditoria.OMITIDA: '⏭️ ',
+}
+
+
+def _fecha(texto):
+    try:
+        datetime.strptime(texto, '%d/%m/%Y')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Fecha inválida: {texto} (usar DD/MM/YYYY)')
+    return texto
+
+
+def _tarifa(texto):
+    try:
+        centavos = dinero.a_centavos(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if centavos <= 0:
+        raise argparse.ArgumentTypeError(f'La tarifa debe ser mayor a cero: {texto}')
+    return centavos
+
+
+def imprimir_reporte(reporte):
+    print(f"\n🌙 AUDITORÍA NOCTURNA del {reporte['fecha']} ({reporte['alojamiento']})")
+    print('=' * 78)
+    for nombre, resultado in reporte['etapas'].items():
+        descripcion = auditoria.ETAPAS[nombre][2]
+        print(f"{ICONOS[resultado['estado']]} {descripcion:<34} {resultado['ms']:8.0f} ms  {resultado['mensaje']}")
+    print('=' * 78)
+    print(f"Total: {reporte['total_ms']:.0f} ms")
+    for archivo in reporte['archivos']:
+        print(f'   📄 {archivo}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Auditoría nocturna: cargos, cierres y respaldos en un solo paso')
+    parser.add_argument('--fecha', type=_fecha, default=None,
+                        help='noche a auditar, DD/MM/YYYY (por defecto hoy)')
+    parser.add_argument('--tarifa', type=_tarifa, default=None,
+                        help='pesos por plaza y noche del cargo de estadía (sin --tarifa no se cargan)')
+    parser.add_argument('--solo-del-dia', action='store_true',
+                        help='planillas solo con los consumos cargados en la fecha (como ?fecha=)')
+    parser.add_argument('--alojamiento', default=None,
+                        help='código del alojamiento (config/inventario.json)')
+    parser.add_argument('--destino', default=None,
+                        help='directorio de los archivos (por defecto data/auditorias/DD-MM-YYYY)')
+    parser.add_argument('--hilos', type=int, default=auditoria.MAX_HILOS,
+                        help='etapas independientes en paralelo')
+    args = parser.parse_args(argv)
+
+    if args.alojamiento and inventario.obtener(args.alojamiento) is None:
+        parser.error(f'El alojamiento {args.alojamiento} no está en el inventario')
+
+    with inventario.en(args.alojamiento) if args.alojamiento else contextlib.nullcontext():
+        fecha = args.fecha or reloj.fecha_hoy()
+        destino = args.destino or os.path.join(auditoria.DIR_AUDITORIAS, fecha.replace('/', '-'))
+        reporte = auditoria.ejecutar(
+            auditoria.Auditoria(fecha, destino, tarifa=args.tarifa, solo_del_dia=args.solo_del_dia),
+            hilos=max(args.hilos, 1))
+
+    imprimir_reporte(reporte)
+    print(f'\nArchivos en {os.path.abspath(destino)}')
+    errores = [n for n, r in reporte['etapas'].items() if r['estado'] in (auditoria.ERROR, auditoria.OMITIDA)]
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
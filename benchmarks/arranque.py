@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Mide el tiempo hasta la primera respuesta del dashboard después de arrancar.
+
+Cada medición corre en un proceso Python nuevo (como al iniciar el servidor)
+sobre una copia temporal de data/, y reporta:
+    - import: tiempo de `import app`
+    - primera respuesta: desde el inicio del proceso hasta el primer GET /dashboard
+    - si pandas quedó cargado (no debería para el dashboard)
+
+Se mide en frío (sin snapshot en data/.estado) y en caliente (snapshot ya publicado,
+por ejemplo al reiniciar el servidor a mitad de turno).
+
+Uso:
+    python3 -m benchmarks.arranque [--repeticiones 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DIR_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Objetivo de tiempo hasta la primera respuesta (milisegundos, mediana)
+OBJETIVO_PRIMERA_RESPUESTA_MS = 1000
+
+_SCRIPT_MEDICION = r'''
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {proyecto!r})
+import app
+t_import = time.perf_counter()
+respuesta = app.app.test_client().get('/dashboard')
+t_respuesta = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (t_import - t0) * 1000,
+    'primera_respuesta_ms': (t_respuesta - t0) * 1000,
+    'status': respuesta.status_code,
+    'pandas_cargado': 'pandas' in sys.modules,
+}}))
+'''
+
+
+def medir_una_vez(directorio_trabajo):
+    """Lanza un proceso nuevo y mide import + primera respuesta."""
+    script = _SCRIPT_MEDICION.format(proyecto=DIR_PROYECTO)
+    salida = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=directorio_trabajo, capture_output=True, text=True, check=True
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def preparar_directorio():
+    """Copia data/pasajeros.csv a un directorio temporal de trabajo."""
+    directorio = tempfile.mkdtemp(prefix='bench_arranque_')
+    os.makedirs(os.path.join(directorio, 'data'))
+    shutil.copy(os.path.join(DIR_PROYECTO, 'data', 'pasajeros.csv'),
+                os.path.join(directorio, 'data', 'pasajeros.csv'))
+    return directorio
+
+
+def medir(repeticiones=5):
+    """
+    Returns:
+        dict con las mediciones en frío y en caliente
+    """
+    resultados = {'frio': [], 'caliente': []}
+    for _ in range(repeticiones):
+        directorio = preparar_directorio()
+        try:
+            resultados['frio'].append(medir_una_vez(directorio))
+            resultados['caliente'].append(medir_una_vez(directorio))
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    resultados = medir(args.repeticiones)
+    cumple = True
+    print(f'Objetivo: primera respuesta < {OBJETIVO_PRIMERA_RESPUESTA_MS} ms (mediana)\n')
+    for modo, mediciones in resultados.items():
+        importacion = statistics.median(m['import_ms'] for m in mediciones)
+        primera = statistics.median(m['primera_respuesta_ms'] for m in mediciones)
+        pandas = any(m['pandas_cargado'] for m in mediciones)
+        estado = '✅' if primera < OBJETIVO_PRIMERA_RESPUESTA_MS else '❌'
+        cumple = cumple and primera < OBJETIVO_PRIMERA_RESPUESTA_MS and not pandas
+        print(f'{estado} {modo:8s} import {importacion:7.1f} ms | '
+              f'primera respuesta {primera:7.1f} ms | pandas cargado: {"sí" if pandas else "no"}')
+
+    sys.exit(0 if cumple else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: varias terminales de recepción y la tablet del bar usando
+el sistema al mismo tiempo, sin red.
+
+Cada terminal es un hilo con su propio cliente y reparte su trabajo entre:
+    - consultas al dashboard y fichas de habitación
+    - carga y eliminación de consumos (solo en sus propias habitaciones)
+    - walk-ins (reserva express) sobre las habitaciones libres
+La tablet del bar carga consumos en cualquier habitación ocupada (/cargar).
+
+Modos:
+    cliente   la aplicación corre en este proceso (cliente de pruebas de Flask,
+              un hilo por terminal, como waitress)
+    servidor  se levanta waitress en 127.0.0.1 con una copia de los datos y
+              las terminales hablan HTTP
+
+Al terminar se verifica la integridad de los datos:
+    - cada consumo cargado (monto único) está exactamente una vez
+    - los consumos eliminados ya no están, y los de la temporada no se perdieron
+    - ningún walk-in aceptado falta ni está duplicado, y ninguna habitación
+      quedó vendida dos veces
+
+Uso:
+    python3 -m benchmarks.carga --terminales 1,2,4,8 --duracion 20
+"""
+
+import argparse
+import collections
+import csv
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from benchmarks.generar_temporada import generar_temporada
+
+DIR_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# p95 máximo aceptable para las rutas que usa el operador (milisegundos)
+OBJETIVO_P95_MS = 500
+
+# (acción, peso)
+ACCIONES_RECEPCION = [
+    ('dashboard', 40),
+    ('ficha', 30),
+    ('consumo', 18),
+    ('eliminar', 7),
+    ('walkin', 5),
+]
+ACCIONES_BAR = [
+    ('consumo_bar', 85),
+    ('dashboard', 15),
+]
+
+# Los montos de la prueba empiezan acá: no se confunden con los de la temporada
+MONTO_BASE = 10_000_000
+MONTOS_POR_TERMINAL = 100_000
+
+_SCRIPT_SERVIDOR = r'''
+import sys
+sys.path.insert(0, {proyecto!r})
+from waitress import serve
+from app import app
+app.debug = False
+serve(app, host='127.0.0.1', port={puerto}, threads={hilos}, _quiet=True)
+'''
+
+
+class ClienteFlask:
+    """Cliente de pruebas de Flask (aplicación en este mismo proceso)."""
+
+    def __init__(self):
+        from app import app
+        self.cliente = app.test_client()
+
+    def pedir(self, metodo, url, datos=None):
+        respuesta = self.cliente.open(url, method=metodo, data=datos)
+        return respuesta.status_code, respuesta.headers.get('Location', '')
+
+
+class ClienteHTTP:
+    """Cliente HTTP con conexión persistente contra el servidor local."""
+
+    def __init__(self, puerto):
+        self.puerto = puerto
+        self.conexion = None
+
+    def pedir(self, metodo, url, datos=None):
+        cuerpo = urllib.parse.urlencode(datos) if datos is not None else None
+        encabezados = {'Content-Type': 'application/x-www-form-urlencoded'} if cuerpo else {}
+        for intento in range(2):
+            if self.conexion is None:
+                self.conexion = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=60)
+            try:
+                self.conexion.request(metodo, url, body=cuerpo, headers=encabezados)
+                respuesta = self.conexion.getresponse()
+                respuesta.read()
+                return respuesta.status, respuesta.getheader('Location', '')
+            except (http.client.HTTPException, ConnectionError):
+                # El servidor cerró la conexión persistente: se reintenta una vez
+                self.conexion.close()
+                self.conexion = None
+                if intento:
+                    raise
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    rango = max(1, -(-len(valores_ordenados) * p // 100))
+    return valores_ordenados[int(rango) - 1]
+
+
+def posicion_en_habitacion(archivo_consumos, habitacion, monto):
+    """Índice del consumo dentro de la habitación (el que usa /eliminar), o None."""
+    indice = 0
+    with open(archivo_consumos, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            try:
+                if int(float(fila['habitacion'])) != habitacion:
+                    continue
+            except ValueError:
+                continue
+            if float(fila['monto']) == monto:
+                return indice
+            indice += 1
+    return None
+
+
+class Terminal(threading.Thread):
+    """Una terminal (o la tablet del bar) generando pedidos hasta el fin de la prueba."""
+
+    def __init__(self, numero, nombre, cliente, acciones, propias, ocupadas, libres,
+                 archivo_consumos, fin, pausa, semilla):
+        super().__init__(name=nombre, daemon=True)
+        self.numero = numero
+        self.cliente = cliente
+        self.acciones = [a for a, _ in acciones]
+        self.pesos = [p for _, p in acciones]
+        self.propias = propias
+        self.ocupadas = ocupadas
+        self.libres = libres
+        self.archivo_consumos = archivo_consumos
+        self.fin = fin
+        self.pausa = pausa
+        self.rng = random.Random(semilla)
+
+        self.registros = []          # (ruta, ms, status)
+        self.errores = []            # (ruta, excepción)
+        self.cargados = {}           # monto -> habitación
+        self.eliminados = set()      # montos eliminados
+        self.walkins = []            # (nombre, habitación, aceptado)
+        self.secuencia = 0
+
+    def _pedir(self, ruta, metodo, url, datos=None):
+        inicio = time.perf_counter()
+        try:
+            status, destino = self.cliente.pedir(metodo, url, datos)
+        except Exception as e:
+            self.errores.append((ruta, repr(e)))
+            return None, ''
+        self.registros.append((ruta, (time.perf_counter() - inicio) * 1000, status))
+        return status, destino
+
+    def _nuevo_monto(self):
+        self.secuencia += 1
+        return float(MONTO_BASE + self.numero * MONTOS_POR_TERMINAL + self.secuencia)
+
+    def run(self):
+        while time.perf_counter() < self.fin:
+            accion = self.rng.choices(self.acciones, weights=self.pesos)[0]
+            getattr(self, f'_{accion}')()
+            if self.pausa:
+                time.sleep(self.pausa)
+
+    def _dashboard(self):
+        self._pedir('GET /dashboard', 'GET', '/dashboard')
+
+    def _ficha(self):
+        hab = self.rng.choice(self.propias)
+        self._pedir('GET /habitacion/<n>', 'GET', f'/habitacion/{hab}')
+
+    def _consumo(self):
+        hab = self.rng.choice(self.propias)
+        monto = self._nuevo_monto()
+        datos = {'categoria': self.rng.choice(['Bebidas', 'Map', 'Estadía']), 'monto': f'{monto:.0f}'}
+        status, _ = self._pedir('POST /habitacion/<n>/agregar', 'POST', f'/habitacion/{hab}/agregar', datos)
+        if status is not None and status < 500:
+            self.cargados[monto] = hab
+
+    def _consumo_bar(self):
+        hab = self.rng.choice(self.ocupadas)
+        monto = self._nuevo_monto()
+        datos = {'habitacion': str(hab), 'categoria': 'Bebidas', 'monto': f'{monto:.0f}'}
+        status, _ = self._pedir('POST /cargar', 'POST', '/cargar', datos)
+        if status is not None and status < 500:
+            self.cargados[monto] = hab
+
+    def _eliminar(self):
+        pendientes = [m for m in self.cargados if m not in self.eliminados]
+        if not pendientes:
+            return self._consumo()
+        monto = self.rng.choice(pendientes)
+        hab = self.cargados[monto]
+        # Solo esta terminal elimina en sus habitaciones y las cargas nuevas van
+        # al final: el índice no cambia entre la búsqueda y el pedido
+        indice = posicion_en_habitacion(self.archivo_consumos, hab, monto)
+        if indice is None:
+            return
+        status, _ = self._pedir('GET /habitacion/<n>/eliminar/<i>', 'GET', f'/habitacion/{hab}/eliminar/{indice}')
+        if status is not None and status < 500:
+            self.eliminados.add(monto)
+
+    def _walkin(self):
+        if not self.libres:
+            return self._dashboard()
+        hab = self.rng.choice(self.libres)
+        nombre = f'CARGA {self.name} {self.secuencia}'
+        self.secuencia += 1
+        datos = {'habitacion': str(hab), 'nombre': nombre, 'pax': '2', 'noches': '1'}
+        status, destino = self._pedir('POST /reserva-express', 'POST', '/reserva-express', datos)
+        if status is not None:
+            self.walkins.append((nombre, hab, destino.endswith('/dashboard')))
+
+
+def verificar_integridad(directorio, terminales, consumos_iniciales):
+    """
+    Compara los CSV finales con lo que las terminales creen haber hecho.
+
+    Returns:
+        dict con los contadores y la lista de problemas encontrados
+    """
+    problemas = []
+    archivo_consumos = os.path.join(directorio, 'data', 'consumos_diarios.csv')
+    archivo_pasajeros = os.path.join(directorio, 'data', 'pasajeros.csv')
+
+    apariciones = collections.Counter()
+    originales = 0
+    with open(archivo_consumos, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            monto = float(fila['monto'])
+            if monto >= MONTO_BASE:
+                apariciones[monto] += 1
+            else:
+                originales += 1
+
+    cargados = eliminados = 0
+    for terminal in terminales:
+        for monto, hab in terminal.cargados.items():
+            cargados += 1
+            esperado = 0 if monto in terminal.eliminados else 1
+            eliminados += 1 - esperado
+            encontrado = apariciones.pop(monto, 0)
+            if encontrado != esperado:
+                tipo = 'perdido' if encontrado < esperado else 'duplicado o no eliminado'
+                problemas.append(f'consumo {monto:.0f} (hab {hab}, {terminal.name}): {tipo} '
+                                 f'({encontrado} en el archivo, se esperaba {esperado})')
+    for monto, cantidad in apariciones.items():
+        problemas.append(f'consumo {monto:.0f}: {cantidad} fila(s) que ninguna terminal cargó')
+    if originales != consumos_iniciales:
+        problemas.append(f'consumos de la temporada: {originales} de {consumos_iniciales}')
+
+    with open(archivo_pasajeros, newline='', encoding='utf-8') as f:
+        nombres = collections.Counter()
+        habitaciones_walkin = collections.Counter()
+        for fila in csv.DictReader(f):
+            if fila['Apellido y nombre'].startswith('CARGA '):
+                nombres[fila['Apellido y nombre']] += 1
+                habitaciones_walkin[fila['Nro. habitación']] += 1
+
+    aceptados = 0
+    for terminal in terminales:
+        for nombre, hab, aceptado in terminal.walkins:
+            aceptados += aceptado
+            if nombres.get(nombre, 0) != int(aceptado):
+                problemas.append(f'walk-in {nombre} (hab {hab}): {nombres.get(nombre, 0)} fila(s), '
+                                 f'{"aceptado" if aceptado else "rechazado"}')
+    for hab, cantidad in habitaciones_walkin.items():
+        if cantidad > 1:
+            problemas.append(f'habitación {hab} vendida {cantidad} veces por walk-in')
+
+    return {
+        'consumos_cargados': cargados,
+        'consumos_eliminados': eliminados,
+        'walkins_aceptados': aceptados,
+        'problemas': problemas,
+    }
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _levantar_servidor(directorio, hilos):
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, '-c', _SCRIPT_SERVIDOR.format(proyecto=DIR_PROYECTO, puerto=puerto, hilos=hilos)],
+        cwd=directorio, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.perf_counter() + 30
+    while time.perf_counter() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError('el servidor no arrancó (¿waitress instalado?)')
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.2).close()
+            return proceso, puerto
+        except OSError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError('el servidor no respondió a tiempo')
+
+
+def ejecutar(cantidad_terminales, duracion, consumos=20000, modo='cliente', hilos=8,
+             pausa=0.0, semilla=2026, bar=True):
+    """
+    Corre una prueba sobre una temporada generada en un directorio temporal.
+
+    Returns:
+        dict con throughput, percentiles por ruta e integridad
+    """
+    directorio = tempfile.mkdtemp(prefix='bench_carga_')
+    directorio_inicial = os.getcwd()
+    servidor = None
+    try:
+        temporada = generar_temporada(directorio, consumos=consumos, semilla=semilla,
+                                      libres=max(2, cantidad_terminales))
+        os.chdir(directorio)
+
+        from core.dashboard import obtener_habitaciones_ocupadas
+        from core.reserva_express import obtener_habitaciones_disponibles
+        ocupadas = sorted(obtener_habitaciones_ocupadas())
+        libres = obtener_habitaciones_disponibles()
+
+        if modo == 'servidor':
+            servidor, puerto = _levantar_servidor(directorio, hilos)
+            nuevo_cliente = lambda: ClienteHTTP(puerto)
+        else:
+            nuevo_cliente = ClienteFlask
+
+        # Calentamiento fuera del cronómetro (imports, snapshot, cachés)
+        calentamiento = nuevo_cliente()
+        for url in ('/dashboard', f'/habitacion/{ocupadas[0]}', '/reserva-express', '/gestionar-pasajeros'):
+            calentamiento.pedir('GET', url)
+
+        archivo_consumos = os.path.join(directorio, 'data', 'consumos_diarios.csv')
+        inicio = time.perf_counter()
+        fin = inicio + duracion
+        terminales = []
+        for i in range(cantidad_terminales):
+            # Habitaciones repartidas: cada terminal solo elimina en las suyas
+            propias = ocupadas[i::cantidad_terminales] or ocupadas
+            terminales.append(Terminal(i + 1, f'T{i + 1}', nuevo_cliente(), ACCIONES_RECEPCION,
+                                       propias, ocupadas, libres, archivo_consumos, fin, pausa, semilla + i))
+        if bar:
+            terminales.append(Terminal(0, 'BAR', nuevo_cliente(), ACCIONES_BAR, ocupadas, ocupadas,
+                                       libres, archivo_consumos, fin, pausa, semilla + 1000))
+
+        for terminal in terminales:
+            terminal.start()
+        for terminal in terminales:
+            terminal.join()
+        transcurrido = time.perf_counter() - inicio
+
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=10)
+            servidor = None
+
+        por_ruta = collections.defaultdict(list)
+        errores_http = collections.Counter()
+        for terminal in terminales:
+            for ruta, ms, status in terminal.registros:
+                por_ruta[ruta].append(ms)
+                if status >= 500:
+                    errores_http[ruta] += 1
+        excepciones = [e for t in terminales for e in t.errores]
+
+        rutas = {}
+        for ruta, tiempos in sorted(por_ruta.items()):
+            tiempos.sort()
+            rutas[ruta] = {
+                'pedidos': len(tiempos),
+                'por_segundo': round(len(tiempos) / transcurrido, 2),
+                'p50_ms': round(percentil(tiempos, 50), 2),
+                'p95_ms': round(percentil(tiempos, 95), 2),
+                'p99_ms': round(percentil(tiempos, 99), 2),
+                'max_ms': round(tiempos[-1], 2),
+                'errores_5xx': errores_http[ruta],
+            }
+
+        total = sum(r['pedidos'] for r in rutas.values())
+        return {
+            'terminales': cantidad_terminales,
+            'bar': bar,
+            'modo': modo,
+            'duracion_s': round(transcurrido, 2),
+            'temporada': temporada,
+            'pedidos': total,
+            'por_segundo': round(total / transcurrido, 2),
+            'rutas': rutas,
+            'excepciones': excepciones[:20],
+            'integridad': verificar_integridad(directorio, terminales, temporada['consumos']),
+        }
+    finally:
+        if servidor is not None:
+            servidor.kill()
+        os.chdir(directorio_inicial)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def imprimir(resultado):
+    integridad = resultado['integridad']
+    print(f"\n🖥️  {resultado['terminales']} terminal(es){' + bar' if resultado['bar'] else ''} · "
+          f"modo {resultado['modo']} · {resultado['pedidos']} pedidos en {resultado['duracion_s']} s "
+          f"({resultado['por_segundo']} pedidos/s)")
+    for ruta, r in resultado['rutas'].items():
+        print(f"   {ruta:34s} {r['pedidos']:6d} | {r['por_segundo']:7.1f}/s | p50 {r['p50_ms']:8.1f} | "
+              f"p95 {r['p95_ms']:8.1f} | p99 {r['p99_ms']:8.1f} ms | 5xx {r['errores_5xx']}")
+    for ruta, error in resultado['excepciones']:
+        print(f'   ❌ {ruta}: {error}')
+    estado = '✅' if not integridad['problemas'] else '❌'
+    print(f"   {estado} Integridad: {integridad['consumos_cargados']} consumos cargados, "
+          f"{integridad['consumos_eliminados']} eliminados, {integridad['walkins_aceptados']} walk-ins")
+    for problema in integridad['problemas'][:20]:
+        print(f'      - {problema}')
+
+
+def cumple_objetivo(resultado, objetivo_p95_ms=OBJETIVO_P95_MS):
+    """La configuración se sostiene si no hay errores y todas las rutas cumplen el p95."""
+    if resultado['integridad']['problemas'] or resultado['excepciones']:
+        return False
+    return all(r['p95_ms'] <= objetivo_p95_ms and not r['errores_5xx'] for r in resultado['rutas'].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terminales', default='1,2,4,8', help='cantidades de terminales a probar')
+    parser.add_argument('--duracion', type=float, default=20, help='segundos por configuración')
+    parser.add_argument('--consumos', type=int, default=20000, help='consumos iniciales de la temporada')
+    parser.add_argument('--modo', choices=['cliente', 'servidor'], default='cliente')
+    parser.add_argument('--hilos', type=int, default=8, help='hilos del servidor (modo servidor)')
+    parser.add_argument('--pausa', type=float, default=0.0, help='segundos entre pedidos de cada terminal')
+    parser.add_argument('--sin-bar', action='store_true', help='sin la tablet del bar')
+    parser.add_argument('--objetivo-p95', type=float, default=OBJETIVO_P95_MS)
+    parser.add_argument('--semilla', type=int, default=2026)
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    resultados = []
+    for cantidad in [int(t) for t in args.terminales.split(',') if t.strip()]:
+        resultado = ejecutar(cantidad, args.duracion, consumos=args.consumos, modo=args.modo,
+                             hilos=args.hilos, pausa=args.pausa, semilla=args.semilla, bar=not args.sin_bar)
+        imprimir(resultado)
+        resultados.append(resultado)
+
+    print(f'\nObjetivo: p95 <= {args.objetivo_p95:.0f} ms en todas las rutas, sin errores ni pérdidas')
+    sostenidas = []
+    for resultado in resultados:
+        cumple = cumple_objetivo(resultado, args.objetivo_p95)
+        if cumple:
+            sostenidas.append(resultado['terminales'])
+        print(f"   {'✅' if cumple else '❌'} {resultado['terminales']} terminal(es)")
+    if sostenidas:
+        print(f'   Máximo sostenido: {max(sostenidas)} terminal(es)')
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f'\n💾 Resultados guardados en {args.salida}')
+
+    sys.exit(0 if all(not r['integridad']['problemas'] for r in resultados) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Genera una temporada sintética (pasajeros.csv + consumos_diarios.csv) para
+medir el sistema con volúmenes reales de verano.
+
+La temporada se arma habitación por habitación:
+    - estadías de 3 a 7 noches, con días libres según la ocupación pedida
+    - familias con varias habitaciones bajo un mismo voucher (misma fecha)
+    - solo quedan en pasajeros.csv las estadías actuales (egreso >= hoy) y
+      las reservas futuras, como en el rooming real; las que egresan hoy
+      quedan para el checkout masivo
+    - consumos de las estadías en curso, con la mezcla habitual de categorías
+
+El resultado es determinístico para una misma semilla y fecha de referencia.
+
+Uso:
+    python3 -m benchmarks.generar_temporada --destino /tmp/temporada --consumos 100000
+"""
+
+import argparse
+import csv
+import heapq
+import os
+import random
+from datetime import datetime, timedelta
+
+from core import inventario, reloj
+from core.esquema import ESQUEMA_PASAJEROS
+
+COLUMNAS_CONSUMOS = ['fecha', 'habitacion', 'pasajero', 'categoria', 'monto']
+
+# (categoría, peso, montos posibles)
+MEZCLA_CATEGORIAS = [
+    ('Bebidas', 0.60, range(1500, 12001, 500)),
+    ('Map', 0.25, range(8000, 25001, 1000)),
+    ('Estadía', 0.15, range(20000, 60001, 5000)),
+]
+
+# (tipo de habitación, plazas, peso)
+TIPOS_HABITACION = [
+    ('DOBLE MATRIMONIAL', 2, 0.65),
+    ('DOBLE INDIVIDUALES', 2, 0.13),
+    ('TRIPLE INDIVIDUALE', 3, 0.12),
+    ('SINGLE', 1, 0.05),
+    ('CUADRUPLE', 4, 0.05),
+]
+
+NOCHES = [3, 4, 5, 5, 5, 7]
+SEDES = [
+    '17 - MORON', '16 - GRAL. SAN MARTIN', '11 - FLORENCIO VARELA', '29 - LOMAS DE ZAMORA',
+    '20 - MERLO', '8 - BRANDSEN', '3 - LA PLATA', '25 - QUILMES', '12 - LANUS',
+]
+ENTIDADES = ['SUTEBA'] * 8 + ['CTERA', 'INVITADOS', 'G FAMILIAR', 'SIN CARGO']
+SERVICIOS = ['MEDIA PENSION'] * 6 + ['DESAYUNO', 'PENSION COMPLETA']
+APELLIDOS = [
+    'GONZALEZ', 'RODRIGUEZ', 'GOMEZ', 'FERNANDEZ', 'LOPEZ', 'DIAZ', 'MARTINEZ', 'PEREZ',
+    'GARCIA', 'SANCHEZ', 'ROMERO', 'SOSA', 'TORRES', 'ALVAREZ', 'RUIZ', 'RAMIREZ',
+    'FLORES', 'BENITEZ', 'ACOSTA', 'MEDINA', 'HERRERA', 'SUAREZ', 'AGUIRRE', 'GIMENEZ',
+    'GUTIERREZ', 'PEREYRA', 'ROJAS', 'MOLINA', 'CASTRO', 'ORTIZ', 'SILVA', 'NUÑEZ',
+]
+NOMBRES = [
+    'MARIA', 'JUAN', 'CARLOS', 'SILVIA', 'GRACIELA', 'JORGE', 'ANA', 'LUIS', 'PATRICIA',
+    'MARCELA', 'ROBERTO', 'CLAUDIA', 'JOSE', 'LAURA', 'MIGUEL', 'ALICIA', 'SOFIA', 'MATEO',
+    'VALENTINA', 'LUCIA', 'MARTIN', 'GABRIELA', 'DANIEL', 'NORMA', 'ESTELA', 'RAUL',
+]
+
+
+def _fecha(d):
+    return d.strftime('%d/%m/%Y')
+
+
+def _elegir(rng, opciones_con_peso):
+    return rng.choices(opciones_con_peso, weights=[o[-1] for o in opciones_con_peso])[0]
+
+
+def parsear_habitaciones(texto):
+    """
+    Convierte '101-121,222-242,350' en una lista de habitaciones.
+    Sin texto retorna todas las habitaciones del inventario (config/inventario.json).
+    """
+    if not texto:
+        return list(inventario.actual().numeros)
+    habitaciones = []
+    for parte in texto.split(','):
+        parte = parte.strip()
+        if '-' in parte:
+            desde, hasta = parte.split('-')
+            habitaciones.extend(range(int(desde), int(hasta) + 1))
+        elif parte:
+            habitaciones.append(int(parte))
+    return habitaciones
+
+
+def _pasajeros_estadia(rng, voucher, habitacion, tipo, plazas, ingreso, egreso, comun):
+    """Filas de pasajeros.csv para una habitación de una estadía."""
+    pax = rng.choices(range(1, plazas + 1), weights=[1] * (plazas - 1) + [4])[0]
+    filas = []
+    for i in range(pax):
+        edad = rng.randint(25, 85) if i == 0 else rng.randint(3, 80)
+        nacimiento = ingreso - timedelta(days=edad * 365 + rng.randint(0, 364))
+        fila = dict.fromkeys(ESQUEMA_PASAJEROS, '')
+        fila.update(comun)
+        fila.update({
+            'Nro. habitación': habitacion,
+            'Tipo habitación': tipo,
+            'Cantidad plazas': plazas,
+            'Voucher': voucher,
+            'Fecha de ingreso': _fecha(ingreso),
+            'Fecha de egreso': _fecha(egreso),
+            'Plazas ocupadas': pax,
+            'Tipo documento': 'DNI',
+            'Nro. doc.': rng.randint(5_000_000, 48_000_000),
+            'Apellido y nombre': f'{rng.choice(APELLIDOS)} {rng.choice(NOMBRES)}',
+            'Edad': edad,
+            'Fecha viaje': _fecha(ingreso),
+            'Email': rng.choice(['', 'No informado']),
+            'Estado': 'O',
+            'Fecha de nacimiento': _fecha(nacimiento),
+            'Teléfono': 0,
+        })
+        filas.append(fila)
+    return filas
+
+
+def generar_temporada(destino, habitaciones=None, consumos=10000, dias=30, hoy=None,
+                      semilla=2026, ocupacion=0.9, prob_familia=0.15, libres=2):
+    """
+    Genera destino/data/pasajeros.csv y destino/data/consumos_diarios.csv.
+
+    Args:
+        destino: directorio de trabajo (se crea data/ adentro)
+        habitaciones: lista de habitaciones (por defecto todas las del inventario)
+        consumos: cantidad de consumos a generar para las estadías en curso
+        dias: largo de la temporada (la mitad antes de hoy, la mitad después)
+        hoy: fecha de referencia (por defecto la del reloj del sistema)
+        semilla: semilla del generador aleatorio
+        ocupacion: fracción aproximada de noches vendidas
+        prob_familia: probabilidad de que una estadía sume habitaciones vecinas
+        libres: habitaciones que quedan vacías hoy (para walk-ins)
+
+    Returns:
+        dict con el resumen de lo generado
+    """
+    rng = random.Random(semilla)
+    hoy = hoy or reloj.hoy()
+    habitaciones = sorted(habitaciones or parsear_habitaciones(None))
+    inicio = hoy - timedelta(days=dias // 2)
+    fin = inicio + timedelta(days=dias)
+
+    tipos = {h: _elegir(rng, TIPOS_HABITACION) for h in habitaciones}
+    posicion = {h: i for i, h in enumerate(habitaciones)}
+
+    # Cada habitación tiene un cursor: primer día libre. Se asigna siempre
+    # la habitación que se libera antes, así las estadías quedan ordenadas.
+    cola = [(inicio - timedelta(days=rng.randint(0, 6)), h) for h in habitaciones]
+    heapq.heapify(cola)
+    libre_desde = {h: d for d, h in cola}
+
+    estadias = []  # (voucher, [habitaciones], ingreso, egreso)
+    voucher = 30_000_000
+    while cola:
+        ingreso, habitacion = heapq.heappop(cola)
+        if ingreso != libre_desde[habitacion]:
+            continue  # cursor viejo: la habitación fue tomada por una familia
+        if ingreso > fin:
+            continue
+        if rng.random() > ocupacion:
+            libre_desde[habitacion] = ingreso + timedelta(days=rng.randint(1, 3))
+            heapq.heappush(cola, (libre_desde[habitacion], habitacion))
+            continue
+
+        egreso = ingreso + timedelta(days=rng.choice(NOCHES))
+        grupo = [habitacion]
+        if rng.random() < prob_familia:
+            # Familia: vecinas libres para la misma fecha
+            for vecina in habitaciones[posicion[habitacion] + 1:posicion[habitacion] + 3]:
+                if libre_desde[vecina] <= ingreso and abs(vecina - habitacion) <= 2:
+                    grupo.append(vecina)
+        voucher += rng.randint(1, 97)
+        estadias.append((str(voucher), grupo, ingreso, egreso))
+
+        for h in grupo:
+            # El día de egreso la habitación ya puede volver a venderse
+            libre_desde[h] = egreso
+            heapq.heappush(cola, (egreso, h))
+
+    # Habitaciones vacías hoy: se quitan sus estadías en curso (conservan las futuras)
+    vacias = set(rng.sample(habitaciones, min(libres, len(habitaciones))))
+    estadias = [
+        (v, [h for h in grupo if ingreso > hoy or h not in vacias], ingreso, egreso)
+        for v, grupo, ingreso, egreso in estadias
+    ]
+    estadias = [e for e in estadias if e[1]]
+
+    filas_pasajeros = []
+    en_curso = []  # (habitación, titular, ingreso)
+    for voucher, grupo, ingreso, egreso in estadias:
+        if egreso < hoy:
+            continue  # ya hizo checkout: no está en el rooming
+        comun = {
+            'Cód. Alojamiento': 900,
+            'Descripción': 'HOTEL 23 DE MAYO',
+            'Sede': rng.choice(SEDES),
+            'Entidad': rng.choice(ENTIDADES),
+            'Servicios': rng.choice(SERVICIOS),
+            'Paquete': f'{ingreso.day % 9 + 1}. MDP VERANO {ingreso:%d-%m}',
+            'Transporte': rng.choice(['Sin Transporte'] * 4 + ['Micro']),
+            'Usuario': rng.choice(['alsarlo'] * 9 + ['asarlo']),
+        }
+        for h in grupo:
+            tipo, plazas, _ = tipos[h]
+            filas = _pasajeros_estadia(rng, voucher, h, tipo, plazas, ingreso, egreso, comun)
+            filas_pasajeros.extend(filas)
+            if ingreso <= hoy:
+                titular = max(filas, key=lambda f: f['Edad'])
+                en_curso.append((h, titular['Apellido y nombre'], ingreso))
+
+    filas_consumos = []
+    if en_curso and consumos:
+        ahora = datetime.combine(hoy, reloj.ahora().time()).replace(second=0, microsecond=0)
+        pesos = [c[1] for c in MEZCLA_CATEGORIAS]
+        for _ in range(consumos):
+            habitacion, titular, ingreso = rng.choice(en_curso)
+            desde = datetime.combine(ingreso, datetime.min.time()).replace(hour=8)
+            minutos = max(int((ahora - desde).total_seconds() // 60), 1)
+            categoria, _, montos = rng.choices(MEZCLA_CATEGORIAS, weights=pesos)[0]
+            filas_consumos.append({
+                'fecha': (desde + timedelta(minutes=rng.randrange(minutos))).strftime('%d/%m/%Y %H:%M'),
+                'habitacion': habitacion,
+                'pasajero': titular,
+                'categoria': categoria,
+                'monto': float(rng.choice(montos)),
+            })
+        filas_consumos.sort(key=lambda c: datetime.strptime(c['fecha'], '%d/%m/%Y %H:%M'))
+
+    directorio = os.path.join(destino, 'data')
+    os.makedirs(directorio, exist_ok=True)
+    with open(os.path.join(directorio, 'pasajeros.csv'), 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=list(ESQUEMA_PASAJEROS), lineterminator='\n')
+        escritor.writeheader()
+        escritor.writerows(filas_pasajeros)
+    with open(os.path.join(directorio, 'consumos_diarios.csv'), 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUMNAS_CONSUMOS, lineterminator='\n')
+        escritor.writeheader()
+        escritor.writerows(filas_consumos)
+
+    vigentes = [e for e in estadias if e[3] >= hoy]
+    return {
+        'hoy': _fecha(hoy),
+        'habitaciones': len(habitaciones),
+        'pasajeros': len(filas_pasajeros),
+        'estadias': len(vigentes),
+        'familias': sum(1 for e in vigentes if len(e[1]) > 1),
+        'reservas_futuras': sum(1 for e in vigentes if e[2] > hoy),
+        'checkouts_hoy': sum(len(e[1]) for e in vigentes if e[3] == hoy),
+        'libres_hoy': len(vacias),
+        'habitaciones_en_curso': len(en_curso),
+        'consumos': len(filas_consumos),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--destino', required=True, help='directorio donde se crea data/')
+    parser.add_argument('--consumos', type=int, default=10000)
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--habitaciones', help="ej. '101-121,222-242' (por defecto, todas)")
+    parser.add_argument('--hoy', help='fecha de referencia DD/MM/YYYY (por defecto, hoy)')
+    parser.add_argument('--semilla', type=int, default=2026)
+    parser.add_argument('--ocupacion', type=float, default=0.9)
+    parser.add_argument('--familias', type=float, default=0.15, help='probabilidad de familia multi-habitación')
+    parser.add_argument('--libres', type=int, default=2, help='habitaciones vacías hoy')
+    args = parser.parse_args()
+
+    resumen = generar_temporada(
+        args.destino,
+        habitaciones=parsear_habitaciones(args.habitaciones),
+        consumos=args.consumos,
+        dias=args.dias,
+        hoy=datetime.strptime(args.hoy, '%d/%m/%Y').date() if args.hoy else None,
+        semilla=args.semilla,
+        ocupacion=args.ocupacion,
+        prob_familia=args.familias,
+        libres=args.libres,
+    )
+    print(f"✅ Temporada generada en {os.path.join(args.destino, 'data')}")
+    for clave, valor in resumen.items():
+        print(f'   {clave}: {valor}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Mide cada ruta y las funciones principales del sistema con temporadas
+sintéticas de distintos tamaños (ver benchmarks/generar_temporada.py).
+
+Para cada tamaño se genera una temporada en un directorio temporal y se
+mide con el cliente de pruebas de Flask (sin red):
+    - rutas de lectura: dashboard, ficha, checkout, cierres, exportaciones...
+    - rutas de escritura: carga de consumos, checkout masivo, walk-in; antes de
+      cada repetición se restauran los CSV originales (fuera del cronómetro)
+    - funciones del core: obtener_datos_dashboard, obtener_resumen_habitacion,
+      crear_reserva_express
+
+Por cada medición se guarda la primera ejecución (caché fría) y la mediana,
+mínimo y máximo de las repeticiones. Los resultados se guardan en JSON para
+comparar versiones:
+
+    python3 -m benchmarks.rutas --salida antes.json
+    (cambios)
+    python3 -m benchmarks.rutas --salida despues.json --comparar antes.json
+
+Uso:
+    python3 -m benchmarks.rutas [--tamanos 10000,50000,200000] [--repeticiones 5]
+"""
+
+import argparse
+import collections
+import csv
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generar_temporada import generar_temporada
+
+DIR_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAMANOS = [10_000, 50_000, 200_000]
+
+# Una mediana que empeora más que esto respecto de la corrida anterior se marca
+UMBRAL_REGRESION = 1.20
+
+ARCHIVOS = ('pasajeros.csv', 'consumos_diarios.csv')
+
+
+def version_codigo():
+    """Commit actual del repositorio (vacío si no es un repo git)."""
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIR_PROYECTO,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def esperar_tarea(respuesta):
+    """
+    Si la ruta encoló una tarea en segundo plano (redirige a /tareas/<id>),
+    espera a que termine. Un reporte en caché redirige directo a
+    /tareas/<id>/descargar y ya está terminado.
+
+    Returns:
+        estado final de la tarea, o el código HTTP si no era una tarea
+    """
+    from core import tareas
+
+    destino = respuesta.headers.get('Location', '')
+    if respuesta.status_code != 302 or not destino.startswith('/tareas/'):
+        return respuesta.status_code
+    return tareas.esperar(destino.split('/')[2])['estado']
+
+
+def cronometrar(accion, repeticiones, antes=None):
+    """
+    Ejecuta accion() varias veces y mide cada ejecución.
+
+    Args:
+        accion: función sin argumentos; su retorno se guarda como 'resultado'
+        repeticiones: cantidad de ejecuciones
+        antes: función a ejecutar antes de cada repetición (no se mide)
+
+    Returns:
+        dict con primera_ms, mediana_ms, min_ms, max_ms y resultado
+    """
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        if antes is not None:
+            antes()
+        inicio = time.perf_counter()
+        resultado = accion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'primera_ms': round(tiempos[0], 3),
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'min_ms': round(min(tiempos), 3),
+        'max_ms': round(max(tiempos), 3),
+        'repeticiones': repeticiones,
+        'resultado': resultado,
+    }
+
+
+class Temporada:
+    """Temporada generada en un directorio temporal, con copia para restaurar."""
+
+    def __init__(self, consumos, semilla=2026):
+        self.directorio = tempfile.mkdtemp(prefix='bench_rutas_')
+        self.resumen = generar_temporada(self.directorio, consumos=consumos, semilla=semilla)
+        self.original = os.path.join(self.directorio, 'original')
+        os.makedirs(self.original)
+        for nombre in ARCHIVOS:
+            shutil.copy2(os.path.join(self.directorio, 'data', nombre), self.original)
+
+        # Habitación con más consumos: el peor caso para fichas y checkout
+        with open(os.path.join(self.original, 'consumos_diarios.csv'), newline='', encoding='utf-8') as f:
+            cantidades = collections.Counter(int(fila['habitacion']) for fila in csv.DictReader(f))
+        self.habitacion = cantidades.most_common(1)[0][0]
+
+    def restaurar(self):
+        """Vuelve los CSV al estado generado (las cachés lo detectan por la firma)."""
+        for nombre in ARCHIVOS:
+            shutil.copy(os.path.join(self.original, nombre), os.path.join(self.directorio, 'data', nombre))
+
+    def eliminar(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def medir_temporada(temporada, repeticiones):
+    """
+    Mide rutas y funciones sobre una temporada (el directorio actual debe ser
+    el de la temporada: la aplicación usa rutas relativas data/...).
+
+    Returns:
+        dict nombre -> mediciones (ver cronometrar)
+    """
+    from app import app
+    from core import cache_exportes
+    from core.consumos import obtener_resumen_habitacion
+    from core.dashboard import obtener_datos_dashboard, obtener_habitaciones_ocupadas
+    from core.reserva_express import crear_reserva_express, obtener_habitaciones_disponibles
+
+    cliente = app.test_client()
+    hab = temporada.habitacion
+
+    def get(url):
+        return lambda: cliente.get(url).status_code
+
+    def get_tarea(url):
+        # Cierres y exportaciones: desde el pedido hasta el archivo listo
+        return lambda: esperar_tarea(cliente.get(url))
+
+    def post(url, datos):
+        return lambda: cliente.post(url, data=datos).status_code
+
+    def libre():
+        disponibles = obtener_habitaciones_disponibles()
+        return disponibles[0] if disponibles else None
+
+    lectura = [
+        ('GET /dashboard', get('/dashboard')),
+        ('GET /habitacion/<n>', get(f'/habitacion/{hab}')),
+        ('GET /checkout/<n>', get(f'/checkout/{hab}')),
+        ('GET /checkout-masivo', get('/checkout-masivo')),
+        ('GET /cierre-dia', get_tarea('/cierre-dia')),
+        ('GET /cierre-xlsx', get_tarea('/cierre-xlsx')),
+        ('GET /generar-salidas-checkouts', get_tarea('/generar-salidas-checkouts')),
+        ('GET /ver-consumos', get('/ver-consumos')),
+        ('GET /gestionar-pasajeros', get('/gestionar-pasajeros')),
+        ('GET /reserva-express', get('/reserva-express')),
+        ('GET /cambiar-habitacion/<n>', get(f'/cambiar-habitacion/{hab}')),
+        ('obtener_datos_dashboard', lambda: len(obtener_datos_dashboard()) and 'ok'),
+        ('obtener_resumen_habitacion',
+         lambda: obtener_resumen_habitacion(hab, obtener_habitaciones_ocupadas()[hab]) and 'ok'),
+    ]
+    escritura = [
+        ('POST /habitacion/<n>/agregar',
+         post(f'/habitacion/{hab}/agregar', {'categoria': 'Bebidas', 'monto': '3500'})),
+        ('POST /cargar', post('/cargar', {'habitacion': str(hab), 'categoria': 'Map', 'monto': '12000'})),
+        ('POST /checkout-masivo/confirmar', post('/checkout-masivo/confirmar', {})),
+        ('POST /reserva-express',
+         lambda: cliente.post('/reserva-express', data={'habitacion': str(libre()), 'nombre': 'BENCH', 'pax': '2'}).status_code),
+        ('crear_reserva_express', lambda: crear_reserva_express(libre(), 'BENCH', 2)[1]),
+    ]
+
+    # Los reportes repetidos salen de core/cache_exportes.py; sin caché se
+    # mide la generación completa
+    sin_cache = [
+        ('GET /cierre-dia (sin caché)', get_tarea('/cierre-dia')),
+        ('GET /cierre-xlsx (sin caché)', get_tarea('/cierre-xlsx')),
+        ('GET /generar-salidas-checkouts (sin caché)', get_tarea('/generar-salidas-checkouts')),
+    ]
+
+    def vaciar_cache():
+        cache_exportes.vaciar(os.path.join('data', 'consumos_diarios.csv'))
+
+    mediciones = {}
+    for nombre, accion in lectura:
+        mediciones[nombre] = cronometrar(accion, repeticiones)
+    for nombre, accion in sin_cache:
+        mediciones[nombre] = cronometrar(accion, repeticiones, antes=vaciar_cache)
+    for nombre, accion in escritura:
+        mediciones[nombre] = cronometrar(accion, repeticiones, antes=temporada.restaurar)
+    temporada.restaurar()
+    return mediciones
+
+
+def medir(tamanos, repeticiones, semilla=2026):
+    """
+    Returns:
+        dict serializable a JSON con los resultados de todos los tamaños
+    """
+    resultados = {
+        'version': version_codigo(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'repeticiones': repeticiones,
+        'tamanos': {},
+    }
+    directorio_inicial = os.getcwd()
+    for consumos in tamanos:
+        temporada = Temporada(consumos, semilla=semilla)
+        try:
+            os.chdir(temporada.directorio)
+            resultados['tamanos'][str(consumos)] = {
+                'temporada': temporada.resumen,
+                'mediciones': medir_temporada(temporada, repeticiones),
+            }
+        finally:
+            os.chdir(directorio_inicial)
+            temporada.eliminar()
+    return resultados
+
+
+def imprimir(resultados, anteriores=None):
+    """Muestra una tabla por tamaño; con anteriores, agrega la variación."""
+    regresiones = 0
+    for tamano, datos in resultados['tamanos'].items():
+        temporada = datos['temporada']
+        print(f"\n📊 {int(tamano):,} consumos · {temporada['pasajeros']} pasajeros · "
+              f"{temporada['habitaciones_en_curso']} habitaciones en curso")
+        previas = (anteriores or {}).get('tamanos', {}).get(tamano, {}).get('mediciones', {})
+        for nombre, m in datos['mediciones'].items():
+            linea = (f"   {nombre:34s} mediana {m['mediana_ms']:9.1f} ms | "
+                     f"primera {m['primera_ms']:9.1f} ms | {m['resultado']}")
+            if nombre in previas and previas[nombre]['mediana_ms'] > 0:
+                razon = m['mediana_ms'] / previas[nombre]['mediana_ms']
+                marca = '⚠️ ' if razon > UMBRAL_REGRESION else ''
+                regresiones += razon > UMBRAL_REGRESION
+                linea += f" | {marca}x{razon:.2f} vs {anteriores.get('version') or 'anterior'}"
+            print(linea)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', default=','.join(str(t) for t in TAMANOS),
+                        help='cantidades de consumos separadas por coma')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--semilla', type=int, default=2026)
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar')
+    args = parser.parse_args()
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)
+
+    tamanos = [int(t) for t in args.tamanos.split(',') if t.strip()]
+    resultados = medir(tamanos, args.repeticiones, semilla=args.semilla)
+    regresiones = imprimir(resultados, anteriores)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f'\n💾 Resultados guardados en {args.salida}')
+    if anteriores is not None:
+        print(f'\n{"⚠️" if regresiones else "✅"} {regresiones} regresión(es) '
+              f'(mediana > x{UMBRAL_REGRESION:.2f})')
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Simula una temporada completa día por día moviendo el reloj del sistema
+(core/reloj.py), sobre una temporada sintética en un directorio temporal.
+
+Cada día simulado:
+    1. 07:00  checkout masivo de las habitaciones con egreso hoy
+    2. 08:00  ingresos del día (reservas con ingreso hoy) y dashboard
+    3. 10:00  walk-ins en habitaciones libres
+    4. 12:00  consumos del día (bar y recepción) por /cargar
+    5. 23:00  cargo de estadía de la noche a cada habitación que pernocta
+    6. 23:30  cierres: consulta CSV, salidas XLSX, planilla de checkouts
+
+Se mide cada paso y, al final de cada día, se verifica que los totales por
+habitación del CSV y del snapshot coincidan con lo que se cargó (menos lo
+que se cobró en los checkouts). Al final se comparan los primeros y los
+últimos días para detectar pasos que se degradan a medida que avanza la
+temporada.
+
+Uso:
+    python3 -m benchmarks.simular_temporada --dias 30 --consumos-dia 200
+"""
+
+import argparse
+import collections
+import csv
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.generar_temporada import generar_temporada
+from benchmarks.rutas import esperar_tarea
+from core import reloj
+
+# Un paso cuya mediana en los últimos días supera a la de los primeros por
+# este factor se reporta como degradación
+UMBRAL_DEGRADACION = 2.0
+
+TARIFA_NOCHE_POR_PLAZA = 25000.0
+
+
+def _a_las(dia, hora, minuto=0):
+    return datetime.combine(dia, datetime.min.time()).replace(hour=hora, minute=minuto)
+
+
+class Simulacion:
+    """Estado de una temporada simulada: cliente, libro de totales y mediciones."""
+
+    def __init__(self, directorio, semilla):
+        from app import app
+
+        self.directorio = directorio
+        self.cliente = app.test_client()
+        self.rng = random.Random(semilla)
+        self.esperado = collections.defaultdict(float)  # habitación -> total esperado
+
+    def _post(self, url, datos):
+        respuesta = self.cliente.post(url, data=datos)
+        # Sin seguir la redirección los flash se acumulan en la sesión
+        self.cliente.delete_cookie('session')
+        return respuesta.status_code, respuesta.headers.get('Location', '')
+
+    def checkout_masivo(self):
+        from core.dashboard import obtener_habitaciones_checkout
+
+        salen = obtener_habitaciones_checkout()
+        self._post('/checkout-masivo/confirmar', {})
+        # Los consumos de las habitaciones que salen se consideran cobrados
+        for hab in salen:
+            self.esperado.pop(hab, None)
+        return len(salen)
+
+    def ingresos(self):
+        from core.dashboard import obtener_habitaciones_ocupadas
+
+        self.cliente.get('/dashboard')
+        hoy = reloj.fecha_hoy()
+        return sum(1 for datos in obtener_habitaciones_ocupadas().values() if datos.ingreso == hoy)
+
+    def walkins(self, cantidad):
+        from core.reserva_express import obtener_habitaciones_disponibles
+
+        aceptados = 0
+        for i in range(cantidad):
+            libres = obtener_habitaciones_disponibles()
+            if not libres:
+                break
+            hab = self.rng.choice(libres)
+            _, destino = self._post('/reserva-express', {
+                'habitacion': str(hab), 'nombre': f'WALKIN {reloj.ahora():%d%m} {i}',
+                'pax': str(self.rng.randint(1, 2)), 'noches': str(self.rng.randint(1, 3)),
+            })
+            aceptados += destino.endswith('/dashboard')
+        return aceptados
+
+    def consumos(self, cantidad, tiempos):
+        from core.dashboard import obtener_habitaciones_ocupadas
+
+        ocupadas = sorted(obtener_habitaciones_ocupadas())
+        if not ocupadas:
+            return 0
+        for _ in range(cantidad):
+            hab = self.rng.choice(ocupadas)
+            categoria = self.rng.choices(['Bebidas', 'Map'], weights=[70, 30])[0]
+            monto = float(self.rng.randrange(1500, 25001, 500))
+            inicio = time.perf_counter()
+            self._post('/cargar', {'habitacion': str(hab), 'categoria': categoria, 'monto': f'{monto:.0f}'})
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            self.esperado[hab] += monto
+        return cantidad
+
+    def cargos_noche(self):
+        from core.dashboard import obtener_habitaciones_ocupadas
+
+        hoy = reloj.hoy()
+        cargos = 0
+        for hab, datos in sorted(obtener_habitaciones_ocupadas().items()):
+            try:
+                egreso = datetime.strptime(datos.egreso, '%d/%m/%Y').date()
+            except ValueError:
+                continue
+            if egreso <= hoy:
+                continue  # no pernocta
+            monto = TARIFA_NOCHE_POR_PLAZA * max(datos.plazas, 1)
+            self._post(f'/habitacion/{hab}/agregar', {'categoria': 'Estadía', 'monto': f'{monto:.0f}'})
+            self.esperado[hab] += monto
+            cargos += 1
+        return cargos
+
+    def cierres(self, tiempos):
+        for ruta in ('/cierre-dia', '/cierre-xlsx', '/generar-salidas-checkouts'):
+            inicio = time.perf_counter()
+            esperar_tarea(self.cliente.get(ruta))
+            tiempos[ruta] = (time.perf_counter() - inicio) * 1000
+
+    def verificar(self):
+        """
+        Compara los totales esperados con el CSV y con el snapshot.
+
+        Returns:
+            lista de diferencias (vacía si todo coincide)
+        """
+        from core.consumos import obtener_total_consumos
+        from core.dinero import a_pesos
+
+        en_csv = collections.defaultdict(float)
+        archivo = os.path.join(self.directorio, 'data', 'consumos_diarios.csv')
+        with open(archivo, newline='', encoding='utf-8') as f:
+            for fila in csv.DictReader(f):
+                en_csv[int(float(fila['habitacion']))] += float(fila['monto'])
+
+        diferencias = []
+        for hab in sorted(set(en_csv) | set(self.esperado)):
+            esperado = self.esperado.get(hab, 0.0)
+            if abs(en_csv.get(hab, 0.0) - esperado) > 0.005:
+                diferencias.append(f'hab {hab}: CSV {en_csv.get(hab, 0.0):.2f} != esperado {esperado:.2f}')
+            snapshot = a_pesos(obtener_total_consumos(hab)['total'])
+            if abs(snapshot - esperado) > 0.005:
+                diferencias.append(f'hab {hab}: snapshot {snapshot:.2f} != esperado {esperado:.2f}')
+        return diferencias
+
+
+def _contar_filas(archivo):
+    with open(archivo, newline='', encoding='utf-8') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def simular(dias=30, consumos_dia=200, walkins_dia=2, inicio=None, semilla=2026):
+    """
+    Returns:
+        dict con la temporada generada y las mediciones de cada día
+    """
+    inicio = inicio or reloj.hoy()
+    directorio = tempfile.mkdtemp(prefix='bench_temporada_')
+    directorio_inicial = os.getcwd()
+    try:
+        # Reservas para toda la simulación: la temporada generada se extiende
+        # `dias` hacia adelante desde el primer día
+        temporada = generar_temporada(directorio, consumos=0, dias=dias * 2, hoy=inicio, semilla=semilla)
+        os.chdir(directorio)
+        simulacion = Simulacion(directorio, semilla)
+
+        registro = []
+        for numero in range(dias):
+            dia = inicio + timedelta(days=numero)
+            pasos = {}
+            datos_dia = {'dia': dia.strftime('%d/%m/%Y'), 'pasos': pasos}
+
+            def medir(nombre, hora, funcion, *args):
+                reloj.fijar(_a_las(dia, hora))
+                t0 = time.perf_counter()
+                resultado = funcion(*args)
+                pasos[nombre] = (time.perf_counter() - t0) * 1000
+                return resultado
+
+            tiempos_consumos = []
+            datos_dia['checkouts'] = medir('checkout_masivo', 7, simulacion.checkout_masivo)
+            datos_dia['ingresos'] = medir('ingresos_dashboard', 8, simulacion.ingresos)
+            datos_dia['walkins'] = medir('walkins', 10, simulacion.walkins, walkins_dia)
+            datos_dia['consumos'] = medir('consumos', 12, simulacion.consumos, consumos_dia, tiempos_consumos)
+            datos_dia['cargos_noche'] = medir('cargos_noche', 23, simulacion.cargos_noche)
+            reloj.fijar(_a_las(dia, 23, 30))
+            simulacion.cierres(pasos)
+
+            if tiempos_consumos:
+                tiempos_consumos.sort()
+                datos_dia['consumo_p50_ms'] = statistics.median(tiempos_consumos)
+                datos_dia['consumo_p95_ms'] = tiempos_consumos[int(len(tiempos_consumos) * 0.95) - 1]
+            datos_dia['filas_pasajeros'] = _contar_filas(os.path.join(directorio, 'data', 'pasajeros.csv'))
+            datos_dia['filas_consumos'] = _contar_filas(os.path.join(directorio, 'data', 'consumos_diarios.csv'))
+            datos_dia['diferencias'] = simulacion.verificar()
+            registro.append(datos_dia)
+            imprimir_dia(datos_dia)
+
+        return {'temporada': temporada, 'dias': registro}
+    finally:
+        reloj.restablecer()
+        os.chdir(directorio_inicial)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def imprimir_dia(d):
+    estado = '✅' if not d['diferencias'] else f"❌ {len(d['diferencias'])} diferencia(s)"
+    pasos = ' | '.join(f'{nombre.strip("/")} {ms:.0f}' for nombre, ms in d['pasos'].items())
+    print(f"{d['dia']}  pax {d['filas_pasajeros']:4d}  consumos {d['filas_consumos']:6d}  "
+          f"in {d['ingresos']:2d} out {d['checkouts']:2d} walk-in {d['walkins']}  "
+          f"p95 consumo {d.get('consumo_p95_ms', 0):6.1f} ms  {estado}")
+    print(f'            ms: {pasos}')
+    for diferencia in d['diferencias'][:5]:
+        print(f'            - {diferencia}')
+
+
+def degradaciones(registro, ventana=5):
+    """
+    Compara la mediana de cada paso en los primeros y los últimos días.
+
+    Returns:
+        lista de (paso, mediana_inicio_ms, mediana_fin_ms, factor)
+    """
+    if len(registro) < 2 * ventana:
+        ventana = max(len(registro) // 2, 1)
+    primeros, ultimos = registro[:ventana], registro[-ventana:]
+    resultado = []
+    for paso in registro[0]['pasos']:
+        antes = statistics.median(d['pasos'][paso] for d in primeros)
+        despues = statistics.median(d['pasos'][paso] for d in ultimos)
+        resultado.append((paso, antes, despues, despues / antes if antes else 0.0))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--consumos-dia', type=int, default=200)
+    parser.add_argument('--walkins-dia', type=int, default=2)
+    parser.add_argument('--inicio', help='primer día DD/MM/YYYY (por defecto, hoy)')
+    parser.add_argument('--semilla', type=int, default=2026)
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    inicio = datetime.strptime(args.inicio, '%d/%m/%Y').date() if args.inicio else None
+    t0 = time.perf_counter()
+    resultado = simular(args.dias, args.consumos_dia, args.walkins_dia, inicio, args.semilla)
+    print(f'\n⏱️  {args.dias} días simulados en {time.perf_counter() - t0:.1f} s')
+
+    print('\nEvolución de cada paso (mediana primeros días -> últimos días):')
+    for paso, antes, despues, factor in degradaciones(resultado['dias']):
+        marca = '⚠️ ' if factor > UMBRAL_DEGRADACION else '   '
+        print(f'   {marca}{paso:28s} {antes:8.1f} ms -> {despues:8.1f} ms  (x{factor:.2f})')
+
+    con_diferencias = [d['dia'] for d in resultado['dias'] if d['diferencias']]
+    if con_diferencias:
+        print(f"\n❌ Totales inconsistentes en {len(con_diferencias)} día(s): {', '.join(con_diferencias)}")
+    else:
+        print('\n✅ Totales consistentes todos los días (CSV y snapshot)')
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2, default=str)
+        print(f'💾 Resultados guardados en {args.salida}')
+
+    sys.exit(1 if con_diferencias else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+Auditoría nocturna: las tareas de cierre del turno noche como un solo
+pipeline, en un solo proceso (ver auditoria_nocturna.py).
+
+Antes el turno noche las hacía ruta por ruta: cargos de estadía,
+/cierre-dia, /cierre-xlsx, /generar-salidas-checkouts y respaldos, y cada
+una volvía a cargar los CSV. Acá:
+
+- Cada etapa declara de qué etapas depende (ETAPAS). Una etapa arranca
+  apenas terminan las suyas, y las que no dependen entre sí (las tres
+  planillas y el snapshot) corren en paralelo.
+- Los CSV se leen una sola vez, en la etapa 'carga' (caché en memoria de
+  core/datos.py); las exportaciones de core/exportes.py los toman de ahí.
+- Las planillas se guardan también en core/cache_exportes.py con los
+  mismos parámetros que usan las rutas: si a la mañana se piden desde el
+  navegador y los CSV no cambiaron, se descargan sin volver a generarlas.
+- Las escrituras usan los mismos bloqueos y escrituras atómicas que el
+  servidor: se puede correr con el servidor andando o parado.
+- Los cargos de estadía no se duplican: una habitación que ya tiene el
+  cargo de esa noche no recibe otro (la auditoría se puede volver a correr).
+
+Una etapa que falla no detiene a las que no dependen de ella; las que sí
+dependen quedan omitidas.
+"""
+
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from core import dinero, exportes, inventario, metricas, reloj
+from core.datos import a_entero, bloqueo, guardar_filas, leer_csv, leer_encabezado, leer_filas
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+DIR_BACKUPS = inventario.DIR_BACKUPS
+DIR_AUDITORIAS = inventario.RutaDatos('auditorias')
+REPORTE = 'reporte.json'
+MAX_HILOS = 4
+
+# Categoría del cargo de cada noche
+CATEGORIA_CARGO = 'Estadía'
+
+OK = 'ok'
+AVISO = 'aviso'        # no había nada que hacer (sin tarifa, sin checkouts...)
+ERROR = 'error'
+OMITIDA = 'omitida'    # falló una etapa de la que depende
+
+
+class Auditoria:
+    """Parámetros de una corrida y archivos que va generando."""
+
+    def __init__(self, fecha, destino, tarifa=None, solo_del_dia=False,
+                 archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS,
+                 directorio_backups=DIR_BACKUPS):
+        """
+        Args:
+            fecha: noche que se audita (DD/MM/YYYY)
+            destino: directorio de los archivos generados
+            tarifa: centavos por plaza y noche del cargo de estadía (None = no cargar)
+            solo_del_dia: planillas solo con los consumos cargados en `fecha`
+                (como ?fecha= en las rutas); si no, todos los pendientes
+        """
+        self.fecha = fecha
+        self.destino = os.path.abspath(destino)
+        self.tarifa = tarifa
+        self.fecha_consumos = fecha if solo_del_dia else None
+        self.archivo_pasajeros = os.path.abspath(archivo_pasajeros)
+        self.archivo_consumos = os.path.abspath(archivo_consumos)
+        self.directorio_backups = os.path.abspath(directorio_backups)
+        self.archivos = []
+
+
+# --- etapas -----------------------------------------------------------------
+
+def _respaldo(auditoria):
+    from core.respaldos import respaldar
+
+    motivo = f'Auditoría nocturna del {auditoria.fecha}'
+    partes = []
+    for archivo in (auditoria.archivo_pasajeros, auditoria.archivo_consumos):
+        entrada = respaldar(archivo, motivo, tipo='auditoria', directorio=auditoria.directorio_backups)
+        if entrada is not None:
+            partes.append(f"{entrada['archivo']} ({entrada['filas']} filas)")
+    if not partes:
+        raise exportes.SinDatos('No hay CSV para respaldar.')
+    return 'Respaldados: ' + ', '.join(partes)
+
+
+def _cargos(auditoria):
+    """Cargo de estadía de la noche a cada habitación ocupada que pernocta."""
+    from core import categorias
+    from core.dashboard import calcular_habitaciones_ocupadas
+
+    if auditoria.tarifa is None:
+        raise exportes.SinDatos('Sin tarifa por plaza: no se cargan estadías.')
+    if CATEGORIA_CARGO not in categorias.catalogo():
+        raise ValueError(f'La categoría {CATEGORIA_CARGO} no está en el catálogo')
+    if not os.path.exists(auditoria.archivo_pasajeros):
+        raise exportes.SinDatos('No hay pasajeros cargados.')
+
+    noche = datetime.strptime(auditoria.fecha, '%d/%m/%Y')
+    ocupadas = calcular_habitaciones_ocupadas(leer_filas(auditoria.archivo_pasajeros), auditoria.fecha)
+    hora = reloj.ahora().strftime('%H:%M') if auditoria.fecha == reloj.fecha_hoy() else '23:59'
+
+    archivo = auditoria.archivo_consumos
+    with bloqueo(archivo):
+        filas = list(leer_filas(archivo)) if os.path.exists(archivo) else []
+        ya_cargadas = set()
+        for fila in filas:
+            if fila['categoria'] == CATEGORIA_CARGO and fila['fecha'].startswith(auditoria.fecha):
+                try:
+                    ya_cargadas.add(a_entero(fila['habitacion']))
+                except (TypeError, ValueError):
+                    pass
+
+        nuevas = []
+        for hab, estadia in sorted(ocupadas.items()):
+            try:
+                pernocta = datetime.strptime(estadia.egreso, '%d/%m/%Y') > noche
+            except ValueError:
+                pernocta = False
+            if not pernocta or hab in ya_cargadas:
+                continue
+            nuevas.append({
+                'fecha': f'{auditoria.fecha} {hora}',
+                'habitacion': hab,
+                'pasajero': estadia.pasajero,
+                'categoria': CATEGORIA_CARGO,
+                'monto': dinero.a_texto(auditoria.tarifa * max(estadia.plazas, 1)),
+            })
+        if nuevas:
+            # Todos los cargos de la noche en una sola escritura atómica
+            columnas = leer_encabezado(archivo) or exportes.ENCABEZADO_CONSUMOS.split(',')
+            guardar_filas(filas + nuevas, archivo, columnas)
+
+    total = 0
+    for fila in nuevas:
+        centavos = dinero.a_centavos(fila['monto'])
+        metricas.consumo_cargado(archivo, CATEGORIA_CARGO, centavos)
+        total += centavos
+    mensaje = f'{len(nuevas)} habitaciones, ${dinero.formatear(total)}'
+    if ya_cargadas:
+        mensaje += f' ({len(ya_cargadas)} ya tenían el cargo de la noche)'
+    return mensaje
+
+
+def _carga(auditoria):
+    """Lee los CSV una vez: las etapas siguientes los toman de la caché en memoria."""
+    pasajeros = leer_filas(auditoria.archivo_pasajeros) if os.path.exists(auditoria.archivo_pasajeros) else []
+    consumos = []
+    if os.path.exists(auditoria.archivo_consumos):
+        consumos = leer_filas(auditoria.archivo_consumos)
+        leer_csv(auditoria.archivo_consumos)
+    return f'{len(pasajeros)} pasajeros, {len(consumos)} consumos'
+
+
+def _snapshot(auditoria):
+    """Deja publicado el estado de las habitaciones para el primer request de la mañana."""
+    from core.snapshot import obtener_snapshot
+
+    if auditoria.fecha != reloj.fecha_hoy():
+        raise exportes.SinDatos('El snapshot es del día de hoy: no se recalcula para otra fecha.')
+    snapshot = obtener_snapshot(archivo_pasajeros=auditoria.archivo_pasajeros,
+                                archivo_consumos=auditoria.archivo_consumos)
+    return f'Versión {snapshot.version}: {len(snapshot.ocupadas)} habitaciones ocupadas'
+
+
+def _exportar(auditoria, tipo, parametros, extension):
+    """Corre una exportación de core/exportes.py y deja el archivo en el destino."""
+    from core import cache_exportes
+
+    clave = cache_exportes.clave(tipo, parametros)
+    # El temporal conserva la extensión: pandas elige el formato por ella
+    temporal = os.path.join(auditoria.destino, f'.tmp_{tipo}{extension}')
+    try:
+        resultado = getattr(exportes, tipo)(temporal, **parametros)
+        archivo = os.path.join(auditoria.destino, resultado['nombre_descarga'])
+        os.replace(temporal, archivo)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    cache_exportes.guardar(clave, archivo, resultado)
+    auditoria.archivos.append(archivo)
+    return f"{resultado['mensaje']} → {os.path.basename(archivo)}"
+
+
+# Mismos parámetros que /cierre-dia, /cierre-xlsx y /generar-salidas-checkouts
+def _cierre_csv(auditoria):
+    return _exportar(auditoria, 'cierre_csv', {
+        'fecha': auditoria.fecha,
+        'fecha_consumos': auditoria.fecha_consumos,
+        'archivo_consumos': auditoria.archivo_consumos,
+    }, '.csv')
+
+
+def _cierre_xlsx(auditoria):
+    return _exportar(auditoria, 'cierre_xlsx', {
+        'fecha': auditoria.fecha,
+        'fecha_consumos': auditoria.fecha_consumos,
+        'archivo_consumos': auditoria.archivo_consumos,
+    }, '.xlsx')
+
+
+def _salidas_checkouts(auditoria):
+    return _exportar(auditoria, 'salidas_checkouts', {
+        'fecha': auditoria.fecha,
+        'archivo_pasajeros': auditoria.archivo_pasajeros,
+        'archivo_consumos': auditoria.archivo_consumos,
+    }, '.xlsx')
+
+
+# Etapa -> (etapas de las que depende, función, descripción), en orden de presentación
+ETAPAS = {
+    'respaldo': ((), _respaldo, 'Respaldo de pasajeros y consumos'),
+    'cargos': (('respaldo',), _cargos, 'Cargos de estadía de la noche'),
+    'carga': (('cargos',), _carga, 'Lectura de los CSV'),
+    'snapshot': (('carga',), _snapshot, 'Estado de habitaciones'),
+    'cierre_csv': (('carga',), _cierre_csv, 'Consulta de consumos (CSV)'),
+    'cierre_xlsx': (('carga',), _cierre_xlsx, 'Planilla de salidas (Excel)'),
+    'salidas_checkouts': (('carga',), _salidas_checkouts, 'Checkouts del día (Excel)'),
+}
+
+
+# --- pipeline ---------------------------------------------------------------
+
+def _correr(funcion, auditoria):
+    inicio = time.perf_counter()
+    try:
+        estado, mensaje = OK, funcion(auditoria)
+    except exportes.SinDatos as e:
+        estado, mensaje = AVISO, str(e)
+    except Exception as e:
+        estado, mensaje = ERROR, f'Error: {e}'
+    return {'estado': estado, 'mensaje': mensaje, 'ms': (time.perf_counter() - inicio) * 1000}
+
+
+def ejecutar(auditoria, hilos=MAX_HILOS):
+    """
+    Corre las etapas en orden de dependencias, en paralelo las independientes.
+
+    Returns:
+        dict con 'fecha', 'alojamiento', 'inicio', 'total_ms', 'etapas'
+        (etapa -> estado, mensaje, ms) y 'archivos'; también queda en
+        <destino>/reporte.json
+    """
+    os.makedirs(auditoria.destino, exist_ok=True)
+    inicio = time.perf_counter()
+    momento = reloj.ahora()
+    pendientes = dict(ETAPAS)
+    resultados = {}
+    en_curso = {}   # futuro -> etapa
+
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='auditoria') as pool:
+        while pendientes or en_curso:
+            for nombre, (dependencias, funcion, _) in list(pendientes.items()):
+                if any(d not in resultados for d in dependencias):
+                    continue
+                del pendientes[nombre]
+                fallidas = [d for d in dependencias if resultados[d]['estado'] in (ERROR, OMITIDA)]
+                if fallidas:
+                    resultados[nombre] = {'estado': OMITIDA, 'mensaje': f'Falló {", ".join(fallidas)}', 'ms': 0.0}
+                    continue
+                # Cada hilo trabaja con el alojamiento de quien lanzó la auditoría
+                futuro = pool.submit(contextvars.copy_context().run, _correr, funcion, auditoria)
+                en_curso[futuro] = nombre
+            if not en_curso:
+                continue
+            terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                resultados[en_curso.pop(futuro)] = futuro.result()
+
+    reporte = {
+        'fecha': auditoria.fecha,
+        'alojamiento': inventario.actual().codigo,
+        'inicio': momento.strftime('%d/%m/%Y %H:%M:%S'),
+        'total_ms': (time.perf_counter() - inicio) * 1000,
+        'etapas': {nombre: resultados[nombre] for nombre in ETAPAS},
+        'archivos': sorted(os.path.basename(a) for a in auditoria.archivos),
+    }
+    with open(os.path.join(auditoria.destino, REPORTE), 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    return reporte
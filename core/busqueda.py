@@ -0,0 +1,173 @@
+"""
+Búsqueda instantánea de pasajeros por apellido y nombre, documento o
+voucher (/buscar).
+
+El índice se arma una sola vez por versión de pasajeros.csv (misma firma
+que la caché de core/datos.py) y queda en memoria:
+
+- Cada pasajero aporta sus palabras del nombre (sin acentos ni
+  mayúsculas), su documento (solo dígitos) y su voucher.
+- Las palabras van a una lista ordenada: las que empiezan con lo que se
+  tipeó forman un rango contiguo que se ubica con bisect, en O(log n).
+- Con varias palabras ("garcia ma") se parte del rango más chico y se
+  verifica el resto en los candidatos.
+
+Cada resultado trae la habitación, las fechas y el titular de su reserva
+(mayor edad del voucher, ver core/dashboard.py).
+"""
+
+import heapq
+import os
+import threading
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+
+from core import inventario, metricas, reloj
+from core.datos import a_entero, firma_archivo, leer_filas
+from core.modelos import Pasajero
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+LIMITE_RESULTADOS = 20
+MIN_CARACTERES = 2
+
+# Índice por archivo: ruta -> (firma, Indice)
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def normalizar(texto):
+    """'Muñoz, José' -> 'munoz, jose' (sin acentos, minúsculas)."""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).casefold()
+
+
+def _palabras(texto):
+    """Palabras de búsqueda: letras y dígitos, sin signos."""
+    return [p for p in ''.join(c if c.isalnum() else ' ' for c in normalizar(texto)).split() if p]
+
+
+def _ordinal(fecha):
+    try:
+        return datetime.strptime(fecha, '%d/%m/%Y').toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+class Indice:
+    """Índice de prefijos sobre las filas de pasajeros.csv."""
+
+    def __init__(self, filas):
+        from core.dashboard import obtener_titular_por_edad
+
+        # Titular de cada reserva: el mayor del voucher (o de la habitación sin voucher)
+        grupos = {}
+        for fila in filas:
+            voucher = str(fila.get('Voucher', '')).strip()
+            grupos.setdefault(voucher or ('hab', fila['Nro. habitación']), []).append(fila)
+        titulares = {clave: obtener_titular_por_edad(grupo) for clave, grupo in grupos.items()}
+
+        self.registros = []
+        self.palabras_registro = []
+        pares = []
+        for fila in filas:
+            voucher = str(fila.get('Voucher', '')).strip()
+            titular = titulares[voucher or ('hab', fila['Nro. habitación'])]
+            documento = ''.join(c for c in str(fila.get('Nro. doc.', '')) if c.isdigit())
+            palabras = set(_palabras(fila['Apellido y nombre']))
+            palabras.update(_palabras(voucher))
+            if documento:
+                palabras.add(documento)
+
+            id_registro = len(self.registros)
+            self.registros.append(Pasajero(
+                habitacion=a_entero(fila['Nro. habitación']),
+                pasajero=fila['Apellido y nombre'],
+                documento=fila.get('Nro. doc.', ''),
+                voucher=voucher,
+                ingreso=fila['Fecha de ingreso'],
+                egreso=fila['Fecha de egreso'],
+                titular=titular['Apellido y nombre'] if titular else '',
+                ingreso_ordinal=_ordinal(fila['Fecha de ingreso']),
+            ))
+            self.palabras_registro.append(tuple(palabras))
+            pares.extend((palabra, id_registro) for palabra in palabras)
+
+        pares.sort()
+        self.palabras = [palabra for palabra, _ in pares]
+        self.ids = [id_registro for _, id_registro in pares]
+
+        # Posición de cada registro en el orden alfabético (para ordenar resultados sin comparar textos)
+        orden = sorted(range(len(self.registros)),
+                       key=lambda i: (normalizar(self.registros[i].pasajero), self.registros[i].habitacion))
+        self.posicion = [0] * len(orden)
+        for posicion, i in enumerate(orden):
+            self.posicion[i] = posicion
+
+    def _rango(self, prefijo):
+        """Posiciones [desde, hasta) de las palabras que empiezan con `prefijo`."""
+        desde = bisect_left(self.palabras, prefijo)
+        hasta = bisect_left(self.palabras, prefijo + '\U0010ffff', desde)
+        return desde, hasta
+
+    def buscar(self, consulta, hoy=None, limite=LIMITE_RESULTADOS):
+        """
+        Pasajeros cuyas palabras empiezan con cada palabra de `consulta`.
+
+        Args:
+            consulta: texto tipeado (nombre, apellido, DNI o voucher)
+            hoy: fecha de referencia DD/MM/YYYY (por defecto, la del reloj)
+            limite: cantidad máxima de resultados
+
+        Returns:
+            lista de dicts (primero los que están en el hotel, después las
+            reservas futuras; por nombre dentro de cada grupo)
+        """
+        terminos = _palabras(consulta)
+        if not terminos or sum(len(t) for t in terminos) < MIN_CARACTERES:
+            return []
+
+        # El término con menos coincidencias define los candidatos
+        rangos = sorted(((self._rango(t), t) for t in terminos), key=lambda r: r[0][1] - r[0][0])
+        (desde, hasta), _ = rangos[0]
+        candidatos = set(self.ids[desde:hasta])
+        for _, termino in rangos[1:]:
+            candidatos = {i for i in candidatos
+                          if any(p.startswith(termino) for p in self.palabras_registro[i])}
+
+        hoy_ordinal = _ordinal(hoy or reloj.fecha_hoy())
+        registros = self.registros
+
+        def orden(i):
+            return (registros[i].ingreso_ordinal > hoy_ordinal, self.posicion[i])
+
+        resultados = []
+        for i in heapq.nsmallest(limite, candidatos, key=orden):
+            registro = registros[i].como_dict()
+            registro['en_hotel'] = registro.pop('ingreso_ordinal') <= hoy_ordinal
+            resultados.append(registro)
+        return resultados
+
+
+def obtener_indice(archivo_pasajeros=DB_PASAJEROS):
+    """Índice de búsqueda vigente, reconstruido solo si el CSV cambió."""
+    clave = os.path.abspath(archivo_pasajeros)
+    firma = firma_archivo(archivo_pasajeros)
+
+    with _indices_lock:
+        entrada = _indices.get(clave)
+    if entrada is not None and entrada[0] == firma:
+        metricas.lectura_cache('busqueda', True)
+        return entrada[1]
+
+    metricas.lectura_cache('busqueda', False)
+    indice = Indice(leer_filas(archivo_pasajeros) if firma is not None else [])
+    if firma_archivo(archivo_pasajeros) == firma:
+        with _indices_lock:
+            _indices[clave] = (firma, indice)
+    return indice
+
+
+def buscar_pasajeros(consulta, archivo_pasajeros=DB_PASAJEROS, limite=LIMITE_RESULTADOS):
+    """Atajo: obtener_indice(...).buscar(consulta)."""
+    return obtener_indice(archivo_pasajeros).buscar(consulta, limite=limite)
@@ -0,0 +1,201 @@
+"""
+Caché binaria en disco de los CSV ya parseados (sobrevive reinicios).
+
+Junto a cada CSV se guarda, en data/.cache/, el resultado del parseo en
+formato binario:
+
+- <archivo>.df.pkl   DataFrame con sus columnas tipadas (pickle), usado
+                     por datos.leer_csv.
+- <archivo>.<tipo>   bundle columnar (core/columnar.py) con columnas
+                     derivadas, p. ej. la parte de pasajeros del snapshot.
+
+Cada entrada guarda la clave del CSV del que salió: tamaño, mtime y hash
+blake2b del contenido.
+
+- Si tamaño y mtime coinciden, se carga directamente (sin leer el CSV).
+- Si cambió el mtime pero el hash es el mismo (archivo copiado, "guardar"
+  sin cambios), se carga y se renueva la clave.
+- Si el contenido cambió (por ejemplo, editado a mano en LibreOffice), se
+  vuelve a parsear y se reescribe la caché de forma transparente.
+
+La caché es descartable: borrar data/.cache/ solo cuesta un re-parseo.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from core import metricas, perfil
+from core.columnar import escribir_bundle, mapear_bundle
+from core.datos import firma_archivo
+
+DIRECTORIO = '.cache'
+MAGICO = b'HOTELPKL'
+
+VIGENTE = 'vigente'
+RENOVAR = 'renovar'
+RECONSTRUIR = 'reconstruir'
+
+
+def ruta_cache(archivo, tipo):
+    """Ruta de la caché de un CSV: <dir del CSV>/.cache/<nombre>.<tipo>"""
+    directorio = os.path.join(os.path.dirname(os.path.abspath(archivo)), DIRECTORIO)
+    return os.path.join(directorio, f'{os.path.basename(archivo)}.{tipo}')
+
+
+def _hash(datos):
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def _leer_contenido(archivo):
+    """
+    Lee el CSV completo en bytes.
+
+    Returns:
+        tuple (clave, datos). La clave es None si el archivo cambió durante
+        la lectura (en ese caso no se guarda caché).
+    """
+    firma = firma_archivo(archivo)
+    with open(archivo, 'rb') as f:
+        datos = f.read()
+    perfil.registrar('bytes_leidos', len(datos))
+    if firma is None or firma_archivo(archivo) != firma:
+        return None, datos
+    return {'tamano': firma[1], 'mtime_ns': firma[2], 'hash': _hash(datos)}, datos
+
+
+def _comparar(archivo, guardada, extra):
+    """
+    Compara la clave guardada en la caché con el CSV actual.
+
+    Args:
+        archivo: ruta del CSV
+        guardada: clave leída de la caché (dict o None)
+        extra: texto adicional que debe coincidir (versión de formato, día...)
+
+    Returns:
+        tuple (estado, clave, datos): estado es VIGENTE, RENOVAR o RECONSTRUIR;
+        clave es la clave actual del CSV; datos son los bytes del CSV si hubo
+        que leerlo (None si no)
+    """
+    if not isinstance(guardada, dict) or guardada.get('extra') != extra:
+        guardada = None
+
+    firma = firma_archivo(archivo)
+    if (guardada is not None and firma is not None
+            and guardada.get('tamano') == firma[1]
+            and guardada.get('mtime_ns') == firma[2]):
+        return VIGENTE, guardada, None
+
+    clave, datos = _leer_contenido(archivo)
+    if clave is not None:
+        clave['extra'] = extra
+    if guardada is not None and clave is not None and guardada.get('hash') == clave['hash']:
+        return RENOVAR, clave, datos
+    return RECONSTRUIR, clave, datos
+
+
+def _escribir_pickle(ruta, clave, valor):
+    """Escribe la caché pickle (atómica). Un error de escritura no es fatal."""
+    try:
+        directorio = os.path.dirname(ruta)
+        os.makedirs(directorio, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_', suffix='.pkl')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGICO)
+                pickle.dump(clave, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, ruta)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar la caché {ruta}: {e}")
+
+
+def cargar_pickle(archivo, tipo, parsear, extra=''):
+    """
+    Retorna el CSV parseado desde la caché en disco, o lo parsea y la guarda.
+
+    Args:
+        archivo: ruta del CSV
+        tipo: sufijo de la caché (ej. 'df.pkl')
+        parsear: función bytes del CSV -> objeto a cachear
+        extra: texto que invalida la caché si cambia (ej. versión de pandas)
+    """
+    ruta = ruta_cache(archivo, tipo)
+    clave = datos = None
+    try:
+        with open(ruta, 'rb') as f:
+            if f.read(len(MAGICO)) == MAGICO:
+                estado, clave, datos = _comparar(archivo, pickle.load(f), extra)
+                if estado != RECONSTRUIR:
+                    valor = pickle.load(f)
+                    perfil.registrar('lecturas_cache')
+                    metricas.lectura_cache('csv_disco', True)
+                    if estado == RENOVAR:
+                        _escribir_pickle(ruta, clave, valor)
+                    return valor
+    except FileNotFoundError:
+        pass
+    except Exception as e:  # caché truncada o de otra versión de las librerías
+        print(f"⚠️  Caché {ruta} inválida, se reconstruye: {e}")
+
+    metricas.lectura_cache('csv_disco', False)
+    if datos is None:
+        clave, datos = _leer_contenido(archivo)
+        if clave is not None:
+            clave['extra'] = extra
+    valor = parsear(datos)
+    if clave is not None:
+        _escribir_pickle(ruta, clave, valor)
+    return valor
+
+
+def cargar_columnas(archivo, tipo, construir, extra=''):
+    """
+    Retorna columnas derivadas de un CSV desde un bundle en disco, o las
+    construye y las guarda.
+
+    Args:
+        archivo: ruta del CSV
+        tipo: sufijo de la caché (ej. 'estado.bin')
+        construir: función bytes del CSV -> dict de columnas (ver escribir_bundle)
+        extra: texto que invalida la caché si cambia
+
+    Returns:
+        dict nombre -> columna (np.ndarray o secuencia de str)
+    """
+    ruta = ruta_cache(archivo, tipo)
+    clave = datos = None
+    bundle = mapear_bundle(ruta)
+    if bundle is not None:
+        estado, clave, datos = _comparar(archivo, bundle.meta.get('clave'), extra)
+        if estado != RECONSTRUIR:
+            perfil.registrar('lecturas_cache')
+            metricas.lectura_cache('csv_disco', True)
+            columnas = {nombre: bundle[nombre] for nombre in bundle.columnas()}
+            if estado == RENOVAR:
+                _escribir_columnas(ruta, clave, columnas)
+            return columnas
+
+    metricas.lectura_cache('csv_disco', False)
+    if datos is None:
+        clave, datos = _leer_contenido(archivo)
+        if clave is not None:
+            clave['extra'] = extra
+    columnas = construir(datos)
+    if clave is not None:
+        _escribir_columnas(ruta, clave, columnas)
+    return columnas
+
+
+def _escribir_columnas(ruta, clave, columnas):
+    try:
+        escribir_bundle(ruta, columnas, meta={'clave': clave})
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar la caché {ruta}: {e}")
@@ -0,0 +1,191 @@
+"""
+Caché en disco de los archivos generados por las exportaciones (consulta
+de consumos, planilla de salidas, checkouts del día).
+
+Recepción descarga varias veces por turno el mismo cierre; si los CSV no
+cambiaron desde la última vez, el archivo ya generado se reutiliza y la
+tarea queda terminada al instante (core/tareas.py).
+
+- La clave es el tipo de reporte, sus parámetros, la firma (inodo,
+  tamaño, mtime) de cada CSV del que sale y la versión del catálogo de
+  categorías (core/categorias.py): cualquier escritura o edición de
+  config/categorias.json cambia la clave, así que una entrada vieja nunca
+  se sirve. Las escrituras no tocan la caché (una carga de consumo es
+  el camino más frecuente): las entradas vencidas quedan sin aciertos y
+  las descarta el recorte por antigüedad.
+- Se guardan hasta MAX_ENTRADAS archivos y MAX_BYTES en total; al pasar
+  cualquiera de los dos límites se descartan los usados hace más tiempo
+  (LRU por el mtime de la entrada, que se renueva en cada acierto).
+
+Las entradas viven en <dir del CSV>/.cache/exportes/: <clave><extensión>
+con el archivo y <clave>.json con sus datos. La caché es descartable.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from core import metricas
+
+DIRECTORIO = os.path.join('.cache', 'exportes')
+MAX_ENTRADAS = 50
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _directorio(archivo):
+    return os.path.join(os.path.dirname(os.path.abspath(archivo)), DIRECTORIO)
+
+
+def _archivos_fuente(parametros):
+    """CSV de los que sale un reporte: los parámetros archivo_*."""
+    return sorted(os.path.abspath(valor) for nombre, valor in parametros.items()
+                  if nombre.startswith('archivo_') and valor)
+
+
+def _enlazar(origen, destino):
+    """Hard link (instantáneo, sin duplicar disco); copia si no se puede."""
+    if os.path.exists(destino):
+        os.remove(destino)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def clave(tipo, parametros):
+    """
+    Clave de caché de un reporte con los datos actuales.
+
+    Returns:
+        dict con 'id', 'directorio', 'archivos' y 'firmas', o None si el
+        reporte no sale de ningún CSV o falta alguno
+    """
+    from core import categorias
+    from core.datos import firma_archivo
+
+    archivos = _archivos_fuente(parametros)
+    if not archivos:
+        return None
+    firmas = [firma_archivo(archivo) for archivo in archivos]
+    if None in firmas:
+        return None
+    # Las columnas y su orden salen del catálogo: otra versión, otro archivo
+    texto = json.dumps({'tipo': tipo, 'parametros': parametros, 'firmas': firmas,
+                        'catalogo': categorias.catalogo().version},
+                       sort_keys=True, default=str)
+    return {
+        'id': hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest(),
+        'directorio': _directorio(archivos[0]),
+        'archivos': archivos,
+        'firmas': [list(firma) for firma in firmas],
+    }
+
+
+def _ruta_meta(c):
+    return os.path.join(c['directorio'], f"{c['id']}.json")
+
+
+def buscar(c, destino):
+    """
+    Si el reporte ya está en caché, lo deja en `destino`.
+
+    Returns:
+        dict con 'mensaje' y 'nombre_descarga' (acierto) o None (fallo)
+    """
+    if c is None:
+        return None
+    ruta_meta = _ruta_meta(c)
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        _enlazar(os.path.join(c['directorio'], meta['archivo']), destino)
+        os.utime(ruta_meta)  # usado recién: último en salir por LRU
+    except (OSError, ValueError, KeyError):
+        metricas.lectura_cache('exportes', False)
+        return None
+    metricas.lectura_cache('exportes', True)
+    return {'mensaje': meta['mensaje'], 'nombre_descarga': meta['nombre_descarga']}
+
+
+def guardar(c, origen, resultado):
+    """
+    Guarda el archivo generado para la clave `c`. Si algún CSV cambió
+    mientras se generaba, no se guarda (el archivo podría mezclar datos).
+    """
+    from core.datos import firma_archivo
+
+    if c is None or not resultado.get('nombre_descarga') or not os.path.exists(origen):
+        return
+    if [list(firma_archivo(a) or ()) for a in c['archivos']] != c['firmas']:
+        return
+
+    directorio = c['directorio']
+    nombre = c['id'] + os.path.splitext(origen)[1]
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        _enlazar(origen, os.path.join(directorio, nombre))
+        fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'archivo': nombre,
+                    'archivos': c['archivos'],
+                    'bytes': os.path.getsize(origen),
+                    'mensaje': resultado['mensaje'],
+                    'nombre_descarga': resultado['nombre_descarga'],
+                }, f, ensure_ascii=False)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, _ruta_meta(c))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        recortar(directorio)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar la exportación en caché: {e}")
+
+
+def _entradas(directorio):
+    """Lista de (mtime, ruta_meta, meta), de la menos a la más usada."""
+    entradas = []
+    try:
+        nombres = os.listdir(directorio)
+    except FileNotFoundError:
+        return entradas
+    for nombre in nombres:
+        if not nombre.endswith('.json') or nombre.startswith('.'):
+            continue
+        ruta = os.path.join(directorio, nombre)
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                meta = json.load(f)
+            entradas.append((os.stat(ruta).st_mtime_ns, ruta, meta))
+        except (OSError, ValueError):
+            continue
+    entradas.sort(key=lambda e: e[0])
+    return entradas
+
+
+def _borrar(directorio, ruta_meta, meta):
+    for ruta in (ruta_meta, os.path.join(directorio, meta.get('archivo', ''))):
+        try:
+            os.remove(ruta)
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+
+
+def recortar(directorio, max_entradas=MAX_ENTRADAS, max_bytes=MAX_BYTES):
+    """Descarta las entradas menos usadas hasta respetar los límites."""
+    entradas = _entradas(directorio)
+    total = sum(meta.get('bytes', 0) for _, _, meta in entradas)
+    while entradas and (len(entradas) > max_entradas or total > max_bytes):
+        _, ruta_meta, meta = entradas.pop(0)
+        _borrar(directorio, ruta_meta, meta)
+        total -= meta.get('bytes', 0)
+
+
+def vaciar(archivo):
+    """Borra toda la caché de exportaciones del directorio de `archivo`."""
+    shutil.rmtree(_directorio(archivo), ignore_errors=True)
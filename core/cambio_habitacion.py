@@ -3,11 +3,14 @@ Módulo para gestionar cambios de habitación por desperfectos o emergencias.
 Permite mover un huésped de una habitación a otra manteniendo sus consumos.
 """
 
-import pandas as pd
 import os
 
-DB_PASAJEROS = 'data/pasajeros.csv'
-DB_CONSUMOS = 'data/consumos_diarios.csv'
+from core import inventario
+from core.datos import leer_csv, guardar_csv, bloqueo
+from core.esquema import cargar_pasajeros
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
 
 
 def obtener_habitaciones_disponibles_para_cambio(habitacion_origen):
@@ -21,20 +24,10 @@ def obtener_habitaciones_disponibles_para_cambio(habitacion_origen):
     Returns:
         list: Lista de habitaciones disponibles
     """
-    from core.dashboard import PISOS, obtener_habitaciones_ocupadas
-    
-    # Todas las habitaciones del hotel
-    todas_habitaciones = []
-    for piso_habs in PISOS.values():
-        todas_habitaciones.extend(piso_habs)
+    from core.dashboard import obtener_habitaciones_ocupadas
     
-    # Habitaciones ocupadas
-    ocupadas = obtener_habitaciones_ocupadas()
-    
-    # Retornar disponibles, excluyendo la habitación origen
-    disponibles = [h for h in todas_habitaciones 
-                   if h not in ocupadas.keys() and h != habitacion_origen]
-    return sorted(disponibles)
+    # Habitaciones del alojamiento no ocupadas, excluyendo la habitación origen
+    return inventario.actual().disponibles(obtener_habitaciones_ocupadas(), excluir=habitacion_origen)
 
 
 def cambiar_habitacion(habitacion_origen, habitacion_destino, motivo=""):
@@ -63,53 +56,57 @@ def cambiar_habitacion(habitacion_origen, habitacion_destino, motivo=""):
     if habitacion_origen == habitacion_destino:
         return False, "Las habitaciones origen y destino son iguales"
     
+    if habitacion_destino not in inventario.actual():
+        return False, f"La habitación {habitacion_destino} no existe"
+    
     try:
-        # 1. Verificar que la habitación origen esté ocupada
-        df_pasajeros = pd.read_csv(DB_PASAJEROS)
-        pasajero_origen = df_pasajeros[df_pasajeros['Nro. habitación'] == habitacion_origen]
+        with bloqueo(DB_PASAJEROS), bloqueo(DB_CONSUMOS):
+            # 1. Verificar que la habitación origen esté ocupada
+            df_pasajeros = leer_csv(DB_PASAJEROS)
+            pasajero_origen = df_pasajeros[df_pasajeros['Nro. habitación'] == habitacion_origen]
         
-        if pasajero_origen.empty:
-            return False, f"La habitación {habitacion_origen} no está ocupada"
+            if pasajero_origen.empty:
+                return False, f"La habitación {habitacion_origen} no está ocupada"
         
-        # 2. Verificar que la habitación destino esté disponible
-        pasajero_destino = df_pasajeros[df_pasajeros['Nro. habitación'] == habitacion_destino]
-        if not pasajero_destino.empty:
-            return False, f"La habitación {habitacion_destino} ya está ocupada"
+            # 2. Verificar que la habitación destino esté disponible
+            pasajero_destino = df_pasajeros[df_pasajeros['Nro. habitación'] == habitacion_destino]
+            if not pasajero_destino.empty:
+                return False, f"La habitación {habitacion_destino} ya está ocupada"
         
-        # 3. Obtener datos del pasajero
-        nombre_pasajero = pasajero_origen.iloc[0]['Apellido y nombre']
+            # 3. Obtener datos del pasajero
+            nombre_pasajero = pasajero_origen.iloc[0]['Apellido y nombre']
         
-        # 4. Actualizar habitación en pasajeros.csv
-        df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_origen, 
-                         'Nro. habitación'] = habitacion_destino
+            # 4. Actualizar habitación en pasajeros.csv
+            df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_origen, 
+                             'Nro. habitación'] = habitacion_destino
         
-        # 5. Agregar observación si existe el campo
-        if 'Observaciones' in df_pasajeros.columns:
-            obs_actual = str(df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_destino, 
-                                              'Observaciones'].iloc[0])
-            if pd.isna(obs_actual) or obs_actual == 'nan':
-                obs_actual = ""
+            # 5. Agregar observación si existe el campo
+            if 'Observaciones' in df_pasajeros.columns:
+                obs_actual = str(df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_destino, 
+                                                  'Observaciones'].iloc[0])
+                if obs_actual == 'nan':
+                    obs_actual = ""
             
-            nueva_obs = f"Cambio desde Hab {habitacion_origen}. Motivo: {motivo}" if motivo else f"Cambio desde Hab {habitacion_origen}"
-            if obs_actual:
-                nueva_obs = f"{obs_actual} | {nueva_obs}"
+                nueva_obs = f"Cambio desde Hab {habitacion_origen}. Motivo: {motivo}" if motivo else f"Cambio desde Hab {habitacion_origen}"
+                if obs_actual:
+                    nueva_obs = f"{obs_actual} | {nueva_obs}"
             
-            df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_destino, 
-                            'Observaciones'] = nueva_obs
+                df_pasajeros.loc[df_pasajeros['Nro. habitación'] == habitacion_destino, 
+                                'Observaciones'] = nueva_obs
         
-        df_pasajeros.to_csv(DB_PASAJEROS, index=False)
+            guardar_csv(df_pasajeros, DB_PASAJEROS)
         
-        # 6. Actualizar consumos si existen
-        consumos_actualizados = 0
-        if os.path.exists(DB_CONSUMOS):
-            df_consumos = pd.read_csv(DB_CONSUMOS)
-            consumos_habitacion = df_consumos[df_consumos['habitacion'] == habitacion_origen]
+            # 6. Actualizar consumos si existen
+            consumos_actualizados = 0
+            if os.path.exists(DB_CONSUMOS):
+                df_consumos = leer_csv(DB_CONSUMOS)
+                consumos_habitacion = df_consumos[df_consumos['habitacion'] == habitacion_origen]
             
-            if not consumos_habitacion.empty:
-                df_consumos.loc[df_consumos['habitacion'] == habitacion_origen, 
-                               'habitacion'] = habitacion_destino
-                df_consumos.to_csv(DB_CONSUMOS, index=False)
-                consumos_actualizados = len(consumos_habitacion)
+                if not consumos_habitacion.empty:
+                    df_consumos.loc[df_consumos['habitacion'] == habitacion_origen, 
+                                   'habitacion'] = habitacion_destino
+                    guardar_csv(df_consumos, DB_CONSUMOS)
+                    consumos_actualizados = len(consumos_habitacion)
         
         mensaje = f"Cambio exitoso: {nombre_pasajero} movido de habitación {habitacion_origen} → {habitacion_destino}"
         if consumos_actualizados > 0:
@@ -141,7 +138,7 @@ def validar_cambio_habitacion(habitacion_origen, habitacion_destino):
     if not os.path.exists(DB_PASAJEROS):
         return False, "No existe el archivo de pasajeros"
     
-    df_pasajeros = pd.read_csv(DB_PASAJEROS)
+    df_pasajeros = cargar_pasajeros('disponibilidad', DB_PASAJEROS)
     
     # Verificar origen ocupada
     if df_pasajeros[df_pasajeros['Nro. habitación'] == habitacion_origen].empty:
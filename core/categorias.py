@@ -0,0 +1,192 @@
+"""
+Catálogo de categorías de consumo (Bebidas, Estadía, Map, minibar,
+lavandería, excursiones...), leído de config/categorias.json.
+
+Cada categoría tiene un código entero estable (el del punto de venta), el
+nombre que se guarda en consumos_diarios.csv, un ícono y una clase CSS.
+Agregar una categoría es agregar una línea al archivo (se relee solo al
+cambiar): la ficha, el check-out, los cierres y las planillas la muestran
+sin tocar el código.
+
+Los totales por habitación y categoría salen de una sola pasada sobre los
+consumos, para todas las categorías a la vez (sumar()): cada consumo se
+codifica con la posición entera de su categoría y un único np.bincount
+sobre (habitación, categoría) arma la matriz de totales. Más categorías no
+agregan pasadas sobre los datos. Los montos van en centavos enteros
+(core/dinero.py) y los totales también.
+
+Formato de config/categorias.json:
+
+    {"categorias": [{"codigo": 1, "nombre": "Bebidas", "icono": "🍺", "clase": "bebidas"}, ...],
+     "planilla": ["Estadía", "Map", "Bebidas"]}
+
+"planilla" es el orden de las columnas de la planilla de salidas; las
+categorías que no figuran ahí van después, en el orden del catálogo.
+Los consumos con una categoría que ya no está en el catálogo se siguen
+sumando (al final, por nombre).
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.datos import firma_archivo
+
+RUTA_CONFIG = os.environ.get(
+    'HOTEL_CATEGORIAS',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'categorias.json'))
+ICONO_POR_DEFECTO = '🧾'
+
+# Sin archivo de configuración: las tres categorías de siempre
+CONFIG_POR_DEFECTO = {
+    'categorias': [
+        {'codigo': 1, 'nombre': 'Bebidas', 'icono': '🍺', 'clase': 'bebidas'},
+        {'codigo': 2, 'nombre': 'Estadía', 'icono': '🏨', 'clase': 'estadia'},
+        {'codigo': 3, 'nombre': 'Map', 'icono': '🍽️', 'clase': 'map'},
+    ],
+    'planilla': ['Estadía', 'Map', 'Bebidas'],
+}
+
+# Catálogo cargado: ((ruta, firma), Catalogo)
+_cargado = None
+_cargado_lock = threading.Lock()
+
+
+class Categoria:
+    """Una categoría de consumo del catálogo."""
+
+    __slots__ = ('codigo', 'nombre', 'icono', 'clase')
+
+    def __init__(self, codigo, nombre, icono=ICONO_POR_DEFECTO, clase=''):
+        self.codigo = codigo
+        self.nombre = nombre
+        self.icono = icono
+        self.clase = clase
+
+    def __repr__(self):
+        return f'Categoria({self.codigo}, {self.nombre!r})'
+
+
+class Catalogo:
+    """Categorías en orden de presentación, indexadas por nombre y por código."""
+
+    def __init__(self, categorias, planilla=(), version=None):
+        """
+        Args:
+            categorias: lista de Categoria
+            planilla: nombres en el orden de las columnas de la planilla de salidas
+            version: cambia con cada edición del archivo (para claves de caché)
+        """
+        self.categorias = tuple(categorias)
+        self.nombres = tuple(c.nombre for c in self.categorias)
+        self.por_nombre = {c.nombre: c for c in self.categorias}
+        self.por_codigo = {c.codigo: c for c in self.categorias}
+        self.version = version
+        if len(self.por_nombre) != len(self.categorias) or len(self.por_codigo) != len(self.categorias):
+            raise ValueError('Categorías de consumo con nombre o código repetido')
+        for nombre in planilla:
+            if nombre not in self.por_nombre:
+                raise ValueError(f'Categoría desconocida en "planilla": {nombre}')
+        self.planilla = tuple(planilla) + tuple(n for n in self.nombres if n not in planilla)
+
+    def __iter__(self):
+        return iter(self.categorias)
+
+    def __len__(self):
+        return len(self.categorias)
+
+    def __contains__(self, nombre):
+        return nombre in self.por_nombre
+
+    def icono(self, nombre):
+        categoria = self.por_nombre.get(nombre)
+        return categoria.icono if categoria else ICONO_POR_DEFECTO
+
+    def clase(self, nombre):
+        categoria = self.por_nombre.get(nombre)
+        return categoria.clase if categoria else ''
+
+    def con_extras(self, nombres, orden=None):
+        """
+        Nombres del catálogo (en `orden`, por defecto el del catálogo) más los
+        de `nombres` que no están en el catálogo, ordenados alfabéticamente.
+        """
+        extras = sorted({str(n) for n in nombres} - set(self.nombres))
+        return tuple(orden or self.nombres) + tuple(extras)
+
+
+def _parsear(config, version=None):
+    categorias = [
+        Categoria(
+            codigo=int(datos['codigo']),
+            nombre=datos['nombre'],
+            icono=datos.get('icono', ICONO_POR_DEFECTO),
+            clase=datos.get('clase', ''),
+        )
+        for datos in config['categorias']
+    ]
+    if not categorias:
+        raise ValueError('El catálogo de categorías está vacío')
+    return Catalogo(categorias, config.get('planilla', ()), version)
+
+
+def catalogo(ruta=None):
+    """Catálogo vigente (se relee solo si cambió el archivo)."""
+    global _cargado
+    ruta = ruta or RUTA_CONFIG
+    firma = firma_archivo(ruta)
+    cargado = _cargado
+    if cargado is not None and cargado[0] == (ruta, firma):
+        return cargado[1]
+
+    with _cargado_lock:
+        if firma is None:
+            resultado = _parsear(CONFIG_POR_DEFECTO, version=('defecto',))
+        else:
+            with open(ruta, encoding='utf-8') as f:
+                resultado = _parsear(json.load(f), version=firma)
+        _cargado = ((ruta, firma), resultado)
+    return resultado
+
+
+def sumar(habitaciones, categorias, montos, catalogo_=None):
+    """
+    Totales por habitación y categoría en una sola pasada.
+
+    Args:
+        habitaciones, categorias, montos: secuencias paralelas, una entrada por consumo
+            (montos en centavos, ver dinero.columna_centavos)
+        catalogo_: Catalogo a usar (por defecto el vigente)
+
+    Returns:
+        tuple (habitaciones, nombres, totales, cantidades):
+            habitaciones: np.int32 ordenadas (una por fila de `totales`)
+            nombres: categorías de las columnas (catálogo + extras)
+            totales: np.int64 en centavos, de forma (habitaciones, nombres)
+            cantidades: np.int32, cantidad de consumos por habitación
+    """
+    cat = catalogo_ or catalogo()
+    if len(habitaciones) == 0:
+        return (np.zeros(0, dtype=np.int32), cat.nombres,
+                np.zeros((0, len(cat)), dtype=np.int64), np.zeros(0, dtype=np.int32))
+
+    # Codificación entera: código por orden de aparición, después cada nombre
+    # distinto se traduce una sola vez a su columna
+    vistos = {}
+    codigos = np.fromiter((vistos.setdefault(c, len(vistos)) for c in categorias),
+                          dtype=np.int64, count=len(categorias))
+    nombres = cat.con_extras(vistos)
+    posicion = {nombre: i for i, nombre in enumerate(nombres)}
+    codigos = np.array([posicion[str(n)] for n in vistos], dtype=np.int64)[codigos]
+
+    habs, filas = np.unique(np.asarray(habitaciones, dtype=np.int64), return_inverse=True)
+    k = len(nombres)
+    # bincount suma los pesos en float64, pero con centavos enteros cada suma
+    # parcial es un entero menor a 2**53: el resultado es exacto (y no depende
+    # del orden de los consumos) antes de volver a int64
+    totales = np.bincount(filas * k + codigos, weights=np.asarray(montos, dtype=np.int64),
+                          minlength=len(habs) * k).astype(np.int64).reshape(len(habs), k)
+    cantidades = np.bincount(filas, minlength=len(habs))
+    return habs.astype(np.int32), nombres, totales, cantidades.astype(np.int32)
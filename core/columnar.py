@@ -0,0 +1,186 @@
+"""
+Formato binario columnar para compartir datos entre procesos sin copias.
+
+Un archivo "bundle" contiene columnas numéricas (arrays de NumPy) y columnas
+de texto (offsets + bytes UTF-8). Se lee con mmap: los arrays numéricos se
+obtienen con np.frombuffer directamente sobre el mapa de memoria, así que
+todos los workers que mapean el mismo archivo comparten las mismas páginas
+del sistema operativo (la memoria no crece al agregar workers).
+
+Estructura del archivo:
+    [0:8]    firma mágica b'HOTELCOL'
+    [8:16]   largo del encabezado JSON (uint64 little-endian)
+    [16:..]  encabezado JSON (meta + descripción de columnas)
+    [D:..]   datos de las columnas, alineados a 8 bytes
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGICO = b'HOTELCOL'
+
+
+def _alinear(n, a=8):
+    return (n + a - 1) // a * a
+
+
+def _codificar_texto(valores):
+    """Convierte una lista de strings en (offsets int64, blob uint8)."""
+    partes = [('' if v is None else str(v)).encode('utf-8') for v in valores]
+    offsets = np.zeros(len(partes) + 1, dtype=np.int64)
+    if partes:
+        offsets[1:] = np.cumsum([len(p) for p in partes])
+    blob = np.frombuffer(b''.join(partes), dtype=np.uint8)
+    return offsets, blob
+
+
+def escribir_bundle(ruta, columnas, meta=None):
+    """
+    Escribe un bundle de forma atómica (temporal + os.replace).
+
+    Args:
+        ruta: archivo destino
+        columnas: dict nombre -> np.ndarray (numérica) o list de str (texto)
+        meta: dict serializable a JSON con datos adicionales
+    """
+    descripcion = {}
+    bloques = []
+    posicion = 0
+
+    def agregar_bloque(array):
+        nonlocal posicion
+        array = np.ascontiguousarray(array)
+        offset = posicion
+        bloques.append((offset, array))
+        posicion = _alinear(posicion + array.nbytes)
+        return offset
+
+    for nombre, valores in columnas.items():
+        if isinstance(valores, np.ndarray):
+            descripcion[nombre] = {
+                'tipo': 'num',
+                'dtype': valores.dtype.str,
+                'n': int(len(valores)),
+                'off': agregar_bloque(valores),
+            }
+        else:
+            offsets, blob = _codificar_texto(valores)
+            descripcion[nombre] = {
+                'tipo': 'texto',
+                'n': len(offsets) - 1,
+                'off_idx': agregar_bloque(offsets),
+                'off_blob': agregar_bloque(blob),
+            }
+
+    encabezado = json.dumps({'meta': meta or {}, 'columnas': descripcion}).encode('utf-8')
+    inicio_datos = _alinear(16 + len(encabezado))
+
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_', suffix='.bin')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGICO)
+            f.write(struct.pack('<Q', len(encabezado)))
+            f.write(encabezado)
+            for offset, array in bloques:
+                f.seek(inicio_datos + offset)
+                f.write(array.tobytes())
+            # Garantiza el tamaño final aunque el último bloque esté vacío
+            f.truncate(inicio_datos + posicion)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, ruta)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ColumnaTexto:
+    """Vista perezosa de una columna de texto almacenada en el mapa de memoria."""
+
+    __slots__ = ('_offsets', '_blob')
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        inicio, fin = self._offsets[i], self._offsets[i + 1]
+        return self._blob[inicio:fin].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tolist(self):
+        return list(self)
+
+
+class Bundle:
+    """
+    Bundle mapeado en memoria (solo lectura).
+
+    Atributos:
+        meta: dict con los metadatos guardados al escribir
+        firma: (inodo, tamaño, mtime_ns) del archivo mapeado
+    """
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.firma = (st.st_ino, st.st_size, st.st_mtime_ns)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:8] != MAGICO:
+            raise ValueError(f'{ruta} no es un bundle válido')
+        (largo,) = struct.unpack('<Q', self._mm[8:16])
+        encabezado = json.loads(self._mm[16:16 + largo].decode('utf-8'))
+        self.meta = encabezado['meta']
+        self._descripcion = encabezado['columnas']
+        self._inicio = _alinear(16 + largo)
+        self._columnas = {}
+
+    def _array(self, dtype, n, offset):
+        return np.frombuffer(self._mm, dtype=dtype, count=n, offset=self._inicio + offset)
+
+    def __contains__(self, nombre):
+        return nombre in self._descripcion
+
+    def __getitem__(self, nombre):
+        if nombre not in self._columnas:
+            d = self._descripcion[nombre]
+            if d['tipo'] == 'num':
+                col = self._array(np.dtype(d['dtype']), d['n'], d['off'])
+            else:
+                offsets = self._array(np.int64, d['n'] + 1, d['off_idx'])
+                blob = self._array(np.uint8, int(offsets[-1]), d['off_blob'])
+                col = ColumnaTexto(offsets, blob)
+            self._columnas[nombre] = col
+        return self._columnas[nombre]
+
+    def columnas(self):
+        return list(self._descripcion)
+
+
+def mapear_bundle(ruta):
+    """
+    Mapea un bundle en memoria.
+
+    Returns:
+        Bundle, o None si el archivo no existe o está corrupto
+    """
+    try:
+        return Bundle(ruta)
+    except (FileNotFoundError, ValueError, struct.error, json.JSONDecodeError):
+        return None
@@ -1,23 +1,84 @@
 """
 Módulo para gestionar operaciones de consumos individuales por habitación.
+
+Las operaciones frecuentes (agregar, listar, eliminar) usan el módulo csv
+y un índice habitación -> filas; pandas solo se carga en obtener_consumos_habitacion.
 """
 
-import pandas as pd
 import os
-from datetime import datetime
+import threading
+
+from core import categorias, dinero, inventario, metricas, reloj
+from core.datos import (
+    a_entero, agregar_registro, bloqueo, firma_archivo,
+    guardar_filas, leer_csv, leer_encabezado, leer_filas
+)
+from core.modelos import Consumo, Folio, FolioGrupo
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+
+# Índice por archivo: ruta -> (firma, filas, {habitacion: [posiciones de fila]})
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def indice_consumos(archivo_consumos=DB_CONSUMOS):
+    """
+    Retorna las filas de consumos y un índice habitación -> posiciones,
+    reconstruido solo cuando el archivo cambia.
+    
+    Returns:
+        tuple (filas, indice)
+    """
+    clave = os.path.abspath(archivo_consumos)
+    firma = firma_archivo(archivo_consumos)
+    filas = leer_filas(archivo_consumos)
+    
+    with _indices_lock:
+        entrada = _indices.get(clave)
+    if entrada is not None and entrada[0] == firma and entrada[1] is filas:
+        return filas, entrada[2]
+    
+    indice = {}
+    for posicion, fila in enumerate(filas):
+        try:
+            indice.setdefault(a_entero(fila['habitacion']), []).append(posicion)
+        except (TypeError, ValueError):
+            pass
+    
+    with _indices_lock:
+        _indices[clave] = (firma, filas, indice)
+    return filas, indice
 
 
-def obtener_consumos_habitacion(num_habitacion, archivo_consumos='data/consumos_diarios.csv'):
+def listar_consumos_habitacion(num_habitacion, archivo_consumos=DB_CONSUMOS):
+    """
+    Lista los consumos de una habitación sin usar pandas.
+    
+    Returns:
+        Lista de Consumo (indice, fecha, categoria, monto) en orden de carga
+    """
+    if not os.path.exists(archivo_consumos):
+        return []
+    
+    filas, indice = indice_consumos(archivo_consumos)
+    return Consumo.desde_filas(filas, indice.get(num_habitacion, []))
+
+
+def obtener_consumos_habitacion(num_habitacion, archivo_consumos=DB_CONSUMOS):
     """
     Obtiene todos los consumos de una habitación específica.
     
     Returns:
         DataFrame con los consumos ordenados por fecha
     """
+    import pandas as pd
+    
     if not os.path.exists(archivo_consumos):
         return pd.DataFrame()
     
-    df = pd.read_csv(archivo_consumos)
+    df = leer_csv(archivo_consumos)
     consumos_hab = df[df['habitacion'] == num_habitacion].copy()
     
     # Agregar índice para identificar cada consumo
@@ -27,55 +88,65 @@ def obtener_consumos_habitacion(num_habitacion, archivo_consumos='data/consumos_
     return consumos_hab
 
 
-def obtener_total_consumos(num_habitacion, archivo_consumos='data/consumos_diarios.csv'):
+def centavos_de(df, archivo_consumos=DB_CONSUMOS, filas_csv=None):
+    """
+    Montos en centavos de las filas de un DataFrame de leer_csv(archivo_consumos).
+
+    pandas ya pasó 'monto' a float ('1.500' queda 1.5): los montos se toman
+    del texto del CSV (leer_filas) por posición, con la regla de
+    dinero.columna_centavos, mientras el DataFrame conserve el índice de
+    read_csv (posición de cada fila).
+
+    Args:
+        filas_csv: largo del DataFrame sin filtrar, para comprobar que los
+            dos leen la misma versión del CSV (por defecto len(df))
+    """
+    filas = leer_filas(archivo_consumos)
+    if len(filas) == (len(df) if filas_csv is None else filas_csv) and (
+            len(df) == 0 or (df.index.min() >= 0 and df.index.max() < len(filas))):
+        return dinero.columna_centavos([filas[posicion]['monto'] for posicion in df.index])
+    return dinero.columna_centavos(df['monto'])
+
+
+def obtener_total_consumos(num_habitacion, archivo_consumos=DB_CONSUMOS):
     """
     Calcula el total de consumos de una habitación.
+    Usa los totales precalculados del snapshot compartido (core/snapshot.py).
     
     Returns:
-        Diccionario con totales por categoría y total general
+        Diccionario con totales por categoría y total general, en centavos
     """
-    consumos = obtener_consumos_habitacion(num_habitacion, archivo_consumos)
-    
-    if consumos.empty:
-        return {
-            'Bebidas': 0,
-            'Estadía': 0,
-            'Map': 0,
-            'total': 0
-        }
-    
-    totales = {
-        'Bebidas': consumos[consumos['categoria'] == 'Bebidas']['monto'].sum() if 'Bebidas' in consumos['categoria'].values else 0,
-        'Estadía': consumos[consumos['categoria'] == 'Estadía']['monto'].sum() if 'Estadía' in consumos['categoria'].values else 0,
-        'Map': consumos[consumos['categoria'] == 'Map']['monto'].sum() if 'Map' in consumos['categoria'].values else 0,
-    }
-    totales['total'] = sum(totales.values())
+    if not os.path.exists(archivo_consumos):
+        totales = dict.fromkeys(categorias.catalogo().nombres, 0)
+        totales['total'] = 0
+        return totales
     
-    return totales
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_consumos=archivo_consumos).totales(num_habitacion)
 
 
-def agregar_consumo(num_habitacion, categoria, monto, pasajero, archivo_consumos='data/consumos_diarios.csv'):
+def agregar_consumo(num_habitacion, categoria, monto, pasajero, archivo_consumos=DB_CONSUMOS):
     """
     Agrega un nuevo consumo a una habitación.
     
+    Args:
+        monto: en pesos, como llega del formulario ('1500', '1500.50')
+    
     Returns:
         True si se agregó correctamente, False en caso contrario
     """
     try:
+        centavos = dinero.a_centavos(monto)
         nuevo_registro = {
-            'fecha': datetime.now().strftime('%d/%m/%Y %H:%M'),
+            'fecha': reloj.ahora().strftime('%d/%m/%Y %H:%M'),
             'habitacion': num_habitacion,
             'pasajero': pasajero,
             'categoria': categoria,
-            'monto': float(monto)
+            'monto': dinero.a_texto(centavos)
         }
         
-        df_nuevo = pd.DataFrame([nuevo_registro])
-        
-        if os.path.exists(archivo_consumos):
-            df_nuevo.to_csv(archivo_consumos, mode='a', header=False, index=False)
-        else:
-            df_nuevo.to_csv(archivo_consumos, mode='w', header=True, index=False)
+        agregar_registro(nuevo_registro, archivo_consumos)
+        metricas.consumo_cargado(archivo_consumos, categoria, centavos)
         
         return True
     except Exception as e:
@@ -83,7 +154,7 @@ def agregar_consumo(num_habitacion, categoria, monto, pasajero, archivo_consumos
         return False
 
 
-def eliminar_consumo_por_indice(num_habitacion, indice, archivo_consumos='data/consumos_diarios.csv'):
+def eliminar_consumo_por_indice(num_habitacion, indice, archivo_consumos=DB_CONSUMOS):
     """
     Elimina un consumo específico de una habitación por su índice.
     
@@ -94,20 +165,19 @@ def eliminar_consumo_por_indice(num_habitacion, indice, archivo_consumos='data/c
         if not os.path.exists(archivo_consumos):
             return False
         
-        df = pd.read_csv(archivo_consumos)
-        consumos_hab = df[df['habitacion'] == num_habitacion]
-        
-        if indice >= len(consumos_hab):
-            return False
-        
-        # Obtener el índice global del consumo a eliminar
-        indice_global = consumos_hab.index[indice]
-        
-        # Eliminar la fila
-        df = df.drop(indice_global)
-        
-        # Guardar el archivo
-        df.to_csv(archivo_consumos, index=False)
+        with bloqueo(archivo_consumos):
+            filas, indice_hab = indice_consumos(archivo_consumos)
+            posiciones = indice_hab.get(num_habitacion, [])
+            
+            if indice >= len(posiciones):
+                return False
+            
+            # Obtener la posición global del consumo a eliminar
+            posicion_global = posiciones[indice]
+            
+            # Eliminar la fila y guardar el archivo
+            filas_restantes = filas[:posicion_global] + filas[posicion_global + 1:]
+            guardar_filas(filas_restantes, archivo_consumos, leer_encabezado(archivo_consumos))
         
         return True
     except Exception as e:
@@ -115,31 +185,47 @@ def eliminar_consumo_por_indice(num_habitacion, indice, archivo_consumos='data/c
         return False
 
 
-def obtener_resumen_habitacion(num_habitacion, datos_pasajero, archivo_consumos='data/consumos_diarios.csv'):
+def obtener_resumen_habitacion(num_habitacion, datos_pasajero, archivo_consumos=DB_CONSUMOS):
     """
     Obtiene un resumen completo de la habitación incluyendo pasajero y consumos.
     
+    Args:
+        datos_pasajero: Estadia del titular (ver dashboard.obtener_habitaciones_ocupadas)
+    
     Returns:
-        Diccionario con toda la información de la habitación
+        Folio con toda la información de la habitación
     """
-    consumos = obtener_consumos_habitacion(num_habitacion, archivo_consumos)
+    lista_consumos = listar_consumos_habitacion(num_habitacion, archivo_consumos)
     totales = obtener_total_consumos(num_habitacion, archivo_consumos)
     
-    # Convertir consumos a lista de diccionarios para el template
-    lista_consumos = []
-    if not consumos.empty:
-        for idx, row in consumos.iterrows():
-            lista_consumos.append({
-                'indice': row.get('indice', 0),
-                'fecha': row['fecha'],
-                'categoria': row['categoria'],
-                'monto': row['monto']
-            })
-    
-    return {
-        'numero': num_habitacion,
-        'pasajero': datos_pasajero,
-        'consumos': lista_consumos,
-        'totales': totales,
-        'cantidad_consumos': len(lista_consumos)
-    }
+    return Folio(num_habitacion, datos_pasajero, lista_consumos, totales)
+
+
+def obtener_resumen_grupo(voucher, archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS):
+    """
+    Folio consolidado de todas las habitaciones ocupadas de un voucher.
+
+    Las habitaciones salen del índice voucher -> habitaciones del snapshot,
+    los consumos de una sola lectura del índice de consumos y los totales del
+    grupo de la matriz de totales del snapshot, sin releer los CSV por habitación.
+
+    Returns:
+        FolioGrupo, o None si el voucher no tiene habitaciones ocupadas
+    """
+    if not os.path.exists(archivo_pasajeros):
+        return None
+
+    from core.snapshot import obtener_snapshot
+    snapshot = obtener_snapshot(archivo_pasajeros=archivo_pasajeros, archivo_consumos=archivo_consumos)
+    habitaciones = snapshot.por_voucher.get(str(voucher).strip())
+    if not habitaciones:
+        return None
+
+    filas, indice = indice_consumos(archivo_consumos) if os.path.exists(archivo_consumos) else ([], {})
+    folios = []
+    for num_hab in habitaciones:
+        folio = Folio(num_hab, snapshot.ocupadas[num_hab],
+                      Consumo.desde_filas(filas, indice.get(num_hab, [])), snapshot.totales(num_hab))
+        folio.grupo = habitaciones
+        folios.append(folio)
+    return FolioGrupo(str(voucher).strip(), folios, snapshot.totales_grupo(habitaciones))
@@ -3,16 +3,16 @@ Módulo para gestionar el dashboard de habitaciones del hotel.
 Calcula estados y colores según ocupación y consumos.
 """
 
-import pandas as pd
 import os
 from datetime import datetime
 
-# Estructura del hotel
-PISOS = {
-    1: list(range(101, 122)),  # 101-121 (21 habitaciones)
-    2: list(range(222, 243)),  # 222-242 (21 habitaciones)
-    3: list(range(343, 354)),  # 343-353 (11 habitaciones)
-}
+from core.datos import a_entero
+from core.modelos import Estadia
+from core import inventario, reloj
+
+# Pisos y habitaciones: config/inventario.json (core/inventario.py)
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
 
 def obtener_titular_por_edad(pasajeros_lista):
     """
@@ -30,33 +30,64 @@ def obtener_titular_por_edad(pasajeros_lista):
     
     # Ordenar por edad de forma descendente
     try:
-        titular = max(pasajeros_lista, key=lambda p: int(p.get('Edad', 0)))
+        titular = max(pasajeros_lista, key=lambda p: a_entero(p.get('Edad', 0)))
         return titular
     except:
         # Si falla, retornar el primero
         return pasajeros_lista[0]
 
 
-def obtener_habitaciones_ocupadas(archivo_pasajeros='data/pasajeros.csv'):
+def obtener_habitaciones_ocupadas(archivo_pasajeros=DB_PASAJEROS):
     """
     Obtiene la lista de habitaciones ocupadas ACTUALMENTE desde el CSV de pasajeros.
     Solo retorna habitaciones donde la fecha de ingreso ya pasó o es hoy.
     
-    Para cada habitación, selecciona como titular al pasajero de mayor edad.
-    Si hay múltiples habitaciones con el mismo voucher (familia), selecciona
-    como titular al adulto mayor del grupo familiar completo.
+    Los datos salen del snapshot compartido (core/snapshot.py), que se
+    recalcula una sola vez por cada cambio en los CSV.
     
-    Retorna un diccionario con número de habitación como key y datos del titular.
+    Retorna un diccionario con número de habitación como key y la Estadia del titular.
     """
     if not os.path.exists(archivo_pasajeros):
         return {}
     
-    df = pd.read_csv(archivo_pasajeros)
-    fecha_hoy = datetime.now().strftime('%d/%m/%Y')
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_pasajeros=archivo_pasajeros).ocupadas
+
+
+def obtener_grupo_habitacion(num_habitacion, archivo_pasajeros=DB_PASAJEROS):
+    """
+    Habitaciones ocupadas que comparten voucher con la habitación (familias
+    en varias habitaciones), incluida ella. Sale del índice voucher ->
+    habitaciones del snapshot.
+    
+    Returns:
+        tupla ordenada de números de habitación
+    """
+    if not os.path.exists(archivo_pasajeros):
+        return (num_habitacion,)
+    
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_pasajeros=archivo_pasajeros).grupo_de(num_habitacion)
+
+
+def calcular_habitaciones_ocupadas(filas, fecha_hoy):
+    """
+    Calcula las habitaciones ocupadas a partir de las filas de pasajeros.
+    
+    Para cada habitación, selecciona como titular al pasajero de mayor edad.
+    Si hay múltiples habitaciones con el mismo voucher (familia), selecciona
+    como titular al adulto mayor del grupo familiar completo.
+    
+    Args:
+        filas: lista de diccionarios de pasajeros.csv (ver datos.leer_filas)
+        fecha_hoy: fecha de referencia en formato DD/MM/YYYY
     
+    Returns:
+        dict habitación -> Estadia del titular
+    """
     # Filtrar pasajeros que ya ingresaron
     pasajeros_activos = []
-    for _, row in df.iterrows():
+    for row in filas:
         fecha_ingreso = row['Fecha de ingreso']
         
         try:
@@ -64,10 +95,10 @@ def obtener_habitaciones_ocupadas(archivo_pasajeros='data/pasajeros.csv'):
             hoy_dt = datetime.strptime(fecha_hoy, '%d/%m/%Y')
             
             if ingreso_dt <= hoy_dt:
-                pasajeros_activos.append(row.to_dict())
+                pasajeros_activos.append(row)
         except:
             # Si hay error en la fecha, incluir por defecto
-            pasajeros_activos.append(row.to_dict())
+            pasajeros_activos.append(row)
     
     # Agrupar por voucher para identificar grupos familiares
     vouchers = {}
@@ -93,7 +124,7 @@ def obtener_habitaciones_ocupadas(archivo_pasajeros='data/pasajeros.csv'):
     
     # Primero agrupar todos los pasajeros por habitación
     for pasajero in pasajeros_activos:
-        num_hab = int(pasajero['Nro. habitación'])
+        num_hab = a_entero(pasajero['Nro. habitación'])
         if num_hab not in habitaciones_con_pasajeros:
             habitaciones_con_pasajeros[num_hab] = []
         habitaciones_con_pasajeros[num_hab].append(pasajero)
@@ -114,32 +145,31 @@ def obtener_habitaciones_ocupadas(archivo_pasajeros='data/pasajeros.csv'):
             titular = obtener_titular_por_edad(pasajeros_hab)
         
         if titular:
-            habitaciones_ocupadas[num_hab] = {
-                'pasajero': titular['Apellido y nombre'],
-                'plazas': int(titular['Plazas ocupadas']),
-                'ingreso': titular['Fecha de ingreso'],
-                'egreso': titular['Fecha de egreso'],
-                'servicios': titular['Servicios'],
-                'edad': int(titular.get('Edad', 0)),
-                'voucher': voucher
-            }
+            habitaciones_ocupadas[num_hab] = Estadia.desde_fila(titular, voucher=voucher, habitacion=num_hab)
     
     return habitaciones_ocupadas
 
 
-def obtener_habitaciones_reservadas_futuras(archivo_pasajeros='data/pasajeros.csv'):
+def obtener_habitaciones_reservadas_futuras(archivo_pasajeros=DB_PASAJEROS):
     """
     Obtiene la lista de habitaciones con reservas para ingresos futuros.
-    Retorna un diccionario con número de habitación como key y datos de la reserva.
+    Retorna un diccionario con número de habitación como key y la Estadia reservada.
     """
     if not os.path.exists(archivo_pasajeros):
         return {}
     
-    df = pd.read_csv(archivo_pasajeros)
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_pasajeros=archivo_pasajeros).reservadas
+
+
+def calcular_habitaciones_reservadas(filas, fecha_hoy):
+    """
+    Calcula las reservas futuras (ingreso posterior a fecha_hoy) a partir
+    de las filas de pasajeros.
+    """
     habitaciones_futuras = {}
-    fecha_hoy = datetime.now().strftime('%d/%m/%Y')
     
-    for _, row in df.iterrows():
+    for row in filas:
         fecha_ingreso = row['Fecha de ingreso']
         
         # Solo incluir si ingresa en el futuro (fecha ingreso > hoy)
@@ -148,20 +178,15 @@ def obtener_habitaciones_reservadas_futuras(archivo_pasajeros='data/pasajeros.cs
             hoy_dt = datetime.strptime(fecha_hoy, '%d/%m/%Y')
             
             if ingreso_dt > hoy_dt:
-                habitaciones_futuras[int(row['Nro. habitación'])] = {
-                    'pasajero': row['Apellido y nombre'],
-                    'plazas': int(row['Plazas ocupadas']),
-                    'ingreso': row['Fecha de ingreso'],
-                    'egreso': row['Fecha de egreso'],
-                    'servicios': row['Servicios']
-                }
+                reserva = Estadia.desde_fila(row)
+                habitaciones_futuras[reserva.habitacion] = reserva
         except:
             pass
     
     return habitaciones_futuras
 
 
-def obtener_habitaciones_con_consumos(archivo_consumos='data/consumos_diarios.csv'):
+def obtener_habitaciones_con_consumos(archivo_consumos=DB_CONSUMOS):
     """
     Obtiene la lista de habitaciones que tienen consumos registrados.
     Retorna un set con los números de habitación.
@@ -169,8 +194,8 @@ def obtener_habitaciones_con_consumos(archivo_consumos='data/consumos_diarios.cs
     if not os.path.exists(archivo_consumos):
         return set()
     
-    df = pd.read_csv(archivo_consumos)
-    return set(df['habitacion'].astype(int).unique())
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_consumos=archivo_consumos).con_consumos
 
 
 def es_checkout_hoy(fecha_egreso):
@@ -179,7 +204,7 @@ def es_checkout_hoy(fecha_egreso):
     Formato esperado: DD/MM/YYYY
     """
     try:
-        fecha_hoy = datetime.now().strftime('%d/%m/%Y')
+        fecha_hoy = reloj.fecha_hoy()
         return fecha_egreso == fecha_hoy
     except:
         return False
@@ -194,7 +219,7 @@ def obtener_habitaciones_checkout():
     checkouts_hoy = set()
     
     for num_hab, datos in habitaciones_ocupadas.items():
-        if es_checkout_hoy(datos['egreso']):
+        if es_checkout_hoy(datos.egreso):
             checkouts_hoy.add(num_hab)
     
     return checkouts_hoy
@@ -247,22 +272,22 @@ def obtener_datos_dashboard():
     habitaciones_reservadas = obtener_habitaciones_reservadas_futuras()
     habitaciones_con_consumos = obtener_habitaciones_con_consumos()
     checkouts_hoy = obtener_habitaciones_checkout()
+    alojamiento = inventario.actual()
     
     # Calcular estados de todas las habitaciones
     estados = {}
-    for piso, habitaciones in PISOS.items():
-        for num_hab in habitaciones:
-            estados[num_hab] = calcular_estado_habitacion(
-                num_hab, 
-                habitaciones_ocupadas, 
-                habitaciones_con_consumos,
-                checkouts_hoy,
-                habitaciones_reservadas
-            )
+    for num_hab in alojamiento.numeros:
+        estados[num_hab] = calcular_estado_habitacion(
+            num_hab, 
+            habitaciones_ocupadas, 
+            habitaciones_con_consumos,
+            checkouts_hoy,
+            habitaciones_reservadas
+        )
     
     # Calcular estadísticas correctamente
     # IMPORTANTE: Una habitación puede tener reserva futura Y estar ocupada hoy
-    total_habitaciones = sum(len(habs) for habs in PISOS.values())
+    total_habitaciones = len(alojamiento)
     total_ocupadas = len(habitaciones_ocupadas)
     total_con_consumos = len([h for h, e in estados.items() if e == 'con_consumos'])
     total_checkouts = len(checkouts_hoy)
@@ -285,7 +310,7 @@ def obtener_datos_dashboard():
     }
     
     return {
-        'pisos': PISOS,
+        'pisos': alojamiento.pisos,
         'estados': estados,
         'ocupadas': habitaciones_ocupadas,
         'reservadas': habitaciones_reservadas,
@@ -294,17 +319,38 @@ def obtener_datos_dashboard():
     }
 
 
-def obtener_total_consumos_habitacion(num_habitacion, archivo_consumos='data/consumos_diarios.csv'):
+def datos_mosaico(num_habitacion, datos):
+    """
+    Datos que muestra el mosaico de una habitación en el dashboard.
+    Son la clave de su fragmento cacheado (core/fragmentos.py): si no
+    cambian, el mosaico no se vuelve a renderizar.
+    
+    Args:
+        num_habitacion: número de habitación
+        datos: resultado de obtener_datos_dashboard()
+    
+    Returns:
+        dict con num_hab, estado, es_checkout, plazas, pasajero e ingreso
+    """
+    estado = datos['estados'][num_habitacion]
+    ocupada = datos['ocupadas'].get(num_habitacion) if estado in ('checkout', 'ocupada', 'con_consumos') else None
+    reserva = datos['reservadas'].get(num_habitacion) if estado == 'reservada' else None
+    return {
+        'num_hab': num_habitacion,
+        'estado': estado,
+        'es_checkout': num_habitacion in datos['checkouts_hoy'],
+        'plazas': ocupada.plazas if ocupada else None,
+        'pasajero': ocupada.pasajero if ocupada else None,
+        'ingreso': reserva.ingreso if reserva else None,
+    }
+
+
+def obtener_total_consumos_habitacion(num_habitacion, archivo_consumos=DB_CONSUMOS):
     """
     Calcula el total de consumos de una habitación específica.
     """
     if not os.path.exists(archivo_consumos):
         return 0
     
-    df = pd.read_csv(archivo_consumos)
-    consumos_hab = df[df['habitacion'] == num_habitacion]
-    
-    if consumos_hab.empty:
-        return 0
-    
-    return consumos_hab['monto'].sum()
+    from core.snapshot import obtener_snapshot
+    return obtener_snapshot(archivo_consumos=archivo_consumos).monto_total(num_habitacion)
@@ -0,0 +1,327 @@
+"""
+Módulo de acceso a los archivos CSV de datos (pasajeros y consumos).
+
+Centraliza lectura y escritura para que varios hilos o procesos del
+servidor de producción compartan un mismo criterio de caché:
+
+- Cada lectura compara la firma del archivo (inodo, tamaño, mtime).
+  Si otro worker escribió, la firma cambia y la caché local se descarta.
+  El propio archivo funciona como señal de invalidación entre procesos.
+- Las escrituras completas se hacen en un temporal y se reemplazan con
+  os.replace (atómico), bajo un bloqueo por archivo que sirve tanto
+  entre hilos (threading) como entre procesos (fcntl.flock).
+
+pandas se importa recién cuando se usa leer_csv/guardar_csv (rutas de
+análisis y reportes). Las rutas frecuentes usan leer_filas y
+agregar_registro, que trabajan con el módulo csv de la biblioteca estándar.
+
+Además de la caché en memoria, leer_csv usa una caché binaria en disco
+(core/cache_disco.py) para que un reinicio no vuelva a parsear los CSV.
+"""
+
+import csv
+import io
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from core import metricas, perfil
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo bloqueo entre hilos
+    fcntl = None
+
+# Caché en memoria: archivo -> (firma, DataFrame)
+_cache = {}
+# Caché en memoria: archivo -> (firma, lista de filas)
+_cache_filas = {}
+_cache_lock = threading.Lock()
+
+# Bloqueos por archivo
+_bloqueos = {}
+_bloqueos_lock = threading.Lock()
+
+
+def firma_archivo(archivo):
+    """
+    Retorna una firma que cambia con cada escritura del archivo.
+
+    Returns:
+        tuple (inodo, tamaño, mtime_ns) o None si el archivo no existe
+    """
+    try:
+        st = os.stat(archivo)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class _Bloqueo:
+    """Bloqueo reentrante por archivo, válido entre hilos y procesos."""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.ruta_lock = os.fspath(archivo) + '.lock'
+        self.rlock = threading.RLock()
+        self.local = threading.local()
+
+    def adquirir(self):
+        with metricas.espera_bloqueo(self.archivo):
+            self.rlock.acquire()
+            profundidad = getattr(self.local, 'profundidad', 0)
+            if profundidad == 0 and fcntl is not None:
+                os.makedirs(os.path.dirname(self.ruta_lock) or '.', exist_ok=True)
+                self.local.fd = os.open(self.ruta_lock, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self.local.fd, fcntl.LOCK_EX)
+        self.local.profundidad = profundidad + 1
+
+    def liberar(self):
+        self.local.profundidad -= 1
+        if self.local.profundidad == 0 and fcntl is not None:
+            fcntl.flock(self.local.fd, fcntl.LOCK_UN)
+            os.close(self.local.fd)
+            self.local.fd = None
+        self.rlock.release()
+
+
+def _obtener_bloqueo(archivo):
+    clave = os.path.abspath(archivo)
+    with _bloqueos_lock:
+        if clave not in _bloqueos:
+            _bloqueos[clave] = _Bloqueo(archivo)
+        return _bloqueos[clave]
+
+
+@contextmanager
+def bloqueo(archivo):
+    """
+    Context manager para operaciones leer-modificar-escribir sobre un archivo.
+    Evita que dos terminales pisen sus cambios (lost update).
+
+    Ejemplo:
+        with bloqueo(DB_CONSUMOS):
+            df = leer_csv(DB_CONSUMOS)
+            ...
+            guardar_csv(df, DB_CONSUMOS)
+    """
+    b = _obtener_bloqueo(archivo)
+    b.adquirir()
+    try:
+        yield
+    finally:
+        b.liberar()
+
+
+def invalidar(archivo=None):
+    """
+    Descarta la caché local de un archivo (o de todos si archivo es None).
+    Los demás workers detectan el cambio por la firma del archivo.
+    """
+    with _cache_lock:
+        if archivo is None:
+            _cache.clear()
+            _cache_filas.clear()
+        else:
+            _cache.pop(os.path.abspath(archivo), None)
+            _cache_filas.pop(os.path.abspath(archivo), None)
+
+
+def a_entero(valor):
+    """
+    Convierte una celda del CSV a entero ('101', '101.0' o 101 -> 101).
+    Lanza ValueError/TypeError si la celda no es numérica.
+    """
+    if isinstance(valor, int):
+        return valor
+    return int(float(valor))
+
+
+def leer_csv(archivo):
+    """
+    Lee un CSV usando la caché en memoria mientras el archivo no cambie.
+    En un proceso recién iniciado, el DataFrame sale de la caché en disco
+    (data/.cache/) si el CSV no cambió desde la última vez que se parseó.
+
+    Returns:
+        DataFrame (copia, el llamador puede modificarlo libremente)
+    """
+    import pandas as pd
+
+    from core.cache_disco import cargar_pickle
+
+    clave = os.path.abspath(archivo)
+    firma = firma_archivo(archivo)
+
+    with _cache_lock:
+        entrada = _cache.get(clave)
+    if entrada is not None and entrada[0] == firma:
+        perfil.registrar('lecturas_cache')
+        metricas.lectura_cache('csv_memoria', True)
+        return entrada[1].copy()
+    metricas.lectura_cache('csv_memoria', False)
+
+    df = cargar_pickle(archivo, 'df.pkl', lambda datos: pd.read_csv(io.BytesIO(datos)),
+                       extra=pd.__version__)
+
+    # Si el archivo cambió durante la lectura no se guarda en caché
+    if firma_archivo(archivo) == firma:
+        with _cache_lock:
+            _cache[clave] = (firma, df)
+    return df.copy()
+
+
+def leer_filas(archivo):
+    """
+    Lee un CSV con el módulo csv (sin pandas), usando caché mientras el
+    archivo no cambie. Todas las celdas quedan como texto.
+
+    Returns:
+        lista de diccionarios columna -> texto (compartida: no modificar)
+    """
+    clave = os.path.abspath(archivo)
+    firma = firma_archivo(archivo)
+
+    with _cache_lock:
+        entrada = _cache_filas.get(clave)
+    if entrada is not None and entrada[0] == firma:
+        perfil.registrar('lecturas_cache')
+        metricas.lectura_cache('csv_memoria', True)
+        return entrada[1]
+    metricas.lectura_cache('csv_memoria', False)
+
+    with open(archivo, newline='', encoding='utf-8') as f:
+        filas = list(csv.DictReader(f))
+        perfil.registrar('bytes_leidos', f.buffer.tell())
+    perfil.registrar('parseos_csv')
+
+    if firma_archivo(archivo) == firma:
+        with _cache_lock:
+            _cache_filas[clave] = (firma, filas)
+        metricas.archivo_csv(archivo, len(filas), firma[1], firma)
+    return filas
+
+
+def filas_desde_bytes(datos):
+    """Parsea el contenido de un CSV (bytes UTF-8) a una lista de diccionarios."""
+    perfil.registrar('parseos_csv')
+    return list(csv.DictReader(io.StringIO(datos.decode('utf-8'), newline='')))
+
+
+def leer_encabezado(archivo):
+    """Retorna la lista de columnas del CSV (vacía si no existe o está vacío)."""
+    try:
+        with open(archivo, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+    except FileNotFoundError:
+        return []
+
+
+def _celda(valor):
+    return '' if valor is None else valor
+
+
+def _escribir_atomico(archivo, escribir):
+    """
+    Escribe en un temporal del mismo directorio y lo reemplaza atómicamente.
+
+    Returns:
+        int: bytes escritos
+    """
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_', suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            escribir(f)
+            f.flush()
+            escritos = f.buffer.tell()
+        perfil.registrar('bytes_escritos', escritos)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, archivo)
+        return escritos
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def guardar_csv(df, archivo):
+    """
+    Escribe un DataFrame completo de forma atómica (temporal + os.replace).
+    Un lector concurrente ve el archivo anterior o el nuevo, nunca uno a medias.
+    """
+    with bloqueo(archivo):
+        escritos = _escribir_atomico(archivo, lambda f: df.to_csv(f, index=False))
+        invalidar(archivo)
+        metricas.archivo_csv(archivo, len(df), escritos, firma_archivo(archivo))
+
+
+def agregar_registro(registro, archivo):
+    """
+    Agrega una fila al final del CSV (crea el archivo con encabezado si no existe).
+
+    Args:
+        registro: diccionario columna -> valor
+        archivo: ruta del CSV
+    """
+    with bloqueo(archivo):
+        firma_anterior = firma_archivo(archivo)
+        columnas = leer_encabezado(archivo)
+        nuevo = not columnas
+        if nuevo:
+            columnas = list(registro)
+        else:
+            # Respetar el orden de columnas del archivo y asegurar salto de línea final
+            with open(archivo, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                falta_salto = f.read(1) != b'\n'
+
+        with open(archivo, 'w' if nuevo else 'a', newline='', encoding='utf-8') as f:
+            inicio = f.tell()
+            escritor = csv.writer(f, lineterminator='\n')
+            if nuevo:
+                escritor.writerow(columnas)
+            elif falta_salto:
+                f.write('\n')
+            escritor.writerow([_celda(registro.get(col)) for col in columnas])
+            escritos = f.tell() - inicio
+        perfil.registrar('bytes_escritos', escritos)
+        invalidar(archivo)
+        if nuevo:
+            metricas.archivo_csv(archivo, 1, escritos, firma_archivo(archivo))
+        else:
+            metricas.fila_agregada(archivo, firma_anterior, escritos, firma_archivo(archivo))
+
+
+def guardar_filas(filas, archivo, columnas):
+    """
+    Escribe filas (diccionarios) de forma atómica con el módulo csv.
+    Las celdas se escriben tal cual se leyeron, sin reformatear números.
+    """
+    def escribir(f):
+        escritor = csv.DictWriter(f, fieldnames=columnas, lineterminator='\n', extrasaction='ignore')
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+    with bloqueo(archivo):
+        escritos = _escribir_atomico(archivo, escribir)
+        invalidar(archivo)
+        metricas.archivo_csv(archivo, len(filas), escritos, firma_archivo(archivo))
+
+
+def guardar_texto(texto, archivo, filas=None):
+    """Reemplaza el CSV por un contenido ya armado (ej. un respaldo restaurado)."""
+    with bloqueo(archivo):
+        escritos = _escribir_atomico(archivo, lambda f: f.write(texto))
+        invalidar(archivo)
+        metricas.archivo_csv(archivo, filas if filas is not None else max(texto.count('\n') - 1, 0),
+                             escritos, firma_archivo(archivo))
+
+
+def reiniciar_csv(archivo, encabezado):
+    """Deja el CSV solo con la línea de encabezado."""
+    with bloqueo(archivo):
+        escritos = _escribir_atomico(archivo, lambda f: f.write(encabezado + '\n'))
+        invalidar(archivo)
+        metricas.archivo_csv(archivo, 0, escritos, firma_archivo(archivo))
@@ -0,0 +1,148 @@
+"""
+Montos de dinero como centavos enteros.
+
+Los montos se leen una sola vez al entrar (formulario, consumos_diarios.csv,
+respaldos) y de ahí en adelante son int / np.int64 en centavos: los totales
+por categoría, los del check-out y las planillas se suman con enteros, sin
+el redondeo acumulado de los float, y dan lo mismo sin importar el orden de
+la suma. Solo se vuelven texto o pesos al mostrarlos (filtro `moneda` de los
+templates) o al escribirlos (CSV, Excel, /metrics).
+
+consumos_diarios.csv sigue guardando pesos con decimales ('11000.0' en los
+archivos de siempre, '11000.00' en los consumos nuevos): ambos se leen igual.
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+_TRES_DECIMALES = re.compile(r'\.\d{3}')
+
+def a_centavos(valor):
+    """
+    Monto en pesos (texto, int, float o Decimal) -> centavos enteros.
+
+    Acepta punto o coma decimal ('1500.50', '1500,50') con hasta dos
+    decimales. Con tres o más lanza ValueError: en recepción '1.500' o
+    '12,345' suelen ser miles, no $1.50 ni $12.35. También lanza
+    ValueError si no es un monto válido.
+    """
+    if isinstance(valor, (int, np.integer)) and not isinstance(valor, bool):
+        return int(valor) * 100
+    texto = str(valor).strip()
+    if ',' in texto:
+        # '1500,50' es coma decimal; '1.500,50' es ambiguo
+        entero, _, decimales = texto.partition(',')
+        if '.' in texto or ',' in decimales:
+            raise ValueError(f'Monto inválido: {valor!r}')
+        texto = f'{entero}.{decimales}'
+    try:
+        pesos = Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f'Monto inválido: {valor!r}') from None
+    if not pesos.is_finite() or pesos.as_tuple().exponent < -2:
+        raise ValueError(f'Monto inválido: {valor!r}')
+    return int(pesos * 100)
+
+
+def centavos_o_cero(valor):
+    """
+    Como a_centavos, para celdas de consumos_diarios.csv: un monto vacío
+    (o NaN, como lo deja pandas) cuenta como 0 en lugar de lanzar ValueError.
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, float) and np.isnan(valor):
+        return 0
+    if isinstance(valor, str) and not valor.strip():
+        return 0
+    return a_centavos(valor)
+
+
+def celda_centavos(valor):
+    """Una celda de monto de consumos_diarios.csv, con la misma regla que columna_centavos."""
+    return int(columna_centavos([valor])[0])
+
+
+def columna_centavos(valores):
+    """
+    Columna de montos en pesos (textos del CSV o números) -> np.int64 en centavos.
+
+    Para las cargas en bloque (snapshot, cierres). Da lo mismo que
+    a_centavos celda por celda: los montos con hasta dos decimales pasan
+    por float (x * 100 queda a un error de redondeo de un entero); el
+    resto (coma decimal, tres decimales, texto) se convierte uno por uno
+    con a_centavos. Los montos vacíos cuentan como 0; los que no son un
+    monto válido también, con un aviso.
+
+    Los textos se miran como texto: '1.500' como float es 1.5, pero tiene
+    tres decimales y a_centavos lo rechaza.
+    """
+    try:
+        pesos = np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        return _columna_lenta(valores)
+    pesos = np.where(np.isfinite(pesos), pesos, 0.0)
+    centavos = pesos * 100
+    enteros = np.rint(centavos)
+    dudosos = np.abs(centavos - enteros) > 1e-9 * np.maximum(np.abs(centavos), 1.0)
+    dudosos |= _tres_decimales(valores)
+    resultado = enteros.astype(np.int64)
+    if dudosos.any():
+        posiciones = np.flatnonzero(dudosos)
+        resultado[posiciones] = _columna_lenta(np.asarray(valores, dtype=object)[posiciones])
+    return resultado
+
+
+def _tres_decimales(valores):
+    """Máscara de los textos con tres o más decimales tras el punto ('1.500', '12.345')."""
+    try:
+        todo = '\n'.join(valores)
+    except TypeError:
+        # Números (ya no se ve cómo estaban escritos) o textos mezclados con NaN
+        valores = [valor if isinstance(valor, str) else '' for valor in valores]
+        todo = '\n'.join(valores)
+    # Una sola búsqueda sobre toda la columna; celda por celda solo si hay alguno
+    if not _TRES_DECIMALES.search(todo):
+        return False
+    return np.fromiter((_TRES_DECIMALES.search(valor) is not None for valor in valores),
+                       dtype=bool, count=len(valores))
+
+
+def _columna_lenta(valores):
+    """Monto por monto con a_centavos: celdas vacías, coma decimal, tres decimales o texto."""
+    centavos = np.zeros(len(valores), dtype=np.int64)
+    invalidos = 0
+    for i, valor in enumerate(valores):
+        try:
+            centavos[i] = centavos_o_cero(valor)
+        except ValueError:
+            invalidos += 1
+    if invalidos:
+        print(f"⚠️ {invalidos} montos inválidos en consumos, contados como $0")
+    return centavos
+
+
+def a_pesos(centavos):
+    """Centavos -> pesos (float), para Excel, CSV de reportes y métricas (también arrays y DataFrames)."""
+    if isinstance(centavos, (int, np.integer)):
+        return int(centavos) / 100
+    return centavos / 100
+
+
+def formatear(centavos):
+    """12345 -> '123.45' (mismo formato que '%.2f')."""
+    centavos = int(centavos)
+    signo = '-' if centavos < 0 else ''
+    pesos, resto = divmod(abs(centavos), 100)
+    return f'{signo}{pesos}.{resto:02d}'
+
+
+# Los consumos nuevos se guardan en consumos_diarios.csv con este formato
+a_texto = formatear
+
+
+def moneda(centavos):
+    """Filtro de Jinja: `${{ total|moneda }}`."""
+    return formatear(centavos or 0)
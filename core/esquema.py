@@ -0,0 +1,157 @@
+"""
+Esquema declarado de pasajeros.csv y cargador por caso de uso.
+
+El rooming trae 28 columnas del sistema de reservas (Email, Teléfono,
+Transporte, Parada, Usuario...) pero cada consulta usa unas pocas.
+cargar_pasajeros(uso) lee solo las columnas de ese uso y con tipos
+compactos:
+
+- textos repetidos (Servicios, Sede, Entidad, Paquete, Estado...) como
+  categóricos: cada valor distinto se guarda una sola vez
+- habitación, plazas y edad como enteros chicos (int16/int8)
+- fechas DD/MM/YYYY parseadas una sola vez a datetime64 (NaT si inválida)
+
+El resultado se cachea en memoria y en disco (core/cache_disco.py) por
+uso, validado con la firma del archivo.
+
+Es solo para lectura: las rutas que modifican y vuelven a guardar
+pasajeros.csv siguen usando datos.leer_csv, que conserva todas las
+columnas tal cual están en el archivo.
+"""
+
+import io
+import os
+import threading
+
+from core import inventario, metricas, perfil
+from core.datos import firma_archivo
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+
+FORMATO_FECHA = '%d/%m/%Y'
+
+# Cambiar si se modifica ESQUEMA_PASAJEROS o USOS (invalida la caché en disco)
+VERSION_ESQUEMA = 1
+
+# Tipos: 'texto', 'categoria', 'fecha' o un dtype entero de NumPy
+ESQUEMA_PASAJEROS = {
+    'Cód. Alojamiento': 'categoria',
+    'Descripción': 'categoria',
+    'Nro. habitación': 'int16',
+    'Tipo habitación': 'categoria',
+    'Observación habitación': 'texto',
+    'Cantidad plazas': 'int8',
+    'Voucher': 'texto',
+    'Sede': 'categoria',
+    'Fecha de ingreso': 'fecha',
+    'Fecha de egreso': 'fecha',
+    'Plazas ocupadas': 'int8',
+    'Tipo documento': 'categoria',
+    'Nro. doc.': 'texto',
+    'Apellido y nombre': 'texto',
+    'Edad': 'int8',
+    'Entidad': 'categoria',
+    'Servicios': 'categoria',
+    'Paquete': 'categoria',
+    'Transporte': 'categoria',
+    'Fecha viaje': 'fecha',
+    'Hora viaje': 'categoria',
+    'Parada': 'categoria',
+    'Email': 'texto',
+    'Estado': 'categoria',
+    'Fecha de nacimiento': 'fecha',
+    'Teléfono': 'texto',
+    'Celular': 'texto',
+    'Usuario': 'categoria',
+}
+
+# Columnas que necesita cada caso de uso
+USOS = {
+    # Ocupación y reservas por habitación (fechas de estadía)
+    'disponibilidad': ['Nro. habitación', 'Fecha de ingreso', 'Fecha de egreso'],
+}
+
+# Caché en memoria: (archivo, uso) -> (firma, DataFrame)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _parsear_fechas(serie):
+    """
+    Convierte una columna categórica de fechas DD/MM/YYYY a datetime64.
+    Se parsea cada valor distinto una sola vez y se expande con los códigos.
+    """
+    import numpy as np
+    import pandas as pd
+
+    distintas = pd.to_datetime(serie.cat.categories, format=FORMATO_FECHA, errors='coerce')
+    codigos = serie.cat.codes.to_numpy()
+    valores = np.append(distintas.to_numpy(), np.datetime64('NaT'))
+    # Código -1 (celda vacía) apunta al NaT agregado al final
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
+
+
+def _parsear(datos, columnas):
+    """Parsea el CSV (bytes) aplicando el esquema a las columnas pedidas."""
+    import pandas as pd
+
+    encabezado = pd.read_csv(io.BytesIO(datos), nrows=0).columns
+    faltantes = [c for c in columnas if c not in encabezado]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en pasajeros.csv: {', '.join(faltantes)}")
+
+    # Los enteros los infiere el parser de pandas y luego se achican
+    tipos = {}
+    for columna in columnas:
+        tipo = ESQUEMA_PASAJEROS.get(columna, 'texto')
+        if tipo in ('categoria', 'fecha'):
+            tipos[columna] = 'category'
+        elif tipo == 'texto':
+            tipos[columna] = str
+    df = pd.read_csv(io.BytesIO(datos), usecols=columnas, dtype=tipos)[columnas]
+
+    for columna in columnas:
+        tipo = ESQUEMA_PASAJEROS.get(columna, 'texto')
+        if tipo == 'fecha':
+            df[columna] = _parsear_fechas(df[columna])
+        elif tipo.startswith('int'):
+            numeros = pd.to_numeric(df[columna], errors='coerce')
+            # Con celdas vacías o inválidas no hay entero posible: float32 con NaN
+            df[columna] = numeros.astype('float32' if numeros.isna().any() else tipo)
+    return df
+
+
+def cargar_pasajeros(uso, archivo=DB_PASAJEROS):
+    """
+    Carga pasajeros.csv con el esquema declarado, solo con las columnas del uso.
+
+    Args:
+        uso: clave de USOS ('disponibilidad')
+        archivo: ruta del CSV de pasajeros
+
+    Returns:
+        DataFrame tipado (copia, el llamador puede modificarlo)
+    """
+    from core.cache_disco import cargar_pickle
+
+    import pandas as pd
+
+    columnas = USOS[uso]
+    clave = (os.path.abspath(archivo), uso)
+    firma = firma_archivo(archivo)
+
+    with _cache_lock:
+        entrada = _cache.get(clave)
+    if entrada is not None and entrada[0] == firma:
+        perfil.registrar('lecturas_cache')
+        metricas.lectura_cache('csv_memoria', True)
+        return entrada[1].copy()
+    metricas.lectura_cache('csv_memoria', False)
+
+    df = cargar_pickle(archivo, f'{uso}.pkl', lambda datos: _parsear(datos, columnas),
+                       extra=f'{pd.__version__}|{VERSION_ESQUEMA}')
+
+    if firma_archivo(archivo) == firma:
+        with _cache_lock:
+            _cache[clave] = (firma, df)
+    return df.copy()
@@ -0,0 +1,167 @@
+"""
+Archivos estáticos servidos por la propia aplicación, sin depender de
+internet (Bootstrap está en static/vendor/), y compresión de las
+respuestas.
+
+- url_for('static', filename='estilos.css') genera un nombre con el hash
+  del contenido: /static/estilos.<hash>.css. El navegador lo guarda un
+  año sin volver a preguntar (Cache-Control: immutable); si el archivo
+  cambia, cambia el hash y por lo tanto la URL.
+- Cada archivo estático se lee y comprime (gzip, y brotli si el módulo
+  está instalado) una sola vez por versión; después se sirve de memoria.
+- Las páginas HTML, JSON y texto generadas por las rutas se comprimen al
+  vuelo si el navegador lo acepta y superan TAMANO_MINIMO.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli se usa solo gzip
+    brotli = None
+
+from core.datos import firma_archivo
+
+UN_ANIO = 365 * 24 * 3600
+TAMANO_MINIMO = 1024
+TIPOS_COMPRIMIBLES = ('text/html', 'text/css', 'text/plain', 'text/csv',
+                      'application/javascript', 'text/javascript', 'application/json',
+                      'image/svg+xml')
+
+# Nombre con hash: <base>.<12 hex>.<extensión>
+_CON_HASH = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[^./]+)$')
+
+# Caché: ruta absoluta -> (firma, Estatico)
+_estaticos = {}
+_estaticos_lock = threading.Lock()
+
+
+class Estatico:
+    """Contenido de un archivo estático y sus versiones comprimidas."""
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as f:
+            self.datos = f.read()
+        self.hash = hashlib.blake2b(self.datos, digest_size=6).hexdigest()
+        self.tipo = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+        self.comprimidos = {}
+        if _comprimible(self.tipo):
+            self.comprimidos['gzip'] = gzip.compress(self.datos, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.comprimidos['br'] = brotli.compress(self.datos, quality=11)
+
+
+def _comprimible(tipo):
+    return tipo is not None and tipo.split(';')[0].strip() in TIPOS_COMPRIMIBLES
+
+
+def obtener(carpeta, nombre):
+    """
+    Archivo estático `nombre` (relativo a `carpeta`), leído una vez por versión.
+
+    Returns:
+        Estatico o None si no existe
+    """
+    from werkzeug.security import safe_join
+
+    ruta = safe_join(carpeta, nombre)
+    if ruta is None or not os.path.isfile(ruta):
+        return None
+    firma = firma_archivo(ruta)
+    with _estaticos_lock:
+        guardado = _estaticos.get(ruta)
+        if guardado is not None and guardado[0] == firma:
+            return guardado[1]
+    estatico = Estatico(ruta)
+    with _estaticos_lock:
+        _estaticos[ruta] = (firma, estatico)
+    return estatico
+
+
+def nombre_con_hash(carpeta, nombre):
+    """'css/estilos.css' -> 'css/estilos.<hash>.css' (sin cambios si no existe)."""
+    estatico = obtener(carpeta, nombre)
+    if estatico is None:
+        return nombre
+    base, ext = os.path.splitext(nombre)
+    return f'{base}.{estatico.hash}{ext}'
+
+
+def _codificacion(aceptadas, disponibles):
+    """Mejor codificación que acepta el navegador entre las disponibles."""
+    for codificacion in ('br', 'gzip'):
+        if codificacion in disponibles and codificacion in aceptadas:
+            return codificacion
+    return None
+
+
+def _aceptadas(request):
+    return {valor for valor, calidad in request.accept_encodings if calidad > 0}
+
+
+def instalar(app):
+    """
+    Sirve /static con nombres con hash y comprime las respuestas de la
+    aplicación Flask.
+    """
+    from flask import Response, abort, request
+
+    carpeta = app.static_folder
+
+    @app.url_defaults
+    def _agregar_hash(endpoint, valores):
+        if endpoint == 'static' and 'filename' in valores:
+            valores['filename'] = nombre_con_hash(carpeta, valores['filename'])
+
+    def servir_estatico(filename):
+        pedido = None
+        coincide = _CON_HASH.match(filename)
+        if coincide and obtener(carpeta, filename) is None:
+            pedido = coincide.group('hash')
+            filename = coincide.group('base') + coincide.group('ext')
+        estatico = obtener(carpeta, filename)
+        if estatico is None:
+            abort(404)
+
+        codificacion = _codificacion(_aceptadas(request), estatico.comprimidos)
+        datos = estatico.comprimidos[codificacion] if codificacion else estatico.datos
+        respuesta = Response(datos, mimetype=estatico.tipo)
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.headers['Vary'] = 'Accept-Encoding'
+        respuesta.set_etag(f'{estatico.hash}-{codificacion or "identity"}')
+        if pedido == estatico.hash:
+            respuesta.headers['Cache-Control'] = f'public, max-age={UN_ANIO}, immutable'
+        else:
+            # Sin hash (o de una versión anterior): revalidar con el ETag
+            respuesta.headers['Cache-Control'] = 'no-cache'
+        return respuesta.make_conditional(request)
+
+    app.view_functions['static'] = servir_estatico
+
+    @app.after_request
+    def _comprimir(respuesta):
+        if (respuesta.direct_passthrough or respuesta.is_streamed or request.endpoint == 'static'
+                or 'Content-Encoding' in respuesta.headers
+                or not (200 <= respuesta.status_code < 300)
+                or not _comprimible(respuesta.mimetype)):
+            return respuesta
+        codificacion = _codificacion(_aceptadas(request), ('br', 'gzip') if brotli else ('gzip',))
+        if codificacion is None:
+            return respuesta
+        datos = respuesta.get_data()
+        if len(datos) < TAMANO_MINIMO:
+            return respuesta
+        if codificacion == 'br':
+            datos = brotli.compress(datos, quality=4)
+        else:
+            datos = gzip.compress(datos, compresslevel=6)
+        respuesta.set_data(datos)
+        respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
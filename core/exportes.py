@@ -0,0 +1,283 @@
+"""
+Exportaciones y cierres que pueden tardar (consulta de consumos, planilla
+de salidas, checkouts del día) e importación del rooming.
+
+Cada operación es una función de módulo que escribe su resultado en
+`destino` y avisa el avance con `progreso(porcentaje, mensaje)`. No usan
+Flask ni el reloj del proceso: la fecha llega como parámetro, así las
+puede correr core/tareas.py en otro proceso (una por núcleo, por ejemplo
+reportes de días distintos en paralelo).
+
+Returns de cada función:
+    dict con 'mensaje' (texto para el usuario) y 'nombre_descarga'
+    (nombre sugerido del archivo, None si no genera archivo)
+
+Los montos se suman en centavos enteros (core/dinero.py) y pasan a pesos
+recién al escribir el CSV o la planilla.
+"""
+
+import os
+from datetime import datetime
+
+from core import categorias, dinero, inventario
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+DIR_BACKUPS = inventario.DIR_BACKUPS
+
+ENCABEZADO_CONSUMOS = 'fecha,habitacion,pasajero,categoria,monto'
+
+# Planilla de salidas (replica salidas.xlsx): 7 filas de encabezado y al
+# menos 30 filas en total; con más habitaciones la planilla se alarga
+FILAS_PLANILLA = 30
+PRIMERA_FILA_DATOS = 7
+
+
+class SinDatos(Exception):
+    """No hay nada que exportar (sin consumos, sin checkouts...)."""
+
+
+def _sin_progreso(porcentaje, mensaje=''):
+    pass
+
+
+def _formato(fecha, formato):
+    """Convierte una fecha DD/MM/YYYY a otro formato."""
+    return datetime.strptime(fecha, '%d/%m/%Y').strftime(formato)
+
+
+def _consumos_del_dia(df, fecha):
+    """Filtra los consumos cargados en una fecha (None = todos)."""
+    if fecha is None:
+        return df
+    return df[df['fecha'].astype(str).str.startswith(fecha)]
+
+
+def _escribir_planilla(destino, fecha_texto, titulo, columnas, filas, total_relleno):
+    """
+    Escribe la planilla de salidas en XLSX.
+
+    Args:
+        fecha_texto: texto de la celda de fecha
+        titulo: texto de la fila de detalle
+        columnas: categorías, en el orden de la planilla (ver core/categorias.py)
+        filas: listas [hab, <una por categoría>, forma de pago, total]
+        total_relleno: Total de las filas que completan hasta FILAS_PLANILLA
+    """
+    import pandas as pd
+
+    ancho = len(columnas) + 3
+    max_filas = max(FILAS_PLANILLA, PRIMERA_FILA_DATOS + len(filas))
+    data = [[None] * ancho for _ in range(max_filas)]
+    data[0][0] = 'Pase de caja e información a turno mañana'
+    data[2][2] = 'Turno:   00 A 08 HS'
+    data[3][ancho - 2] = f'Fecha: {fecha_texto}'
+    data[4][0] = titulo
+    data[5] = ['HAB', *columnas, 'Forma de pago', 'Total']
+
+    fila_actual = PRIMERA_FILA_DATOS
+    for fila in filas:
+        data[fila_actual] = fila
+        fila_actual += 1
+    for i in range(fila_actual, max_filas):
+        data[i][ancho - 1] = total_relleno
+
+    pd.DataFrame(data).to_excel(destino, engine='openpyxl', index=False, header=False)
+
+
+def _fila_planilla(habitacion, montos, total):
+    """
+    [HAB, monto de cada categoría (vacío si es 0), Forma de pago, Total]
+
+    Recibe centavos y escribe pesos.
+    """
+    return [int(habitacion), *(dinero.a_pesos(monto) if monto > 0 else None for monto in montos),
+            None, dinero.a_pesos(total)]
+
+
+def _pivot_consumos(archivo_consumos, fecha_consumos):
+    from core.consumos import centavos_de
+    from core.datos import leer_csv
+
+    if not os.path.exists(archivo_consumos):
+        raise SinDatos('No hay consumos registrados.')
+    todos = leer_csv(archivo_consumos)
+    df = _consumos_del_dia(todos, fecha_consumos)
+    if df.empty:
+        raise SinDatos('No hay consumos registrados para ese día.' if fecha_consumos
+                       else 'No hay consumos registrados.')
+    df = df.assign(monto=centavos_de(df, archivo_consumos, filas_csv=len(todos)))
+    return df.pivot_table(
+        index=['habitacion', 'pasajero'],
+        columns='categoria',
+        values='monto',
+        aggfunc='sum',
+        fill_value=0
+    )
+
+
+def cierre_csv(destino, progreso=_sin_progreso, fecha=None, fecha_consumos=None,
+               archivo_consumos=DB_CONSUMOS):
+    """
+    Consulta de consumos agrupados por habitación y categoría (CSV).
+
+    Args:
+        fecha: día del cierre (DD/MM/YYYY), para el nombre del archivo
+        fecha_consumos: si se indica, solo los consumos cargados ese día
+    """
+    progreso(10, 'Leyendo consumos')
+    tabla_cierre = _pivot_consumos(archivo_consumos, fecha_consumos)
+
+    progreso(60, 'Agrupando por categoría')
+    columnas = categorias.catalogo().con_extras(tabla_cierre.columns)
+    tabla_cierre = tabla_cierre.reindex(columns=columnas, fill_value=0)
+    tabla_cierre['TOTAL_GENERAL'] = tabla_cierre.sum(axis=1)
+
+    progreso(90, 'Escribiendo archivo')
+    dinero.a_pesos(tabla_cierre).to_csv(destino)
+    return {
+        'mensaje': f'Consulta de consumos: {len(tabla_cierre)} habitaciones',
+        'nombre_descarga': f"consulta_consumos_{_formato(fecha, '%d-%m-%Y')}.csv",
+    }
+
+
+def cierre_xlsx(destino, progreso=_sin_progreso, fecha=None, fecha_consumos=None,
+                archivo_consumos=DB_CONSUMOS):
+    """
+    Planilla de salidas (XLSX) con los consumos de todas las habitaciones,
+    cada categoría en su columna.
+    """
+    progreso(10, 'Leyendo consumos')
+    tabla_pivot = _pivot_consumos(archivo_consumos, fecha_consumos).reset_index()
+
+    progreso(50, 'Armando planilla')
+    catalogo = categorias.catalogo()
+    columnas = catalogo.con_extras(tabla_pivot.columns.drop(['habitacion', 'pasajero']), orden=catalogo.planilla)
+    montos = tabla_pivot.reindex(columns=columnas, fill_value=0)
+    tabla_pivot['Total'] = montos.sum(axis=1)
+
+    filas = [
+        _fila_planilla(habitacion, valores, total)
+        for habitacion, valores, total in zip(
+            tabla_pivot['habitacion'], montos.itertuples(index=False), tabla_pivot['Total'])
+    ]
+
+    progreso(80, 'Escribiendo Excel')
+    _escribir_planilla(destino, _formato(fecha, '%Y-%m-%d'),
+                       'Detalle a cobrar de habitaciones con salida',
+                       columnas, filas, 0.0)
+    return {
+        'mensaje': f'Planilla de salidas: {len(filas)} habitaciones',
+        'nombre_descarga': f"salidas_{_formato(fecha, '%d-%m-%Y')}.xlsx",
+    }
+
+
+def salidas_checkouts(destino, progreso=_sin_progreso, fecha=None,
+                      archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS):
+    """
+    Planilla (XLSX) de las habitaciones con egreso en `fecha` y sus consumos.
+    """
+    from core.dashboard import calcular_habitaciones_ocupadas
+    from core.datos import a_entero, leer_filas
+
+    progreso(10, 'Buscando checkouts del día')
+    filas_pasajeros = leer_filas(archivo_pasajeros) if os.path.exists(archivo_pasajeros) else []
+    ocupadas = calcular_habitaciones_ocupadas(filas_pasajeros, fecha)
+    checkouts = sorted(hab for hab, datos in ocupadas.items() if datos.egreso == fecha)
+    if not checkouts:
+        raise SinDatos(f'No hay habitaciones con check-out programado para el {fecha}.')
+
+    progreso(40, 'Sumando consumos')
+    habitaciones, nombres, montos = [], [], []
+    if os.path.exists(archivo_consumos):
+        for fila in leer_filas(archivo_consumos):
+            try:
+                habitaciones.append(a_entero(fila['habitacion']))
+            except (TypeError, ValueError):
+                continue
+            nombres.append(fila['categoria'])
+            montos.append(fila['monto'])
+    catalogo = categorias.catalogo()
+    con_consumos, nombres, totales, _ = categorias.sumar(
+        habitaciones, nombres, dinero.columna_centavos(montos), catalogo)
+    columnas = catalogo.con_extras(nombres, orden=catalogo.planilla)
+    orden = [nombres.index(c) for c in columnas]
+    posicion = {int(hab): i for i, hab in enumerate(con_consumos)}
+
+    filas = []
+    for hab in checkouts:
+        i = posicion.get(hab)
+        t = totales[i, orden].tolist() if i is not None else [0] * len(columnas)
+        filas.append(_fila_planilla(hab, t, sum(t)))
+
+    progreso(80, 'Escribiendo Excel')
+    _escribir_planilla(destino, fecha, 'Detalle a cobrar de habitaciones con salida HOY',
+                       columnas, filas, None)
+    return {
+        'mensaje': f'Checkouts del {fecha}: {len(filas)} habitaciones',
+        'nombre_descarga': f"checkouts_{_formato(fecha, '%d-%m-%Y')}.xlsx",
+    }
+
+
+def importar_rooming(origen, progreso=_sin_progreso, modo='agregar',
+                     archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS,
+                     directorio_backups=DIR_BACKUPS):
+    """
+    Carga un CSV de pasajeros (rooming).
+
+    Args:
+        origen: CSV subido (ya validado en sus columnas)
+        modo: 'reemplazar' (pisa todo y limpia consumos) o 'agregar'
+            (reemplaza solo las habitaciones del archivo nuevo y sus consumos)
+        directorio_backups: respaldos del alojamiento (core/respaldos.py)
+    """
+    import pandas as pd
+
+    from core.datos import bloqueo, guardar_csv, leer_csv, reiniciar_csv
+
+    from core.respaldos import respaldar
+
+    progreso(5, 'Guardando backup del rooming actual')
+    respaldar(archivo_pasajeros, f'Carga de rooming ({modo})', tipo='rooming', directorio=directorio_backups)
+
+    progreso(20, 'Leyendo archivo nuevo')
+    df_nuevo = pd.read_csv(origen)
+
+    if modo == 'reemplazar':
+        progreso(60, 'Reemplazando pasajeros')
+        guardar_csv(df_nuevo, archivo_pasajeros)
+        if os.path.exists(archivo_consumos):
+            reiniciar_csv(archivo_consumos, ENCABEZADO_CONSUMOS)
+        return {
+            'mensaje': f'Archivo reemplazado completamente ({len(df_nuevo)} pasajeros). Consumos limpiados.',
+            'nombre_descarga': None,
+        }
+
+    with bloqueo(archivo_pasajeros):
+        if not os.path.exists(archivo_pasajeros):
+            guardar_csv(df_nuevo, archivo_pasajeros)
+            return {'mensaje': f'Archivo creado con {len(df_nuevo)} pasajeros.', 'nombre_descarga': None}
+
+        progreso(40, 'Combinando con las reservas existentes')
+        df_existente = leer_csv(archivo_pasajeros)
+        habitaciones_nuevas = df_nuevo['Nro. habitación'].unique()
+        df_mantener = df_existente[~df_existente['Nro. habitación'].isin(habitaciones_nuevas)]
+        df_final = pd.concat([df_mantener, df_nuevo], ignore_index=True)
+
+        # Eliminar consumos SOLO de las habitaciones que se están reemplazando
+        if os.path.exists(archivo_consumos):
+            progreso(60, 'Limpiando consumos de las habitaciones reemplazadas')
+            with bloqueo(archivo_consumos):
+                df_consumos = leer_csv(archivo_consumos)
+                df_consumos = df_consumos[~df_consumos['habitacion'].isin(habitaciones_nuevas)]
+                guardar_csv(df_consumos, archivo_consumos)
+
+        progreso(80, 'Guardando pasajeros')
+        guardar_csv(df_final, archivo_pasajeros)
+
+    return {
+        'mensaje': (f'Archivo agregado: {len(df_nuevo)} nuevos pasajeros. '
+                    f'Mantenidas: {len(df_mantener)} reservas existentes. '
+                    f'Total: {len(df_final)} pasajeros.'),
+        'nombre_descarga': None,
+    }
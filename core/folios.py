@@ -0,0 +1,249 @@
+"""
+Archivo de folios cerrados: cada check-out (individual o masivo) guarda
+la cuenta final de la habitación antes de borrar sus consumos.
+
+Antes, al confirmar el check-out los consumos se borraban ("se consideran
+pagados") y no quedaba registro de lo cobrado; para reimprimir o revisar
+una cuenta había que buscar en los respaldos.
+
+- <datos>/folios/folios.jsonl: un folio por línea (titular, estadía,
+  consumos y totales por categoría, en centavos), solo agregando líneas.
+- <datos>/folios/indice.jsonl: por cada folio su número, offset y largo
+  dentro de folios.jsonl, fecha de cierre, habitación, pasajero y
+  documento. Cada worker lo relee solo desde su última lectura (como
+  core/historial.py) y arma en memoria los índices por número, por
+  documento, por pasajero y por fecha.
+- Reimprimir un folio es un seek al offset y una sola lectura, sin
+  recorrer el archivo.
+- Un check-out masivo escribe todos sus folios con un solo write por
+  archivo, bajo un solo bloqueo.
+
+Si el índice quedó atrás del archivo (corte entre las dos escrituras), el
+próximo archivar() indexa los folios que faltan antes de agregar nuevos.
+"""
+
+import json
+import os
+import threading
+
+from core import categorias, inventario, reloj
+from core.datos import bloqueo
+
+DIR_FOLIOS = inventario.RutaDatos('folios')
+ARCHIVO = 'folios.jsonl'
+INDICE = 'indice.jsonl'
+LIMITE_LISTA = 200
+
+# Índices en memoria: directorio -> Indice
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def _clave_pasajero(nombre):
+    from core.busqueda import normalizar
+    return ' '.join(normalizar(nombre).split())
+
+
+class Indice:
+    """Entradas de indice.jsonl, por número, documento, pasajero y fecha de cierre."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.ruta = os.path.join(directorio, INDICE)
+        self.por_numero = {}
+        self.por_documento = {}
+        self.por_pasajero = {}
+        self.por_fecha = {}
+        self.fin_archivo = 0    # primer byte de folios.jsonl sin indexar
+        self.inodo = None
+        self.offset = 0
+
+    @property
+    def ultimo(self):
+        return max(self.por_numero, default=0)
+
+    def actualizar(self):
+        """Aplica las líneas agregadas a indice.jsonl desde la última lectura."""
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inodo or st.st_size < self.offset:
+            self.__init__(self.directorio)
+            self.inodo = st.st_ino
+        if st.st_size == self.offset:
+            return
+        with open(self.ruta, 'rb') as f:
+            f.seek(self.offset)
+            datos = f.read(st.st_size - self.offset)
+        completo = datos.rfind(b'\n') + 1
+        for linea in datos[:completo].splitlines():
+            if linea.strip():
+                self._aplicar(json.loads(linea))
+        self.offset += completo
+
+    def _aplicar(self, entrada):
+        numero = entrada['numero']
+        self.por_numero[numero] = entrada
+        if entrada.get('documento'):
+            self.por_documento.setdefault(entrada['documento'], []).append(numero)
+        self.por_pasajero.setdefault(_clave_pasajero(entrada['pasajero']), []).append(numero)
+        self.por_fecha.setdefault(entrada['fecha'], []).append(numero)
+        self.fin_archivo = max(self.fin_archivo, entrada['offset'] + entrada['largo'])
+
+
+def _entrada(registro, offset, largo):
+    """Línea de indice.jsonl de un folio."""
+    return {
+        'numero': registro['numero'],
+        'offset': offset,
+        'largo': largo,
+        'fecha': registro['fecha'],
+        'habitacion': registro['habitacion'],
+        'pasajero': registro['pasajero'],
+        'documento': registro['documento'],
+        'total': registro['total'],
+    }
+
+
+def _indice(directorio):
+    with _indices_lock:
+        indice = _indices.setdefault(directorio, Indice(directorio))
+        indice.actualizar()
+        return indice
+
+
+def _reindexar(indice, ruta_archivo):
+    """Entradas de los folios de folios.jsonl que no llegaron al índice."""
+    try:
+        tamano = os.path.getsize(ruta_archivo)
+    except FileNotFoundError:
+        return []
+    if tamano <= indice.fin_archivo:
+        return []
+    entradas = []
+    with open(ruta_archivo, 'rb') as f:
+        f.seek(indice.fin_archivo)
+        offset = indice.fin_archivo
+        for linea in f:
+            if linea.endswith(b'\n'):
+                try:
+                    entradas.append(_entrada(json.loads(linea), offset, len(linea)))
+                except (ValueError, KeyError):
+                    pass
+            offset += len(linea)
+    return entradas
+
+
+def _registro(folio, numero, cerrado):
+    """Folio (core/modelos.py) -> registro de folios.jsonl, con los totales de sus consumos."""
+    from core.historial import documento
+
+    pasajero = folio.pasajero
+    totales = dict.fromkeys(categorias.catalogo().nombres, 0)
+    for consumo in folio.consumos:
+        totales[consumo.categoria] = totales.get(consumo.categoria, 0) + consumo.monto
+    return {
+        'numero': numero,
+        'cerrado': cerrado.strftime('%d/%m/%Y %H:%M'),
+        'fecha': cerrado.strftime('%d/%m/%Y'),
+        'alojamiento': inventario.actual().codigo,
+        'habitacion': folio.numero,
+        'pasajero': pasajero.pasajero,
+        'documento': documento(pasajero.documento),
+        'voucher': pasajero.voucher,
+        'plazas': pasajero.plazas,
+        'ingreso': pasajero.ingreso,
+        'egreso': pasajero.egreso,
+        'servicios': pasajero.servicios,
+        'consumos': [{'fecha': c.fecha, 'categoria': c.categoria, 'monto': c.monto} for c in folio.consumos],
+        'totales': totales,
+        'total': sum(totales.values()),
+    }
+
+
+def archivar(folios, directorio=DIR_FOLIOS):
+    """
+    Agrega folios cerrados al archivo (un solo write por archivo).
+
+    Args:
+        folios: lista de Folio con sus consumos
+
+    Returns:
+        lista con el número asignado a cada folio
+    """
+    if not folios:
+        return []
+    directorio = os.path.abspath(directorio)
+    os.makedirs(directorio, exist_ok=True)
+    ruta_archivo = os.path.join(directorio, ARCHIVO)
+    cerrado = reloj.ahora()
+
+    with bloqueo(ruta_archivo):
+        indice = _indice(directorio)
+        pendientes = _reindexar(indice, ruta_archivo)
+        numero = max([indice.ultimo] + [e['numero'] for e in pendientes])
+
+        with open(ruta_archivo, 'a+b') as f:
+            offset = f.seek(0, os.SEEK_END)
+            bloque = bytearray()
+            if offset:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    # Línea a medio escribir de un corte anterior: se cierra y se saltea
+                    bloque += b'\n'
+                    offset += 1
+            numeros = []
+            for folio in folios:
+                numero += 1
+                registro = _registro(folio, numero, cerrado)
+                linea = (json.dumps(registro, ensure_ascii=False) + '\n').encode('utf-8')
+                pendientes.append(_entrada(registro, offset, len(linea)))
+                bloque += linea
+                offset += len(linea)
+                numeros.append(numero)
+            f.write(bloque)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with open(indice.ruta, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in pendientes))
+            f.flush()
+        with _indices_lock:
+            indice.actualizar()
+    return numeros
+
+
+def obtener(numero, directorio=DIR_FOLIOS):
+    """Folio archivado por número (dict de folios.jsonl), o None si no existe."""
+    directorio = os.path.abspath(directorio)
+    entrada = _indice(directorio).por_numero.get(numero)
+    if entrada is None:
+        return None
+    with open(os.path.join(directorio, ARCHIVO), 'rb') as f:
+        f.seek(entrada['offset'])
+        return json.loads(f.read(entrada['largo']))
+
+
+def buscar(texto='', fecha=None, directorio=DIR_FOLIOS, limite=LIMITE_LISTA):
+    """
+    Folios archivados (entradas del índice), los más recientes primero.
+
+    Args:
+        texto: Nro. doc. (solo dígitos) o parte del nombre del pasajero; vacío = todos
+        fecha: DD/MM/YYYY del check-out (None = cualquiera)
+    """
+    from core.historial import documento
+
+    indice = _indice(os.path.abspath(directorio))
+    texto = str(texto or '').strip()
+    if texto.replace('.', '').isdigit():
+        numeros = indice.por_documento.get(documento(texto), [])
+    elif texto:
+        buscado = _clave_pasajero(texto)
+        numeros = [n for clave, lista in indice.por_pasajero.items() if buscado in clave for n in lista]
+    else:
+        numeros = indice.por_numero
+    if fecha:
+        numeros = set(numeros) & set(indice.por_fecha.get(fecha, ()))
+    return [indice.por_numero[n] for n in sorted(numeros, reverse=True)[:limite]]
@@ -0,0 +1,115 @@
+"""
+Caché de fragmentos HTML ya renderizados (mosaicos del dashboard,
+encabezado de estadísticas, secciones de la ficha).
+
+Cada fragmento es una plantilla chica de templates/fragmentos/ y se
+guarda con los datos con los que se renderizó como clave: si una
+habitación no cambió (mismo estado, titular, plazas...), su HTML se
+reutiliza tal cual y solo se vuelven a renderizar las que cambiaron.
+Con cientos de habitaciones el costo del dashboard pasa a ser el de
+buscar en un diccionario.
+
+- Se guardan hasta MAX_FRAGMENTOS (LRU): con 53 habitaciones y sus
+  variantes de estado alcanza de sobra.
+- Si la plantilla se recarga (modo --dev), sus fragmentos se descartan.
+"""
+
+import threading
+from collections import OrderedDict
+
+from core import metricas
+
+MAX_FRAGMENTOS = 4000
+
+# (plantilla, clave) -> (Template con la que se renderizó, Markup)
+_fragmentos = OrderedDict()
+_lock = threading.Lock()
+
+
+def renderizar(plantilla, clave=None, **contexto):
+    """
+    Renderiza una plantilla de fragmento, o devuelve el HTML ya renderizado
+    con los mismos datos.
+
+    Args:
+        plantilla: ruta dentro de templates/ (ej. 'fragmentos/habitacion.html')
+        clave: valor hashable que identifica los datos; por defecto, el
+            propio contexto (sus valores deben ser hashables)
+        **contexto: variables de la plantilla
+
+    Returns:
+        Markup con el HTML del fragmento
+    """
+    from flask import current_app
+    from markupsafe import Markup
+
+    if clave is None:
+        clave = tuple(sorted(contexto.items()))
+    clave = (plantilla, clave)
+    template = current_app.jinja_env.get_template(plantilla)
+
+    with _lock:
+        guardado = _fragmentos.get(clave)
+        if guardado is not None and guardado[0] is template:
+            _fragmentos.move_to_end(clave)
+            metricas.lectura_cache('fragmentos', True)
+            return guardado[1]
+
+    metricas.lectura_cache('fragmentos', False)
+    html = Markup(template.render(**contexto))
+    with _lock:
+        _fragmentos[clave] = (template, html)
+        _fragmentos.move_to_end(clave)
+        while len(_fragmentos) > MAX_FRAGMENTOS:
+            _fragmentos.popitem(last=False)
+    return html
+
+
+def renderizar_varios(plantilla, contextos):
+    """
+    Como renderizar(), para muchos fragmentos de la misma plantilla (los
+    mosaicos del dashboard): una sola búsqueda de la plantilla y un solo
+    bloqueo para todos.
+
+    Args:
+        contextos: lista de dicts con las variables de cada fragmento (la
+            clave de cada uno es su propio contexto)
+
+    Returns:
+        lista de Markup, en el mismo orden
+    """
+    from flask import current_app
+    from markupsafe import Markup
+
+    template = current_app.jinja_env.get_template(plantilla)
+    claves = [(plantilla, tuple(contexto.items())) for contexto in contextos]
+    resultado = [None] * len(contextos)
+    faltantes = []
+    with _lock:
+        for i, clave in enumerate(claves):
+            guardado = _fragmentos.get(clave)
+            if guardado is not None and guardado[0] is template:
+                _fragmentos.move_to_end(clave)
+                resultado[i] = guardado[1]
+            else:
+                faltantes.append(i)
+
+    aciertos = len(contextos) - len(faltantes)
+    if aciertos:
+        metricas.lectura_cache('fragmentos', True, aciertos)
+    if faltantes:
+        metricas.lectura_cache('fragmentos', False, len(faltantes))
+        for i in faltantes:
+            resultado[i] = Markup(template.render(**contextos[i]))
+        with _lock:
+            for i in faltantes:
+                _fragmentos[claves[i]] = (template, resultado[i])
+            while len(_fragmentos) > MAX_FRAGMENTOS:
+                _fragmentos.popitem(last=False)
+    return resultado
+
+
+def vaciar():
+    """Descarta todos los fragmentos (ej. después de cambiar plantillas)."""
+    with _lock:
+        _fragmentos.clear()
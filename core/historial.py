@@ -0,0 +1,349 @@
+"""
+Historial de huéspedes entre temporadas: estadías anteriores de cada
+pasajero (por Nro. doc.) sacadas de los backups del rooming y de las
+temporadas archivadas, con los consumos de cada estadía cuando existen.
+
+Con eso la ficha de la habitación avisa "huésped que regresa, 3
+estadías anteriores" sin revisar backups a mano.
+
+- El índice vive en <datos>/.historial/historial.jsonl, solo agregando
+  líneas: estadías, totales de consumos por habitación y día de cada
+  temporada archivada, y una marca por cada archivo ya procesado.
+- Cada backup nuevo se procesa una sola vez; los ya marcados no se
+  vuelven a leer. Uno que no se puede leer también queda marcado (con el
+  error), para no reintentarlo ni repetir el aviso en cada ficha. Cada
+  worker relee solo las líneas agregadas desde su última lectura (mismo
+  inodo, desde el offset anterior).
+- Mientras no cambien el catálogo de respaldos ni los directorios de
+  backups y de datos, no se vuelven a buscar backups nuevos.
+- Una estadía se identifica por (documento, habitación, ingreso): los
+  backups son copias completas y repiten las mismas estadías; vale la
+  última versión leída (por ejemplo, con el egreso corregido).
+
+Orígenes:
+    respaldos de <datos>/backups (core/respaldos.py): pasajeros.csv de
+    cualquier respaldo, consumos_diarios.csv de los reinicios de temporada
+    <datos>/backups/pasajeros_backup_*.csv        (copias anteriores a los respaldos)
+    <datos>/consumos_diarios_BACKUP_*.csv          (ídem, reinicios de temporada)
+Los consumos de la temporada en curso se suman desde consumos_diarios.csv.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+from datetime import datetime
+
+from core import dinero, inventario, metricas, reloj, respaldos
+from core.datos import a_entero, bloqueo, firma_archivo, leer_filas
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+DIR_BACKUPS = inventario.DIR_BACKUPS
+DIRECTORIO = '.historial'
+PREFIJO_PASAJEROS = 'pasajeros_backup_'
+PREFIJO_CONSUMOS = 'consumos_diarios_BACKUP_'
+
+# Historial en memoria: ruta del índice -> Historial
+_historiales = {}
+_historiales_lock = threading.Lock()
+
+# Orígenes ya revisados sin pendientes: (datos, backups) -> firma de catálogo y directorios
+_revisados = {}
+
+# Ocupantes actuales por archivo de pasajeros: ruta -> (firma, {habitación: [filas]})
+_ocupantes = {}
+_ocupantes_lock = threading.Lock()
+
+
+def documento(valor):
+    """'30.123.456' -> '30123456' (None si no identifica a nadie, ej. '00000000' de un walk-in)."""
+    digitos = ''.join(c for c in str(valor or '') if c.isdigit()).lstrip('0')
+    return digitos or None
+
+
+def _ordinal(fecha):
+    try:
+        return datetime.strptime(str(fecha)[:10], '%d/%m/%Y').toordinal()
+    except ValueError:
+        return 0
+
+
+class Historial:
+    """Estadías por documento y consumos archivados, cargados desde el .jsonl."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.estadias = {}      # documento -> {(habitación, ingreso): estadía}
+        self.consumos = {}      # (habitación, ordinal del día) -> total en centavos
+        self.procesados = set()
+        self.inodo = None
+        self.offset = 0
+
+    def actualizar(self):
+        """Aplica las líneas agregadas al archivo desde la última lectura."""
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inodo or st.st_size < self.offset:
+            # Archivo nuevo o recreado: leer desde el principio
+            self.__init__(self.ruta)
+            self.inodo = st.st_ino
+        if st.st_size == self.offset:
+            return
+        with open(self.ruta, 'rb') as f:
+            f.seek(self.offset)
+            datos = f.read(st.st_size - self.offset)
+        # Una línea a medio escribir por otro proceso se lee la próxima vez
+        completo = datos.rfind(b'\n') + 1
+        for linea in datos[:completo].splitlines():
+            if linea.strip():
+                self._aplicar(json.loads(linea))
+        self.offset += completo
+
+    def _aplicar(self, registro):
+        tipo = registro.get('tipo')
+        if tipo == 'estadia':
+            clave = (registro['habitacion'], registro['ingreso'])
+            self.estadias.setdefault(registro['documento'], {})[clave] = registro
+        elif tipo == 'consumos':
+            # 'centavos' (enteros); los índices anteriores guardaban 'totales' en pesos
+            if 'centavos' in registro:
+                totales = registro['centavos'].items()
+            else:
+                totales = ((clave, dinero.a_centavos(round(total, 2))) for clave, total in registro['totales'].items())
+            for clave, total in totales:
+                habitacion, dia = clave.split('|')
+                clave = (int(habitacion), int(dia))
+                self.consumos[clave] = self.consumos.get(clave, 0) + total
+        elif tipo == 'archivo':
+            self.procesados.add(registro['nombre'])
+
+    def anteriores(self, doc, antes_de):
+        """Estadías del documento que empezaron antes del ordinal `antes_de`, más recientes primero."""
+        estadias = [e for e in self.estadias.get(doc, {}).values() if _ordinal(e['ingreso']) < antes_de]
+        estadias.sort(key=lambda e: _ordinal(e['ingreso']), reverse=True)
+        return estadias
+
+
+def _leer_estadias(abrir):
+    """Líneas 'estadia' de un backup de pasajeros (abrir() devuelve el CSV abierto)."""
+    with abrir() as f:
+        for fila in csv.DictReader(f):
+            doc = documento(fila.get('Nro. doc.'))
+            if doc is None or not fila.get('Fecha de ingreso'):
+                continue
+            yield {
+                'tipo': 'estadia',
+                'documento': doc,
+                'pasajero': fila.get('Apellido y nombre', ''),
+                'habitacion': a_entero(fila.get('Nro. habitación')),
+                'ingreso': fila['Fecha de ingreso'],
+                'egreso': fila.get('Fecha de egreso', ''),
+                'voucher': str(fila.get('Voucher', '')).strip(),
+                'servicios': fila.get('Servicios', ''),
+            }
+
+
+def _leer_consumos(abrir):
+    """Línea 'consumos' (totales por habitación y día) de una temporada archivada."""
+    totales = {}
+    with abrir() as f:
+        for fila in csv.DictReader(f):
+            try:
+                clave = f"{a_entero(fila['habitacion'])}|{_ordinal(fila['fecha'])}"
+                totales[clave] = totales.get(clave, 0) + dinero.a_centavos(fila['monto'])
+            except (KeyError, TypeError, ValueError):
+                continue
+    return {'tipo': 'consumos', 'centavos': totales}
+
+
+def _abrir_archivo(ruta):
+    return lambda: open(ruta, newline='', encoding='utf-8-sig')
+
+
+def _abrir_respaldo(entrada, directorio):
+    return lambda: io.StringIO(respaldos.leer(entrada, directorio).decode('utf-8-sig'), newline='')
+
+
+def _firma_origenes(directorio_datos, directorio_backups):
+    """Cambia al agregarse un respaldo o un backup suelto (o cualquier archivo en esos directorios)."""
+    return (firma_archivo(os.path.join(directorio_backups, respaldos.CATALOGO)),
+            firma_archivo(directorio_backups), firma_archivo(directorio_datos))
+
+
+def _pendientes(directorio_datos, directorio_backups, procesados):
+    """(nombre, origen, abrir, lector) de los respaldos que todavía no están en el historial."""
+    pendientes = []
+    # Respaldos del catálogo: uno por contenido (los repetidos no aportan nada)
+    vistos = set()
+    for entrada in sorted(respaldos.listar(directorio_backups), key=lambda e: e['ts']):
+        nombre = f"respaldo:{entrada['hash']}"
+        if entrada['archivo'] == 'pasajeros.csv':
+            lector = _leer_estadias
+        elif entrada['archivo'] == 'consumos_diarios.csv' and entrada['tipo'] == 'temporada':
+            lector = _leer_consumos
+        else:
+            continue
+        if nombre not in procesados and nombre not in vistos:
+            vistos.add(nombre)
+            pendientes.append((nombre, f"el respaldo del {entrada['momento']}",
+                               _abrir_respaldo(entrada, directorio_backups), lector))
+    for directorio, prefijo, lector in ((directorio_backups, PREFIJO_PASAJEROS, _leer_estadias),
+                                        (directorio_datos, PREFIJO_CONSUMOS, _leer_consumos)):
+        try:
+            nombres = sorted(os.listdir(directorio))
+        except FileNotFoundError:
+            continue
+        for nombre in nombres:
+            if nombre.startswith(prefijo) and nombre.endswith('.csv') and nombre not in procesados:
+                ruta = os.path.join(directorio, nombre)
+                pendientes.append((nombre, ruta, _abrir_archivo(ruta), lector))
+    return pendientes
+
+
+def _procesar(historial, pendientes):
+    """
+    Agrega al .jsonl los archivos pendientes (bajo el bloqueo del índice).
+    De cada backup se escriben solo las estadías nuevas o que cambiaron:
+    el resto ya está en el historial por un backup anterior.
+    """
+    escritas = {}
+    with open(historial.ruta, 'a', encoding='utf-8') as f:
+        for nombre, origen, abrir, lector in pendientes:
+            try:
+                registros = lector(abrir)
+                if isinstance(registros, dict):
+                    registros = [registros]
+                lineas = []
+                nuevas = {}
+                for registro in registros:
+                    if registro['tipo'] == 'estadia':
+                        clave = (registro['documento'], registro['habitacion'], registro['ingreso'])
+                        anterior = (nuevas.get(clave) or escritas.get(clave)
+                                    or historial.estadias.get(clave[0], {}).get(clave[1:]))
+                        if anterior == registro:
+                            continue
+                        nuevas[clave] = registro
+                    lineas.append(json.dumps(registro, ensure_ascii=False))
+            except (OSError, ValueError, csv.Error) as e:
+                # Queda marcado igual: un backup dañado no se reintenta en cada ficha
+                print(f"⚠️  No se pudo leer {origen} para el historial: {e}")
+                lineas = [json.dumps({'tipo': 'archivo', 'nombre': nombre, 'error': str(e)},
+                                     ensure_ascii=False)]
+            else:
+                escritas.update(nuevas)
+                lineas.append(json.dumps({'tipo': 'archivo', 'nombre': nombre}, ensure_ascii=False))
+            f.write('\n'.join(lineas) + '\n')
+            f.flush()
+
+
+def obtener_historial(directorio_datos=None, directorio_backups=DIR_BACKUPS):
+    """
+    Historial vigente: procesa los backups nuevos (si hay) y devuelve el
+    índice en memoria.
+    """
+    directorio_datos = os.path.abspath(directorio_datos or inventario.actual().datos)
+    directorio_backups = os.path.abspath(directorio_backups)
+    ruta = os.path.join(directorio_datos, DIRECTORIO, 'historial.jsonl')
+    origenes = (directorio_datos, directorio_backups)
+
+    with _historiales_lock:
+        historial = _historiales.setdefault(ruta, Historial(ruta))
+        historial.actualizar()
+        firma = _firma_origenes(directorio_datos, directorio_backups)
+        if _revisados.get(origenes) == firma:
+            metricas.lectura_cache('historial', True)
+            return historial
+        pendientes = _pendientes(directorio_datos, directorio_backups, historial.procesados)
+        if not pendientes:
+            _revisados[origenes] = firma
+            metricas.lectura_cache('historial', True)
+            return historial
+
+        metricas.lectura_cache('historial', False)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with bloqueo(ruta):
+            # Otro worker pudo procesarlos mientras tanto
+            historial.actualizar()
+            pendientes = [p for p in pendientes if p[0] not in historial.procesados]
+            if pendientes:
+                _procesar(historial, pendientes)
+                historial.actualizar()
+        return historial
+
+
+def _ocupantes_por_habitacion(archivo_pasajeros):
+    """Filas de pasajeros.csv agrupadas por habitación (una vez por versión)."""
+    clave = os.path.abspath(archivo_pasajeros)
+    firma = firma_archivo(archivo_pasajeros)
+    with _ocupantes_lock:
+        entrada = _ocupantes.get(clave)
+    if entrada is not None and entrada[0] == firma:
+        return entrada[1]
+    por_habitacion = {}
+    for fila in (leer_filas(archivo_pasajeros) if firma is not None else []):
+        por_habitacion.setdefault(a_entero(fila['Nro. habitación']), []).append(fila)
+    with _ocupantes_lock:
+        _ocupantes[clave] = (firma, por_habitacion)
+    return por_habitacion
+
+
+def _total_consumos(historial, estadia, filas, indice):
+    """Consumos de una estadía (centavos): temporadas archivadas + temporada en curso."""
+    habitacion = estadia['habitacion']
+    desde = _ordinal(estadia['ingreso'])
+    hasta = _ordinal(estadia['egreso']) or desde
+    total = sum(historial.consumos.get((habitacion, dia), 0) for dia in range(desde, hasta + 1))
+    for posicion in indice.get(habitacion, ()):
+        if desde <= _ordinal(filas[posicion]['fecha']) <= hasta:
+            total += dinero.celda_centavos(filas[posicion]['monto'])
+    return total
+
+
+def huespedes_que_regresan(num_habitacion, archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS):
+    """
+    Pasajeros alojados hoy en la habitación que ya tuvieron estadías anteriores.
+
+    Returns:
+        lista de dicts con 'pasajero', 'documento' y 'estadias' (las
+        anteriores, más recientes primero, cada una con su 'consumos')
+    """
+    from core.consumos import indice_consumos
+
+    hoy = _ordinal(reloj.fecha_hoy())
+    historial = obtener_historial()
+    filas, indice = indice_consumos(archivo_consumos) if os.path.exists(archivo_consumos) else ([], {})
+
+    resultado = []
+    for fila in _ocupantes_por_habitacion(archivo_pasajeros).get(num_habitacion, ()):
+        ingreso = _ordinal(fila['Fecha de ingreso'])
+        doc = documento(fila.get('Nro. doc.'))
+        if doc is None or ingreso > hoy:
+            continue
+        estadias = historial.anteriores(doc, ingreso)
+        if not estadias:
+            continue
+        resultado.append({
+            'pasajero': fila['Apellido y nombre'],
+            'documento': fila.get('Nro. doc.', ''),
+            'estadias': [dict(e, consumos=_total_consumos(historial, e, filas, indice)) for e in estadias],
+        })
+    return resultado
+
+
+def contar_anteriores(pasajeros):
+    """
+    Agrega 'estadias_anteriores' (cantidad) a cada pasajero.
+
+    Args:
+        pasajeros: lista de dicts con 'documento' e 'ingreso' (ej. resultados de /buscar)
+    """
+    historial = obtener_historial()
+    for pasajero in pasajeros:
+        doc = documento(pasajero['documento'])
+        pasajero['estadias_anteriores'] = (
+            len(historial.anteriores(doc, _ordinal(pasajero['ingreso']))) if doc else 0)
+    return pasajeros
@@ -0,0 +1,254 @@
+"""
+Inventario de habitaciones de los alojamientos del grupo: pisos,
+habitaciones, tipos y capacidades, leídos de config/inventario.json.
+
+Cada alojamiento se carga una sola vez (y otra vez solo si se edita el
+archivo) en estructuras indexadas:
+
+- numeros: tupla ordenada con todas las habitaciones
+- pisos: piso -> tupla ordenada de habitaciones
+- piso_de / tipo_de / plazas_de: diccionarios habitación -> dato
+- `habitacion in alojamiento`: pertenencia en O(1) (frozenset)
+
+Varios hoteles en un mismo proceso: cada alojamiento tiene su propio
+directorio de datos ("datos" en la configuración, por defecto data/).
+Las rutas de los CSV (DB_PASAJEROS, DB_CONSUMOS...) son objetos RutaDatos
+que se resuelven en el directorio del alojamiento seleccionado en el
+request (ver usar()); fuera de un request, y en los scripts, se usa el
+alojamiento por defecto (HOTEL_ALOJAMIENTO o el primero del archivo).
+
+Formato de config/inventario.json:
+
+    {"alojamientos": [{
+        "codigo": 900, "nombre": "HOTEL 23 DE MAYO", "datos": "data",
+        "tipos": {"DOBLE MATRIMONIAL": {"plazas": 2}, ...},
+        "pisos": {"1": {"101": "DOBLE MATRIMONIAL", "102-110": "CUADRUPLE"}, ...},
+        "retencion": {"completos_dias": 7, ...}   (opcional, ver core/respaldos.py)
+    }]}
+
+Las claves de cada piso son una habitación o un rango "desde-hasta".
+"""
+
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from core.datos import firma_archivo
+
+RUTA_CONFIG = os.environ.get(
+    'HOTEL_INVENTARIO',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'inventario.json'))
+DATOS_POR_DEFECTO = 'data'
+
+# Sin archivo de configuración: el hotel de siempre (53 habitaciones dobles)
+CONFIG_POR_DEFECTO = {
+    'alojamientos': [{
+        'codigo': 900,
+        'nombre': 'HOTEL 23 DE MAYO',
+        'datos': DATOS_POR_DEFECTO,
+        'tipos': {'DOBLE MATRIMONIAL': {'plazas': 2}},
+        'pisos': {
+            '1': {'101-121': 'DOBLE MATRIMONIAL'},
+            '2': {'222-242': 'DOBLE MATRIMONIAL'},
+            '3': {'343-353': 'DOBLE MATRIMONIAL'},
+        },
+    }],
+}
+
+# Configuración cargada: (firma del archivo, {código: Alojamiento})
+_cargado = None
+_cargado_lock = threading.Lock()
+
+# Alojamiento elegido para el request en curso (código o None)
+_seleccionado = contextvars.ContextVar('alojamiento', default=None)
+
+
+class Alojamiento:
+    """Pisos y habitaciones de un alojamiento, indexados para consultas en O(1)."""
+
+    def __init__(self, codigo, nombre, datos, tipos, pisos, retencion=None):
+        """
+        Args:
+            codigo: Cód. Alojamiento (el mismo que trae el rooming)
+            nombre: nombre para mostrar
+            datos: directorio de sus CSV
+            tipos: tipo de habitación -> {'plazas': capacidad}
+            pisos: piso -> {habitación: tipo}
+            retencion: política de respaldos (ver core/respaldos.py); None = la por defecto
+        """
+        self.codigo = codigo
+        self.nombre = nombre
+        self.datos = datos
+        self.tipos = tipos
+        self.retencion = retencion or {}
+        self.pisos = {}
+        self.piso_de = {}
+        self.tipo_de = {}
+        self.plazas_de = {}
+        for piso in sorted(pisos):
+            for habitacion, tipo in pisos[piso].items():
+                if habitacion in self.piso_de:
+                    raise ValueError(f'Habitación {habitacion} repetida en los pisos '
+                                     f'{self.piso_de[habitacion]} y {piso} ({nombre})')
+                if tipo not in tipos:
+                    raise ValueError(f'Tipo de habitación desconocido: {tipo} ({nombre}, hab. {habitacion})')
+                self.piso_de[habitacion] = piso
+                self.tipo_de[habitacion] = tipo
+                self.plazas_de[habitacion] = int(tipos[tipo].get('plazas', 2))
+            self.pisos[piso] = tuple(sorted(pisos[piso]))
+        self.numeros = tuple(sorted(self.piso_de))
+        self._conjunto = frozenset(self.numeros)
+
+    def __contains__(self, habitacion):
+        return habitacion in self._conjunto
+
+    def __len__(self):
+        return len(self.numeros)
+
+    def __repr__(self):
+        return f'Alojamiento({self.codigo}, {self.nombre!r}, {len(self)} habitaciones)'
+
+    def disponibles(self, ocupadas, excluir=None):
+        """
+        Habitaciones del alojamiento que no están en `ocupadas`, ordenadas.
+
+        Args:
+            ocupadas: dict o set de habitaciones ocupadas
+            excluir: habitación a dejar afuera (ej. la de origen de un cambio)
+        """
+        return [h for h in self.numeros if h not in ocupadas and h != excluir]
+
+
+def _habitaciones(clave):
+    """'101' -> [101]; '101-121' -> [101, ..., 121]"""
+    if '-' in clave:
+        desde, hasta = clave.split('-')
+        return range(int(desde), int(hasta) + 1)
+    return [int(clave)]
+
+
+def _parsear(config):
+    alojamientos = {}
+    for datos in config['alojamientos']:
+        pisos = {}
+        for piso, habitaciones in datos['pisos'].items():
+            pisos[int(piso)] = {h: tipo for clave, tipo in habitaciones.items() for h in _habitaciones(clave)}
+        alojamiento = Alojamiento(
+            codigo=int(datos['codigo']),
+            nombre=datos.get('nombre', str(datos['codigo'])),
+            datos=datos.get('datos', DATOS_POR_DEFECTO),
+            tipos=datos.get('tipos', {}),
+            pisos=pisos,
+            retencion=datos.get('retencion'),
+        )
+        if alojamiento.codigo in alojamientos:
+            raise ValueError(f'Código de alojamiento repetido: {alojamiento.codigo}')
+        alojamientos[alojamiento.codigo] = alojamiento
+    if not alojamientos:
+        raise ValueError('El inventario no tiene alojamientos')
+    return alojamientos
+
+
+def alojamientos(ruta=None):
+    """
+    Alojamientos del inventario (se relee solo si cambió el archivo).
+
+    Returns:
+        dict código -> Alojamiento, en el orden del archivo
+    """
+    global _cargado
+    ruta = ruta or RUTA_CONFIG
+    firma = firma_archivo(ruta)
+    cargado = _cargado
+    if cargado is not None and cargado[0] == (ruta, firma):
+        return cargado[1]
+
+    with _cargado_lock:
+        if firma is None:
+            print(f"⚠️  No se encontró {ruta}: se usa el inventario por defecto (53 habitaciones)")
+            resultado = _parsear(CONFIG_POR_DEFECTO)
+        else:
+            with open(ruta, encoding='utf-8') as f:
+                resultado = _parsear(json.load(f))
+        _cargado = ((ruta, firma), resultado)
+    return resultado
+
+
+def obtener(codigo):
+    """Alojamiento por código, o None si no existe."""
+    try:
+        return alojamientos().get(int(codigo))
+    except (TypeError, ValueError):
+        return None
+
+
+def por_defecto():
+    """Alojamiento de HOTEL_ALOJAMIENTO, o el primero del inventario."""
+    codigo = os.environ.get('HOTEL_ALOJAMIENTO')
+    if codigo:
+        alojamiento = obtener(codigo)
+        if alojamiento is None:
+            raise ValueError(f'HOTEL_ALOJAMIENTO={codigo} no está en el inventario')
+        return alojamiento
+    return next(iter(alojamientos().values()))
+
+
+def actual():
+    """Alojamiento seleccionado en el request en curso (o el por defecto)."""
+    codigo = _seleccionado.get()
+    if codigo is not None:
+        alojamiento = obtener(codigo)
+        if alojamiento is not None:
+            return alojamiento
+    return por_defecto()
+
+
+def usar(codigo):
+    """
+    Selecciona el alojamiento del request en curso.
+
+    Returns:
+        token para restablecer() al terminar el request
+    """
+    return _seleccionado.set(codigo)
+
+
+def restablecer(token):
+    _seleccionado.reset(token)
+
+
+@contextmanager
+def en(codigo):
+    """Trabaja con otro alojamiento dentro de un bloque (scripts)."""
+    token = usar(codigo)
+    try:
+        yield actual()
+    finally:
+        restablecer(token)
+
+
+class RutaDatos(os.PathLike):
+    """
+    Ruta dentro del directorio de datos del alojamiento actual.
+    Sirve donde sirve una ruta (open, os.path, pandas); se resuelve en
+    cada uso, así el mismo DB_PASAJEROS apunta al CSV de cada hotel.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __fspath__(self):
+        return os.path.join(actual().datos, self.nombre)
+
+    __str__ = __fspath__
+
+    def __repr__(self):
+        return f'RutaDatos({self.nombre!r})'
+
+
+DB_PASAJEROS = RutaDatos('pasajeros.csv')
+DB_CONSUMOS = RutaDatos('consumos_diarios.csv')
+DIR_BACKUPS = RutaDatos('backups')
+DIR_TAREAS = RutaDatos('.tareas')
@@ -0,0 +1,329 @@
+"""
+Métricas operativas y del negocio en formato de texto de Prometheus (/metrics).
+
+Los valores se mantienen de forma incremental a medida que ocurren los
+eventos (requests, lecturas de caché, escrituras, consumos cargados); un
+scrape solo los formatea, no vuelve a leer los CSV:
+
+- hotel_request_duracion_segundos{metodo,ruta}: histograma de latencia
+- hotel_requests_total{metodo,ruta,codigo}
+- hotel_cache_lecturas_total{cache,resultado} y hotel_cache_tasa_aciertos{cache}
+- hotel_csv_filas{alojamiento,archivo} / hotel_csv_bytes{alojamiento,archivo}:
+  tamaño de los CSV, actualizado en cada escritura (core/datos.py)
+- hotel_escrituras_en_espera{alojamiento,archivo}: hilos esperando el bloqueo de un CSV
+- hotel_bloqueo_espera_segundos_total{alojamiento,archivo}: tiempo total esperando ese bloqueo
+- hotel_consumos_cargados_total{alojamiento,categoria} y
+  hotel_consumos_monto_total{alojamiento,categoria}
+- hotel_habitaciones_ocupadas{alojamiento}, hotel_habitaciones_reservadas{alojamiento},
+  hotel_checkouts_hoy{alojamiento} y hotel_saldo_pendiente{alojamiento,categoria}:
+  se toman del snapshot (core/snapshot.py) de cada alojamiento y se
+  recalculan solo cuando cambia su versión
+
+Un scrape exporta todos los alojamientos del inventario (core/inventario.py)
+que ya tienen pasajeros.csv, no solo el elegido en la sesión. La etiqueta alojamiento es el código del
+alojamiento en cuyo directorio de datos está el archivo.
+
+Con varios procesos (gunicorn) cada worker expone sus propios contadores;
+con waitress (un proceso, varios hilos) los valores son los del servidor.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ''
+    pares = []
+    for nombre, valor in zip(nombres, valores):
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{nombre}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class Metrica:
+    """Contador o medidor con etiquetas (valores por combinación de etiquetas)."""
+
+    def __init__(self, nombre, ayuda, tipo, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = tipo
+        self.etiquetas = tuple(etiquetas)
+        self.valores = {}
+
+    def sumar(self, *etiquetas, cantidad=1):
+        with _lock:
+            self.valores[etiquetas] = self.valores.get(etiquetas, 0) + cantidad
+
+    def fijar(self, *etiquetas, valor):
+        with _lock:
+            self.valores[etiquetas] = valor
+
+    def lineas(self):
+        for etiquetas, valor in sorted(self.valores.items()):
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(valor)}'
+
+
+class Histograma(Metrica):
+    """Histograma acumulativo (buckets + suma + cantidad) por etiquetas."""
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_LATENCIA):
+        super().__init__(nombre, ayuda, 'histogram', etiquetas)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observar(self, *etiquetas, valor):
+        with _lock:
+            serie = self.valores.get(etiquetas)
+            if serie is None:
+                serie = self.valores[etiquetas] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    def lineas(self):
+        nombres = self.etiquetas + ('le',)
+        for etiquetas, (cuentas, suma, cantidad) in sorted(self.valores.items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets, cuentas):
+                acumulado += cuenta
+                yield f'{self.nombre}_bucket{_etiquetas(nombres, etiquetas + (_numero(limite),))} {acumulado}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(suma)}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {cantidad}'
+
+
+LATENCIA = Histograma('hotel_request_duracion_segundos', 'Duración de cada request', ('metodo', 'ruta'))
+REQUESTS = Metrica('hotel_requests_total', 'Requests atendidos', 'counter', ('metodo', 'ruta', 'codigo'))
+CACHE = Metrica('hotel_cache_lecturas_total', 'Lecturas de CSV por caché y resultado', 'counter',
+                ('cache', 'resultado'))
+TASA_CACHE = Metrica('hotel_cache_tasa_aciertos', 'Aciertos / lecturas de cada caché', 'gauge', ('cache',))
+POR_ARCHIVO = ('alojamiento', 'archivo')
+CSV_FILAS = Metrica('hotel_csv_filas', 'Filas de datos del CSV', 'gauge', POR_ARCHIVO)
+CSV_BYTES = Metrica('hotel_csv_bytes', 'Tamaño del CSV en bytes', 'gauge', POR_ARCHIVO)
+EN_ESPERA = Metrica('hotel_escrituras_en_espera', 'Hilos esperando el bloqueo de escritura del CSV',
+                    'gauge', POR_ARCHIVO)
+ESPERA = Metrica('hotel_bloqueo_espera_segundos_total', 'Tiempo total esperando el bloqueo del CSV',
+                 'counter', POR_ARCHIVO)
+CONSUMOS = Metrica('hotel_consumos_cargados_total', 'Consumos cargados', 'counter',
+                   ('alojamiento', 'categoria'))
+MONTO = Metrica('hotel_consumos_monto_total', 'Monto cargado en consumos', 'counter',
+                ('alojamiento', 'categoria'))
+OCUPADAS = Metrica('hotel_habitaciones_ocupadas', 'Habitaciones ocupadas hoy', 'gauge', ('alojamiento',))
+RESERVADAS = Metrica('hotel_habitaciones_reservadas', 'Habitaciones con reserva futura', 'gauge',
+                     ('alojamiento',))
+CHECKOUTS = Metrica('hotel_checkouts_hoy', 'Habitaciones con egreso hoy', 'gauge', ('alojamiento',))
+SALDO = Metrica('hotel_saldo_pendiente', 'Consumos sin cobrar de las habitaciones', 'gauge',
+                ('alojamiento', 'categoria'))
+RESPALDOS = Histograma('hotel_respaldo_duracion_segundos', 'Duración de cada respaldo de CSV', POR_ARCHIVO)
+RESPALDO_BYTES = Metrica('hotel_respaldo_bytes_total', 'Bytes escritos por los respaldos (comprimidos)',
+                         'counter', POR_ARCHIVO)
+
+METRICAS = (LATENCIA, REQUESTS, CACHE, TASA_CACHE, CSV_FILAS, CSV_BYTES, EN_ESPERA, ESPERA,
+            CONSUMOS, MONTO, OCUPADAS, RESERVADAS, CHECKOUTS, SALDO, RESPALDOS, RESPALDO_BYTES)
+
+# Estado de los CSV conocido por este proceso: ruta absoluta -> firma con
+# la que se registraron filas/bytes (si otro proceso escribe, la firma no coincide)
+_firmas = {}
+
+# Versión del snapshot de la que salen ocupadas/checkouts/saldos, por alojamiento
+_versiones_snapshot = {}
+
+# Ruta absoluta -> código del alojamiento (se rearma si cambia el inventario)
+_alojamiento_de = {}
+_inventario_visto = None
+
+
+# --- eventos (los llaman core/datos.py, core/cache_disco.py, app.py...) ---
+
+def lectura_cache(cache, acierto, cantidad=1):
+    """Registra lecturas resueltas (acierto) o no (fallo) por una caché."""
+    CACHE.sumar(cache, 'acierto' if acierto else 'fallo', cantidad=cantidad)
+
+
+def _alojamiento(ruta):
+    """
+    Código del alojamiento cuyo directorio de datos contiene `ruta` (el más
+    específico si hay directorios anidados); si ninguno, el alojamiento actual.
+    """
+    global _inventario_visto
+    from core import inventario
+
+    todos = inventario.alojamientos()
+    if todos is not _inventario_visto:
+        _alojamiento_de.clear()
+        _inventario_visto = todos
+    codigo = _alojamiento_de.get(ruta)
+    if codigo is None:
+        largo = -1
+        for alojamiento in todos.values():
+            datos = os.path.abspath(alojamiento.datos)
+            if (ruta == datos or ruta.startswith(datos + os.sep)) and len(datos) > largo:
+                codigo, largo = alojamiento.codigo, len(datos)
+        if codigo is None:
+            codigo = inventario.actual().codigo
+        _alojamiento_de[ruta] = codigo
+    return str(codigo)
+
+
+def _serie(archivo):
+    """(ruta absoluta, etiquetas alojamiento/archivo) de un archivo."""
+    ruta = os.path.abspath(archivo)
+    return ruta, (_alojamiento(ruta), os.path.basename(ruta))
+
+
+def archivo_csv(archivo, filas, bytes_, firma):
+    """Registra el tamaño actual de un CSV (después de leerlo o reescribirlo)."""
+    ruta, etiquetas = _serie(archivo)
+    with _lock:
+        CSV_FILAS.valores[etiquetas] = filas
+        CSV_BYTES.valores[etiquetas] = bytes_
+        _firmas[ruta] = firma
+
+
+def fila_agregada(archivo, firma_anterior, bytes_, firma):
+    """Suma una fila agregada al final de un CSV de tamaño conocido."""
+    ruta, etiquetas = _serie(archivo)
+    with _lock:
+        if _firmas.get(ruta) != firma_anterior or etiquetas not in CSV_FILAS.valores:
+            _firmas.pop(ruta, None)  # desconocido: se resincroniza en el próximo scrape
+            return
+        CSV_FILAS.valores[etiquetas] += 1
+        CSV_BYTES.valores[etiquetas] += bytes_
+        _firmas[ruta] = firma
+
+
+@contextmanager
+def espera_bloqueo(archivo):
+    """Envuelve la espera por el bloqueo de un archivo (cola de escrituras)."""
+    _, etiquetas = _serie(archivo)
+    EN_ESPERA.sumar(*etiquetas)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        EN_ESPERA.sumar(*etiquetas, cantidad=-1)
+        ESPERA.sumar(*etiquetas, cantidad=time.perf_counter() - inicio)
+
+
+def consumo_cargado(archivo_consumos, categoria, centavos):
+    """Registra un consumo cargado a una habitación (monto en centavos)."""
+    from core.dinero import a_pesos
+
+    alojamiento = _alojamiento(os.path.abspath(archivo_consumos))
+    CONSUMOS.sumar(alojamiento, categoria)
+    MONTO.sumar(alojamiento, categoria, cantidad=a_pesos(centavos))
+
+
+def respaldo(archivo, bytes_, segundos):
+    """Registra un respaldo (core/respaldos.py) de `archivo` (ruta del CSV): bytes guardados y duración."""
+    _, etiquetas = _serie(archivo)
+    RESPALDOS.observar(*etiquetas, valor=segundos)
+    RESPALDO_BYTES.sumar(*etiquetas, cantidad=bytes_)
+
+
+# --- Flask ----------------------------------------------------------------
+
+def instalar(app):
+    """Mide la latencia de cada request de la aplicación Flask."""
+    from flask import g, request
+
+    @app.before_request
+    def _inicio_request():
+        g.inicio_metricas = time.perf_counter()
+
+    @app.after_request
+    def _fin_request(respuesta):
+        inicio = g.pop('inicio_metricas', None)
+        if inicio is not None and request.endpoint not in ('static', 'metrics'):
+            ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+            LATENCIA.observar(request.method, ruta, valor=time.perf_counter() - inicio)
+            REQUESTS.sumar(request.method, ruta, str(respuesta.status_code))
+        return respuesta
+
+
+# --- scrape ---------------------------------------------------------------
+
+def _sincronizar_archivos(archivos):
+    """Relee el tamaño de los CSV que cambiaron fuera de este proceso."""
+    from core.datos import firma_archivo, leer_filas
+
+    for archivo in archivos:
+        firma = firma_archivo(archivo)
+        if firma is None:
+            archivo_csv(archivo, 0, 0, None)
+        elif _firmas.get(os.path.abspath(archivo)) != firma:
+            # leer_filas usa su propia caché: solo parsea si el CSV cambió
+            archivo_csv(archivo, len(leer_filas(archivo)), firma[1], firma)
+
+
+def _sincronizar_estado(alojamiento, archivo_pasajeros, archivo_consumos):
+    """Actualiza ocupación, checkouts y saldos si cambió la versión del snapshot del alojamiento."""
+    from core.dinero import a_pesos
+    from core.snapshot import obtener_snapshot
+
+    snapshot = obtener_snapshot(archivo_pasajeros, archivo_consumos)
+    version = (snapshot.version, snapshot.fecha_hoy)
+    if version == _versiones_snapshot.get(alojamiento):
+        return
+    ocupadas = snapshot.ocupadas
+    OCUPADAS.fijar(alojamiento, valor=len(ocupadas))
+    RESERVADAS.fijar(alojamiento, valor=len(snapshot.reservadas))
+    CHECKOUTS.fijar(alojamiento, valor=sum(1 for datos in ocupadas.values() if datos.egreso == snapshot.fecha_hoy))
+    for categoria, saldo in snapshot.saldos().items():
+        SALDO.fijar(alojamiento, categoria, valor=a_pesos(saldo))
+    _versiones_snapshot[alojamiento] = version
+
+
+def exponer():
+    """
+    Returns:
+        str con las métricas de todos los alojamientos en formato de texto de Prometheus
+    """
+    from core import inventario
+
+    for codigo, alojamiento in inventario.alojamientos().items():
+        # Un alojamiento todavía sin datos no se toca (el snapshot crearía
+        # su directorio .estado/); uno que falla no tira el scrape entero
+        if not os.path.isdir(alojamiento.datos):
+            continue
+        with inventario.en(codigo):
+            archivo_pasajeros = os.fspath(inventario.DB_PASAJEROS)
+            archivo_consumos = os.fspath(inventario.DB_CONSUMOS)
+            if not os.path.exists(archivo_pasajeros):
+                continue
+            try:
+                _sincronizar_archivos((archivo_pasajeros, archivo_consumos))
+                _sincronizar_estado(str(codigo), archivo_pasajeros, archivo_consumos)
+            except Exception as e:
+                print(f"⚠️  Métricas de {alojamiento.nombre} ({codigo}): {e}")
+
+    with _lock:
+        lecturas = {}
+        for (cache, resultado), valor in CACHE.valores.items():
+            lecturas.setdefault(cache, {'acierto': 0, 'fallo': 0})[resultado] = valor
+        for cache, valores in lecturas.items():
+            total = valores['acierto'] + valores['fallo']
+            TASA_CACHE.valores[(cache,)] = round(valores['acierto'] / total, 4) if total else 0
+
+        salida = []
+        for metrica in METRICAS:
+            salida.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            salida.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            salida.extend(metrica.lineas())
+    return '\n'.join(salida) + '\n'
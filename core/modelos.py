@@ -0,0 +1,202 @@
+"""
+Modelos del dominio: estadía (titular de una habitación o reserva),
+pasajero del buscador, consumo, folio de habitación y folio de grupo.
+
+Reemplazan a los diccionarios armados fila por fila (con las 28 columnas
+del rooming o con claves sueltas como {'pasajero': ..., 'plazas': ...}):
+
+- Usan __slots__: sin __dict__ por objeto, solo los campos que se usan.
+  Una Estadia ocupa 104 bytes contra 272 del diccionario equivalente
+  (sin contar los valores, que son los mismos).
+- Se construyen en bloque desde las columnas del snapshot (core/snapshot.py)
+  o desde las filas del CSV, sin copiar las columnas que no se muestran.
+- Los templates los usan igual que antes (`ocupada.pasajero`), y las
+  rutas JSON los convierten con como_dict().
+
+Son de solo lectura por convención: los diccionarios de ocupadas y
+reservadas se comparten entre requests (ver Snapshot).
+
+Los montos (Consumo.monto, Folio.totales) son centavos enteros
+(core/dinero.py); los templates los muestran con el filtro `moneda`.
+"""
+
+from core import dinero
+from core.datos import a_entero
+
+
+class Modelo:
+    """Base: igualdad, repr y conversión a tupla/dict según __slots__."""
+
+    __slots__ = ()
+
+    def como_tupla(self):
+        return tuple(getattr(self, campo) for campo in self.__slots__)
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __eq__(self, otro):
+        return type(otro) is type(self) and otro.como_tupla() == self.como_tupla()
+
+    __hash__ = None
+
+    def __repr__(self):
+        campos = ', '.join(f'{campo}={getattr(self, campo)!r}' for campo in self.__slots__)
+        return f'{type(self).__name__}({campos})'
+
+
+class Estadia(Modelo):
+    """Titular de una habitación ocupada (o de una reserva futura)."""
+
+    __slots__ = ('habitacion', 'pasajero', 'plazas', 'ingreso', 'egreso', 'servicios', 'edad', 'voucher',
+                 'documento')
+
+    def __init__(self, habitacion, pasajero, plazas, ingreso, egreso, servicios, edad=0, voucher='',
+                 documento=''):
+        self.habitacion = habitacion
+        self.pasajero = pasajero
+        self.plazas = plazas
+        self.ingreso = ingreso
+        self.egreso = egreso
+        self.servicios = servicios
+        self.edad = edad
+        self.voucher = voucher
+        self.documento = documento
+
+    @classmethod
+    def desde_fila(cls, fila, voucher=None, habitacion=None):
+        """
+        Estadía a partir de una fila de pasajeros.csv (ver datos.leer_filas).
+
+        Args:
+            fila: dict con las columnas del rooming
+            voucher: voucher del grupo (None = no se usa, ej. reservas futuras)
+            habitacion: habitación de la estadía (por defecto la de la fila; el
+                titular de un voucher puede estar en otra habitación del grupo)
+        """
+        return cls(
+            habitacion=habitacion if habitacion is not None else a_entero(fila['Nro. habitación']),
+            pasajero=fila['Apellido y nombre'],
+            plazas=a_entero(fila['Plazas ocupadas']),
+            ingreso=fila['Fecha de ingreso'],
+            egreso=fila['Fecha de egreso'],
+            servicios=fila['Servicios'],
+            edad=a_entero(fila.get('Edad', 0)) if voucher is not None else 0,
+            voucher=voucher if voucher is not None else '',
+            documento=str(fila.get('Nro. doc.', '')).strip() if voucher is not None else '',
+        )
+
+    @classmethod
+    def desde_columnas(cls, bundle, prefijo):
+        """
+        Estadías de un bloque de columnas del snapshot (prefijo 'ocup_' o 'res_').
+
+        Returns:
+            dict habitación -> Estadia
+        """
+        habitaciones = bundle[prefijo + 'hab'].tolist()
+        n = len(habitaciones)
+        edades = bundle[prefijo + 'edad'].tolist() if prefijo + 'edad' in bundle else [0] * n
+        vouchers = bundle[prefijo + 'voucher'].tolist() if prefijo + 'voucher' in bundle else [''] * n
+        documentos = bundle[prefijo + 'documento'].tolist() if prefijo + 'documento' in bundle else [''] * n
+        return {
+            h: cls(h, pasajero, plazas, ingreso, egreso, servicios, edad, voucher, documento)
+            for h, pasajero, plazas, ingreso, egreso, servicios, edad, voucher, documento in zip(
+                habitaciones,
+                bundle[prefijo + 'pasajero'].tolist(),
+                bundle[prefijo + 'plazas'].tolist(),
+                bundle[prefijo + 'ingreso'].tolist(),
+                bundle[prefijo + 'egreso'].tolist(),
+                bundle[prefijo + 'servicios'].tolist(),
+                edades,
+                vouchers,
+                documentos,
+            )
+        }
+
+
+class Pasajero(Modelo):
+    """Pasajero del índice de búsqueda (core/busqueda.py)."""
+
+    __slots__ = ('habitacion', 'pasajero', 'documento', 'voucher', 'ingreso', 'egreso', 'titular',
+                 'ingreso_ordinal')
+
+    def __init__(self, habitacion, pasajero, documento, voucher, ingreso, egreso, titular, ingreso_ordinal):
+        self.habitacion = habitacion
+        self.pasajero = pasajero
+        self.documento = documento
+        self.voucher = voucher
+        self.ingreso = ingreso
+        self.egreso = egreso
+        self.titular = titular
+        self.ingreso_ordinal = ingreso_ordinal
+
+
+class Consumo(Modelo):
+    """Consumo de una habitación; `indice` es su posición dentro de la habitación, `monto` va en centavos."""
+
+    __slots__ = ('indice', 'fecha', 'categoria', 'monto')
+
+    def __init__(self, indice, fecha, categoria, monto):
+        self.indice = indice
+        self.fecha = fecha
+        self.categoria = categoria
+        self.monto = monto
+
+    @classmethod
+    def desde_filas(cls, filas, posiciones):
+        """Consumos de una habitación a partir de las filas del CSV y sus posiciones."""
+        montos = dinero.columna_centavos([filas[p]['monto'] for p in posiciones])
+        return [
+            cls(i, filas[p]['fecha'], filas[p]['categoria'], int(monto))
+            for i, (p, monto) in enumerate(zip(posiciones, montos))
+        ]
+
+
+class Folio(Modelo):
+    """Cuenta de una habitación: titular, consumos y totales (ficha y check-out)."""
+
+    __slots__ = ('numero', 'pasajero', 'consumos', 'totales', 'cantidad_consumos',
+                 'es_checkout_hoy', 'regresan', 'tabla_consumos', 'grupo')
+
+    def __init__(self, numero, pasajero, consumos, totales):
+        """
+        Args:
+            numero: número de habitación
+            pasajero: Estadia del titular
+            consumos: lista de Consumo
+            totales: dict categoría -> centavos, más 'total'
+        """
+        self.numero = numero
+        self.pasajero = pasajero
+        self.consumos = consumos
+        self.totales = totales
+        self.cantidad_consumos = len(consumos)
+        self.es_checkout_hoy = False
+        self.regresan = ()
+        self.tabla_consumos = ''
+        self.grupo = ()     # habitaciones del mismo voucher (familias en varias habitaciones)
+
+
+class FolioGrupo(Modelo):
+    """Cuenta consolidada de un voucher (familia o grupo en varias habitaciones)."""
+
+    __slots__ = ('voucher', 'titular', 'folios', 'totales', 'cantidad_consumos', 'es_checkout_hoy')
+
+    def __init__(self, voucher, folios, totales):
+        """
+        Args:
+            voucher: voucher del grupo
+            folios: lista de Folio, uno por habitación (ordenados por número)
+            totales: dict categoría -> centavos de todo el grupo, más 'total'
+        """
+        self.voucher = voucher
+        self.titular = folios[0].pasajero if folios else None
+        self.folios = folios
+        self.totales = totales
+        self.cantidad_consumos = sum(f.cantidad_consumos for f in folios)
+        self.es_checkout_hoy = False
+
+    @property
+    def habitaciones(self):
+        return tuple(f.numero for f in self.folios)
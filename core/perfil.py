@@ -0,0 +1,262 @@
+"""
+Perfil de cada request: tiempo total y cuánto de ese tiempo se va en leer
+y escribir los CSV.
+
+Por cada request se registra:
+- ms_total: tiempo de pared del request completo
+- ms_read_csv / ms_to_csv: tiempo dentro de pd.read_csv y DataFrame.to_csv
+- parseos_csv: CSV parseados completos (pandas o módulo csv); una lectura
+  resuelta por caché (memoria o data/.cache/) no cuenta
+- lecturas_cache: lecturas de CSV resueltas por caché
+- bytes_leidos / bytes_escritos: bytes de CSV leídos de disco y escritos
+- filas_iterrows: filas recorridas con DataFrame.iterrows
+
+Los últimos requests quedan en un buffer circular (TAMANO_BUFFER) con un
+resumen por ruta, visible en /debug/perf (y en JSON con ?formato=json).
+Con ?perfil=1 en cualquier URL, ese request además se corre bajo cProfile
+y el reporte queda en /debug/perf/<id>.
+
+Los contadores los alimentan core/datos.py y core/cache_disco.py (lecturas
+con el módulo csv y bytes) y un envoltorio de pandas que se instala cuando
+pandas se importa (pandas se carga de forma diferida, ver core/datos.py).
+Fuera de un request los contadores no hacen nada.
+
+Se desactiva con HOTEL_PERFIL=0.
+"""
+
+import collections
+import cProfile
+import importlib.abc
+import importlib.util
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from core import reloj
+
+TAMANO_BUFFER = 500
+LINEAS_CPROFILE = 40
+
+CONTADORES = ('ms_read_csv', 'ms_to_csv', 'parseos_csv', 'lecturas_cache',
+              'bytes_leidos', 'bytes_escritos', 'filas_iterrows')
+
+ACTIVO = os.environ.get('HOTEL_PERFIL', '1') != '0'
+
+_actual = threading.local()
+_buffer = collections.deque(maxlen=TAMANO_BUFFER)
+_buffer_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+def _medicion():
+    return getattr(_actual, 'medicion', None)
+
+
+def registrar(contador, cantidad=1):
+    """Suma `cantidad` al contador del request en curso (si hay uno)."""
+    medicion = _medicion()
+    if medicion is not None:
+        medicion[contador] += cantidad
+
+
+@contextmanager
+def cronometro(contador):
+    """Suma al contador los milisegundos que tarda el bloque."""
+    medicion = _medicion()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion[contador] += (time.perf_counter() - inicio) * 1000
+
+
+# --- pandas ---------------------------------------------------------------
+
+def _instrumentar_pandas(pd):
+    """Envuelve pd.read_csv, DataFrame.to_csv y DataFrame.iterrows."""
+    if getattr(pd, '_perfil_instrumentado', False):
+        return
+    read_csv = pd.read_csv
+    to_csv = pd.DataFrame.to_csv
+    iterrows = pd.DataFrame.iterrows
+
+    def read_csv_medido(*args, **kwargs):
+        if _medicion() is None:
+            return read_csv(*args, **kwargs)
+        if kwargs.get('nrows') != 0:  # leer solo el encabezado no es un parseo
+            registrar('parseos_csv')
+        with cronometro('ms_read_csv'):
+            return read_csv(*args, **kwargs)
+
+    def to_csv_medido(self, *args, **kwargs):
+        if _medicion() is None:
+            return to_csv(self, *args, **kwargs)
+        with cronometro('ms_to_csv'):
+            return to_csv(self, *args, **kwargs)
+
+    def iterrows_medido(self):
+        if _medicion() is None:
+            yield from iterrows(self)
+            return
+        for fila in iterrows(self):
+            registrar('filas_iterrows')
+            yield fila
+
+    for nombre, original, envoltorio in (('read_csv', read_csv, read_csv_medido),
+                                         ('to_csv', to_csv, to_csv_medido),
+                                         ('iterrows', iterrows, iterrows_medido)):
+        envoltorio.__name__ = nombre
+        envoltorio.__doc__ = original.__doc__
+        envoltorio.__wrapped__ = original
+    pd.read_csv = read_csv_medido
+    pd.DataFrame.to_csv = to_csv_medido
+    pd.DataFrame.iterrows = iterrows_medido
+    pd._perfil_instrumentado = True
+
+
+class _AlImportarPandas(importlib.abc.MetaPathFinder):
+    """Instrumenta pandas apenas termina de importarse (sin importarlo antes)."""
+
+    def find_spec(self, nombre, path, target=None):
+        if nombre != 'pandas':
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(nombre)
+        if spec is None or spec.loader is None:
+            return spec
+        ejecutar = spec.loader.exec_module
+
+        def exec_module(modulo):
+            ejecutar(modulo)
+            _instrumentar_pandas(modulo)
+
+        spec.loader.exec_module = exec_module
+        return spec
+
+
+def _preparar_pandas():
+    if 'pandas' in sys.modules:
+        _instrumentar_pandas(sys.modules['pandas'])
+    elif not any(isinstance(f, _AlImportarPandas) for f in sys.meta_path):
+        sys.meta_path.insert(0, _AlImportarPandas())
+
+
+# --- middleware -----------------------------------------------------------
+
+def instalar(app):
+    """Registra el perfilado de requests en la aplicación Flask."""
+    if not ACTIVO:
+        return
+    from flask import request
+
+    _preparar_pandas()
+
+    @app.before_request
+    def _iniciar_perfil():
+        _actual.medicion = collections.defaultdict(float)
+        _actual.inicio = time.perf_counter()
+        _actual.cprofile = None
+        if request.args.get('perfil') == '1':
+            _actual.cprofile = cProfile.Profile()
+            _actual.cprofile.enable()
+
+    @app.teardown_request
+    def _cerrar_perfil(error=None):
+        medicion = _medicion()
+        if medicion is None:
+            return
+        ms_total = (time.perf_counter() - _actual.inicio) * 1000
+        perfilador = _actual.cprofile
+        _actual.medicion = None
+        _actual.cprofile = None
+
+        reporte = None
+        if perfilador is not None:
+            perfilador.disable()
+            salida = io.StringIO()
+            pstats.Stats(perfilador, stream=salida).sort_stats('cumulative').print_stats(LINEAS_CPROFILE)
+            reporte = salida.getvalue()
+
+        if request.path.startswith('/debug/perf') or request.endpoint == 'static':
+            return
+        registro = {
+            'id': next(_ids),
+            'momento': reloj.ahora().strftime('%d/%m/%Y %H:%M:%S'),
+            'metodo': request.method,
+            'ruta': request.url_rule.rule if request.url_rule else request.path,
+            'url': request.full_path.rstrip('?'),
+            'error': repr(error) if error is not None else None,
+            'ms_total': round(ms_total, 3),
+        }
+        for contador in CONTADORES:
+            registro[contador] = round(medicion.get(contador, 0), 3)
+        registro['cprofile'] = reporte
+        with _buffer_lock:
+            _buffer.append(registro)
+
+
+# --- consultas ------------------------------------------------------------
+
+def registros():
+    """Copia de los requests del buffer, del más reciente al más antiguo."""
+    with _buffer_lock:
+        return list(reversed(_buffer))
+
+
+def registro(id_registro):
+    """Request del buffer por id (None si ya salió del buffer)."""
+    with _buffer_lock:
+        for r in _buffer:
+            if r['id'] == id_registro:
+                return r
+    return None
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def resumen_por_ruta():
+    """
+    Agrupa el buffer por método + ruta.
+
+    Returns:
+        lista de dicts (ordenada por tiempo total acumulado) con requests,
+        p50/p95/máx de ms_total y el promedio de cada contador
+    """
+    grupos = collections.defaultdict(list)
+    for r in registros():
+        grupos[(r['metodo'], r['ruta'])].append(r)
+
+    resumen = []
+    for (metodo, ruta), lista in grupos.items():
+        tiempos = [r['ms_total'] for r in lista]
+        fila = {
+            'metodo': metodo,
+            'ruta': ruta,
+            'requests': len(lista),
+            'ms_total_acumulado': round(sum(tiempos), 1),
+            'p50_ms': round(_percentil(tiempos, 0.50), 1),
+            'p95_ms': round(_percentil(tiempos, 0.95), 1),
+            'max_ms': round(max(tiempos), 1),
+        }
+        for contador in CONTADORES:
+            fila[contador] = round(sum(r[contador] for r in lista) / len(lista), 1)
+        resumen.append(fila)
+    resumen.sort(key=lambda fila: fila['ms_total_acumulado'], reverse=True)
+    return resumen
+
+
+def vaciar():
+    """Descarta todos los requests registrados."""
+    with _buffer_lock:
+        _buffer.clear()
@@ -0,0 +1,98 @@
+"""
+Reloj del sistema.
+
+Todas las consultas de fecha y hora (ocupación, checkouts, reservas,
+fechas de consumos y de archivos) pasan por este módulo en lugar de
+llamar a datetime.now() / date.today() directamente. Así se puede mover
+el sistema a otra fecha sin tocar el reloj de la máquina:
+
+- simulaciones de temporada día por día (benchmarks/simular_temporada.py)
+- capacitación o pruebas con un rooming de otra fecha:
+      HOTEL_FECHA=22/01/2026 python3 wsgi.py
+
+El reloj fijado sigue avanzando en tiempo real desde el momento indicado
+(se guarda un desfase), así los horarios de consumos y backups no se repiten.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Desfase respecto del reloj de la máquina (None = hora real)
+_desfase = None
+_lock = threading.Lock()
+
+
+def ahora():
+    """Fecha y hora actuales del sistema (datetime)."""
+    desfase = _desfase
+    if desfase is None:
+        return datetime.now()
+    return datetime.now() + desfase
+
+
+def hoy():
+    """Fecha actual del sistema (date)."""
+    return ahora().date()
+
+
+def fecha_hoy():
+    """Fecha actual en el formato de los CSV (DD/MM/YYYY)."""
+    return ahora().strftime('%d/%m/%Y')
+
+
+def fijar(momento):
+    """
+    Mueve el reloj a un momento dado; desde ahí sigue corriendo.
+
+    Args:
+        momento: datetime, o date (se toma la hora actual de ese día)
+    """
+    global _desfase
+    if not isinstance(momento, datetime):
+        momento = datetime.combine(momento, datetime.now().time())
+    with _lock:
+        _desfase = momento - datetime.now()
+
+
+def avanzar(**intervalo):
+    """Adelanta el reloj, ej. avanzar(days=1) o avanzar(hours=8)."""
+    global _desfase
+    with _lock:
+        _desfase = (_desfase or timedelta()) + timedelta(**intervalo)
+
+
+def restablecer():
+    """Vuelve a la hora real de la máquina."""
+    global _desfase
+    with _lock:
+        _desfase = None
+
+
+@contextmanager
+def fijado(momento):
+    """
+    Context manager: el reloj queda en `momento` dentro del bloque.
+
+    Ejemplo:
+        with reloj.fijado(date(2026, 1, 22)):
+            obtener_habitaciones_ocupadas()
+    """
+    global _desfase
+    anterior = _desfase
+    fijar(momento)
+    try:
+        yield
+    finally:
+        with _lock:
+            _desfase = anterior
+
+
+# Fecha inicial por variable de entorno (DD/MM/YYYY o DD/MM/YYYY HH:MM)
+_inicial = os.environ.get('HOTEL_FECHA', '').strip()
+if _inicial:
+    if ' ' in _inicial:
+        fijar(datetime.strptime(_inicial, '%d/%m/%Y %H:%M'))
+    else:
+        fijar(datetime.strptime(_inicial, '%d/%m/%Y').date())
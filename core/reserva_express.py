@@ -3,29 +3,23 @@ Módulo para gestionar reservas express (walk-ins).
 Permite registrar huéspedes sin reserva previa con estadía de 1 noche.
 """
 
-from datetime import date, timedelta
-import pandas as pd
+from datetime import timedelta
 import os
 
-DB_PASAJEROS = 'data/pasajeros.csv'
+from core import inventario, reloj
+from core.datos import leer_csv, guardar_csv, bloqueo
+from core.esquema import cargar_pasajeros
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
 
 def obtener_habitaciones_disponibles():
     """
     Retorna lista de habitaciones NO ocupadas actualmente.
     """
-    from core.dashboard import PISOS, obtener_habitaciones_ocupadas
-    
-    # Todas las habitaciones del hotel
-    todas_habitaciones = []
-    for piso_habs in PISOS.values():
-        todas_habitaciones.extend(piso_habs)
+    from core.dashboard import obtener_habitaciones_ocupadas
     
-    # Habitaciones ocupadas
-    ocupadas = obtener_habitaciones_ocupadas()
-    
-    # Retornar solo las disponibles
-    disponibles = [h for h in todas_habitaciones if h not in ocupadas.keys()]
-    return sorted(disponibles)
+    # Habitaciones del alojamiento (ya ordenadas) que no están ocupadas
+    return inventario.actual().disponibles(obtener_habitaciones_ocupadas())
 
 
 def crear_reserva_express(habitacion, nombre="Huésped sin reserva", pax=1, servicios="DESAYUNO", noches=1):
@@ -43,11 +37,13 @@ def crear_reserva_express(habitacion, nombre="Huésped sin reserva", pax=1, serv
         tuple: (dict_reserva, str_mensaje) 
                Si falla, retorna (None, str_error)
     """
-    from datetime import datetime
+    import pandas as pd
+    
+    from core.dashboard import obtener_habitaciones_ocupadas
     
-    # Validar que la habitación esté disponible
-    disponibles = obtener_habitaciones_disponibles()
-    if int(habitacion) not in disponibles:
+    # Validar que la habitación exista y esté disponible
+    alojamiento = inventario.actual()
+    if int(habitacion) not in alojamiento or int(habitacion) in obtener_habitaciones_ocupadas():
         return None, f"La habitación {habitacion} no está disponible"
     
     # Validar cantidad de noches
@@ -59,30 +55,30 @@ def crear_reserva_express(habitacion, nombre="Huésped sin reserva", pax=1, serv
         return None, "Cantidad de noches inválida"
     
     # Fechas: hoy y según las noches solicitadas
-    hoy = date.today()
+    hoy = reloj.hoy()
     fecha_salida = hoy + timedelta(days=noches)
     
     # Verificar que no haya conflicto con reservas futuras
     if os.path.exists(DB_PASAJEROS):
-        df_existente = pd.read_csv(DB_PASAJEROS)
-        habitaciones_futuras = df_existente[df_existente['Nro. habitación'] == int(habitacion)]
+        df_fechas = cargar_pasajeros('disponibilidad', DB_PASAJEROS)
+        ingresos = df_fechas.loc[df_fechas['Nro. habitación'] == int(habitacion), 'Fecha de ingreso'].dropna()
         
-        for _, row in habitaciones_futuras.iterrows():
-            try:
-                fecha_ingreso_futura = datetime.strptime(row['Fecha de ingreso'], '%d/%m/%Y').date()
-                
-                # Si hay una reserva futura que ingresa ANTES de nuestra fecha de salida
-                if fecha_ingreso_futura < fecha_salida:
-                    max_noches = (fecha_ingreso_futura - hoy).days
-                    if max_noches <= 0:
-                        return None, f"La habitación {habitacion} ya está ocupada"
-                    return None, f"La habitación {habitacion} tiene una reserva el {fecha_ingreso_futura.strftime('%d/%m/%Y')}. Máximo {max_noches} noche(s) disponible(s)"
-            except:
-                pass
+        # Si hay una reserva futura que ingresa ANTES de nuestra fecha de salida
+        conflictos = ingresos[ingresos < pd.Timestamp(fecha_salida)]
+        if not conflictos.empty:
+            fecha_ingreso_futura = conflictos.iloc[0].date()
+            max_noches = (fecha_ingreso_futura - hoy).days
+            if max_noches <= 0:
+                return None, f"La habitación {habitacion} ya está ocupada"
+            return None, f"La habitación {habitacion} tiene una reserva el {fecha_ingreso_futura.strftime('%d/%m/%Y')}. Máximo {max_noches} noche(s) disponible(s)"
     
     # Crear registro compatible con pasajeros.csv
     nueva_reserva = {
+        'Cód. Alojamiento': alojamiento.codigo,
+        'Descripción': alojamiento.nombre,
         'Nro. habitación': int(habitacion),
+        'Tipo habitación': alojamiento.tipo_de[int(habitacion)],
+        'Cantidad plazas': alojamiento.plazas_de[int(habitacion)],
         'Fecha de ingreso': hoy.strftime('%d/%m/%Y'),
         'Fecha de egreso': fecha_salida.strftime('%d/%m/%Y'),
         'Plazas ocupadas': int(pax),
@@ -98,30 +94,31 @@ def crear_reserva_express(habitacion, nombre="Huésped sin reserva", pax=1, serv
     }
     
     try:
-        # Agregar al CSV existente
-        df_nuevo = pd.DataFrame([nueva_reserva])
+        with bloqueo(DB_PASAJEROS):
+            # Agregar al CSV existente
+            df_nuevo = pd.DataFrame([nueva_reserva])
         
-        if os.path.exists(DB_PASAJEROS):
-            df_existente = pd.read_csv(DB_PASAJEROS)
+            if os.path.exists(DB_PASAJEROS):
+                df_existente = leer_csv(DB_PASAJEROS)
             
-            # Verificar que no esté ocupada HOY (solo rechazar si ingreso <= hoy)
-            habitaciones_hoy = df_existente[df_existente['Nro. habitación'] == int(habitacion)]
-            for _, row in habitaciones_hoy.iterrows():
-                from datetime import datetime
-                try:
-                    fecha_ingreso = datetime.strptime(row['Fecha de ingreso'], '%d/%m/%Y')
-                    hoy_dt = datetime.combine(hoy, datetime.min.time())
+                # Verificar que no esté ocupada HOY (solo rechazar si ingreso <= hoy)
+                habitaciones_hoy = df_existente[df_existente['Nro. habitación'] == int(habitacion)]
+                for _, row in habitaciones_hoy.iterrows():
+                    from datetime import datetime
+                    try:
+                        fecha_ingreso = datetime.strptime(row['Fecha de ingreso'], '%d/%m/%Y')
+                        hoy_dt = datetime.combine(hoy, datetime.min.time())
                     
-                    # Solo rechazar si la habitación ya está ocupada (ingreso <= hoy)
-                    if fecha_ingreso <= hoy_dt:
-                        return None, f"La habitación {habitacion} ya está ocupada hoy"
-                except:
-                    pass
+                        # Solo rechazar si la habitación ya está ocupada (ingreso <= hoy)
+                        if fecha_ingreso <= hoy_dt:
+                            return None, f"La habitación {habitacion} ya está ocupada hoy"
+                    except:
+                        pass
             
-            df_nuevo = pd.concat([df_existente, df_nuevo], ignore_index=True)
+                df_nuevo = pd.concat([df_existente, df_nuevo], ignore_index=True)
         
-        # Guardar
-        df_nuevo.to_csv(DB_PASAJEROS, index=False)
+            # Guardar
+            guardar_csv(df_nuevo, DB_PASAJEROS)
         
         return nueva_reserva, "Reserva express creada exitosamente"
         
@@ -137,29 +134,14 @@ def calcular_noches_maximas(habitacion):
     Returns:
         int: Cantidad máxima de noches disponibles (0 si no hay límite conocido)
     """
-    from datetime import datetime
+    from core.snapshot import obtener_snapshot
     
     if not os.path.exists(DB_PASAJEROS):
         return 0  # Sin límite conocido
     
     try:
-        df = pd.read_csv(DB_PASAJEROS)
-        habitaciones_futuras = df[df['Nro. habitación'] == int(habitacion)]
-        
-        hoy = date.today()
-        min_dias = None
-        
-        for _, row in habitaciones_futuras.iterrows():
-            try:
-                fecha_ingreso = datetime.strptime(row['Fecha de ingreso'], '%d/%m/%Y').date()
-                if fecha_ingreso > hoy:
-                    dias = (fecha_ingreso - hoy).days
-                    if min_dias is None or dias < min_dias:
-                        min_dias = dias
-            except:
-                pass
-        
-        return min_dias if min_dias else 0
+        # Arrays de fechas del snapshot compartido: sin releer el CSV por habitación
+        return obtener_snapshot(archivo_pasajeros=DB_PASAJEROS).noches_maximas(int(habitacion), reloj.hoy())
     except:
         return 0
 
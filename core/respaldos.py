@@ -0,0 +1,371 @@
+"""
+Respaldos de los CSV (pasajeros, consumos) deduplicados y comprimidos,
+con política de retención y restauración a cualquier momento (/respaldos).
+
+Antes cada carga de rooming, cada operación de gestionar_reservas_futuras
+y cada reinicio de temporada dejaban una copia completa sin comprimir.
+Ahora:
+
+- Cada versión se guarda por su contenido (hash blake2b): si el CSV no
+  cambió desde el respaldo anterior, no se escribe nada nuevo, solo la
+  entrada del catálogo.
+- Una versión nueva se guarda como diferencia por filas contra la versión
+  anterior del mismo CSV (filas copiadas como rangos + filas nuevas),
+  comprimida con gzip: unos pocos KB por respaldo. Cada MAX_CADENA
+  diferencias se guarda una copia completa (también comprimida), así
+  restaurar nunca aplica más de MAX_CADENA pasos.
+- Después de cada respaldo se aplica la retención (RETENCION, o la
+  "retencion" del alojamiento en config/inventario.json) y se borran los
+  objetos que ya no necesita ninguna entrada.
+
+Estructura en el directorio de backups del alojamiento:
+    catalogo.jsonl                 una línea por respaldo (ver respaldar())
+    objetos/<hash>.csv.gz          copia completa (se abre con zcat)
+    objetos/<hash>.delta.gz        diferencia contra la versión base
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from core import inventario, metricas, reloj
+from core.datos import bloqueo, firma_archivo
+
+DIR_BACKUPS = inventario.DIR_BACKUPS
+CATALOGO = 'catalogo.jsonl'
+OBJETOS = 'objetos'
+MAX_CADENA = 20
+FORMATO_MOMENTO = '%d/%m/%Y %H:%M:%S'
+
+# Retención por defecto: todos los respaldos de la última semana, uno por
+# día del último mes y uno por semana de los últimos seis meses.
+# Siempre se conserva el último de cada archivo.
+RETENCION = {
+    'completos_dias': 7,
+    'diarios_dias': 30,
+    'semanales_semanas': 26,
+}
+
+# CSV que se pueden restaurar desde /respaldos
+RESTAURABLES = ('pasajeros.csv', 'consumos_diarios.csv')
+
+# Última versión respaldada de cada CSV: (directorio, archivo) -> (hash, líneas)
+_ultimas = {}
+_ultimas_lock = threading.Lock()
+
+
+def _hash(datos):
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def _lineas(datos):
+    return datos.decode('utf-8').splitlines(keepends=True)
+
+
+def _escribir(ruta, datos):
+    """Escritura atómica (temporal + os.replace), como el resto de los datos."""
+    directorio = os.path.dirname(ruta)
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(datos)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, ruta)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# --- diferencias por filas ---------------------------------------------------
+
+def diferencia(base, nuevas):
+    """
+    Diferencia entre dos listas de líneas.
+
+    Returns:
+        lista de operaciones: [inicio, cantidad] copia esas líneas de la
+        base; un texto es una línea nueva
+    """
+    posiciones = {}
+    for i, linea in enumerate(base):
+        posiciones.setdefault(linea, i)
+
+    operaciones = []
+    for linea in nuevas:
+        i = posiciones.get(linea)
+        if i is None:
+            operaciones.append(linea)
+            continue
+        ultima = operaciones[-1] if operaciones else None
+        if isinstance(ultima, list) and ultima[0] + ultima[1] == i:
+            ultima[1] += 1
+        else:
+            operaciones.append([i, 1])
+    return operaciones
+
+
+def aplicar(base, operaciones):
+    """Inversa de diferencia(): arma las líneas nuevas."""
+    lineas = []
+    for operacion in operaciones:
+        if isinstance(operacion, list):
+            lineas.extend(base[operacion[0]:operacion[0] + operacion[1]])
+        else:
+            lineas.append(operacion)
+    return lineas
+
+
+# --- catálogo y objetos ------------------------------------------------------
+
+def _ruta_catalogo(directorio):
+    return os.path.join(directorio, CATALOGO)
+
+
+def _ruta_objeto(directorio, hash_, delta):
+    return os.path.join(directorio, OBJETOS, f"{hash_}.{'delta' if delta else 'csv'}.gz")
+
+
+def _leer_catalogo(directorio):
+    """Entradas del catálogo en orden de creación."""
+    try:
+        with open(_ruta_catalogo(directorio), encoding='utf-8') as f:
+            return [json.loads(linea) for linea in f if linea.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _guardar_catalogo(directorio, entradas):
+    texto = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in entradas)
+    _escribir(_ruta_catalogo(directorio), texto.encode('utf-8'))
+
+
+def listar(directorio=DIR_BACKUPS):
+    """Respaldos, del más reciente al más antiguo."""
+    return sorted(_leer_catalogo(directorio), key=lambda e: e['ts'], reverse=True)
+
+
+def obtener(id_respaldo, directorio=DIR_BACKUPS):
+    """Entrada del catálogo o None."""
+    return next((e for e in _leer_catalogo(directorio) if e['id'] == id_respaldo), None)
+
+
+def _cargar(directorio, cadena):
+    """Líneas de la versión cadena[0], aplicando las diferencias desde la copia completa."""
+    with gzip.open(_ruta_objeto(directorio, cadena[-1], delta=False), 'rb') as f:
+        lineas = _lineas(f.read())
+    for hash_ in reversed(cadena[:-1]):
+        with gzip.open(_ruta_objeto(directorio, hash_, delta=True), 'rb') as f:
+            lineas = aplicar(lineas, json.loads(f.read())['operaciones'])
+    return lineas
+
+
+def leer(entrada, directorio=DIR_BACKUPS):
+    """
+    Contenido de un respaldo, verificado contra su hash.
+
+    Returns:
+        bytes del CSV tal como estaba
+    """
+    datos = ''.join(_cargar(directorio, entrada['cadena'])).encode('utf-8')
+    if _hash(datos) != entrada['hash']:
+        raise ValueError(f"El respaldo {entrada['id']} está dañado (hash distinto)")
+    return datos
+
+
+def _ultima_version(directorio, archivo, entradas):
+    """(entrada, líneas) de la última versión respaldada del archivo, o (None, None)."""
+    anteriores = [e for e in entradas if e['archivo'] == archivo]
+    if not anteriores:
+        return None, None
+    ultima = max(anteriores, key=lambda e: e['ts'])
+    with _ultimas_lock:
+        guardada = _ultimas.get((directorio, archivo))
+    if guardada is not None and guardada[0] == ultima['hash']:
+        return ultima, guardada[1]
+    try:
+        return ultima, _cargar(directorio, ultima['cadena'])
+    except (OSError, ValueError) as e:
+        print(f"⚠️  No se pudo leer el respaldo anterior de {archivo}: {e}")
+        return None, None
+
+
+def respaldar(archivo, motivo, tipo='manual', directorio=DIR_BACKUPS):
+    """
+    Respalda el estado actual de un CSV.
+
+    Args:
+        archivo: CSV a respaldar
+        motivo: texto para la lista de respaldos (ej. 'Carga de rooming (agregar)')
+        tipo: 'rooming', 'reservas', 'temporada', 'reubicacion', 'auditoria', 'restauracion' o 'manual'
+        directorio: directorio de backups del alojamiento
+
+    Returns:
+        dict con la entrada del catálogo (None si el archivo no existe)
+    """
+    if firma_archivo(archivo) is None:
+        return None
+    directorio = os.path.abspath(directorio)
+    nombre = os.path.basename(archivo)
+    inicio = time.perf_counter()
+
+    with bloqueo(archivo):
+        with open(archivo, 'rb') as f:
+            datos = f.read()
+    hash_ = _hash(datos)
+    lineas = _lineas(datos)
+    ahora = reloj.ahora()
+
+    os.makedirs(os.path.join(directorio, OBJETOS), exist_ok=True)
+    with bloqueo(_ruta_catalogo(directorio)):
+        entradas = _leer_catalogo(directorio)
+        existente = next((e for e in entradas if e['hash'] == hash_), None)
+        almacenado = 0
+        if existente is not None:
+            # Mismo contenido que un respaldo anterior: se reutiliza su objeto
+            cadena = existente['cadena']
+        else:
+            anterior, lineas_anteriores = _ultima_version(directorio, nombre, entradas)
+            objeto = None
+            if anterior is not None and len(anterior['cadena']) < MAX_CADENA:
+                delta = gzip.compress(json.dumps({
+                    'base': anterior['hash'],
+                    'operaciones': diferencia(lineas_anteriores, lineas),
+                }, ensure_ascii=False).encode('utf-8'), mtime=0)
+                completo = gzip.compress(datos, mtime=0)
+                if len(delta) < len(completo):
+                    objeto = (delta, True, [hash_] + anterior['cadena'])
+                else:
+                    objeto = (completo, False, [hash_])
+            if objeto is None:
+                objeto = (gzip.compress(datos, mtime=0), False, [hash_])
+            contenido, es_delta, cadena = objeto
+            _escribir(_ruta_objeto(directorio, hash_, es_delta), contenido)
+            almacenado = len(contenido)
+
+        entrada = {
+            'id': uuid.uuid4().hex[:12],
+            'archivo': nombre,
+            'momento': ahora.strftime(FORMATO_MOMENTO),
+            'ts': ahora.timestamp(),
+            'tipo': tipo,
+            'motivo': motivo,
+            'hash': hash_,
+            'cadena': cadena,
+            'filas': max(len(lineas) - 1, 0),
+            'bytes': len(datos),
+            'almacenado': almacenado,
+        }
+        entradas.append(entrada)
+        entradas = aplicar_retencion(entradas, directorio=directorio)
+        _guardar_catalogo(directorio, entradas)
+
+    with _ultimas_lock:
+        _ultimas[(directorio, nombre)] = (hash_, lineas)
+    metricas.respaldo(archivo, almacenado, time.perf_counter() - inicio)
+    return entrada
+
+
+# --- retención ---------------------------------------------------------------
+
+def _politica():
+    return {**RETENCION, **inventario.actual().retencion}
+
+
+def seleccionar(entradas, ahora, politica=None):
+    """
+    Entradas que conserva la política de retención.
+
+    Args:
+        entradas: lista del catálogo
+        ahora: datetime de referencia
+        politica: dict como RETENCION (por defecto la del alojamiento)
+    """
+    politica = {**RETENCION, **(politica or {})}
+    conservar = set()
+    por_archivo = {}
+    for entrada in sorted(entradas, key=lambda e: e['ts'], reverse=True):
+        por_archivo.setdefault(entrada['archivo'], []).append(entrada)
+
+    for lista in por_archivo.values():
+        conservar.add(lista[0]['id'])  # siempre el último
+        dias_vistos, semanas_vistas = set(), set()
+        for entrada in lista:
+            momento = datetime.fromtimestamp(entrada['ts'])
+            dias = (ahora - momento).total_seconds() / 86400
+            dia = momento.date()
+            semana = dia.isocalendar()[:2]
+            if dias < politica['completos_dias']:
+                conservar.add(entrada['id'])
+            elif dias < politica['diarios_dias'] and dia not in dias_vistos:
+                conservar.add(entrada['id'])
+            elif dias < politica['semanales_semanas'] * 7 and semana not in semanas_vistas:
+                conservar.add(entrada['id'])
+            dias_vistos.add(dia)
+            semanas_vistas.add(semana)
+    return [e for e in entradas if e['id'] in conservar]
+
+
+def aplicar_retencion(entradas=None, directorio=DIR_BACKUPS, politica=None):
+    """
+    Descarta los respaldos que no conserva la política y borra los objetos
+    que ya no necesita ninguna entrada.
+
+    Returns:
+        lista de entradas conservadas (si se pasaron `entradas`, el llamador
+        guarda el catálogo; si no, se guarda acá)
+    """
+    if entradas is None:
+        with bloqueo(_ruta_catalogo(directorio)):
+            conservadas = aplicar_retencion(_leer_catalogo(directorio), directorio, politica)
+            _guardar_catalogo(directorio, conservadas)
+        return conservadas
+
+    conservadas = seleccionar(entradas, reloj.ahora(), politica or _politica())
+
+    necesarios = {hash_ for e in conservadas for hash_ in e['cadena']}
+    carpeta = os.path.join(directorio, OBJETOS)
+    try:
+        nombres = os.listdir(carpeta)
+    except FileNotFoundError:
+        nombres = []
+    for nombre in nombres:
+        if nombre.endswith('.gz') and nombre.split('.')[0] not in necesarios:
+            os.remove(os.path.join(carpeta, nombre))
+    return conservadas
+
+
+# --- restauración ------------------------------------------------------------
+
+def restaurar(id_respaldo, directorio=DIR_BACKUPS, directorio_datos=None):
+    """
+    Vuelve un CSV al contenido de un respaldo. El estado actual se respalda
+    antes, así la restauración también se puede deshacer.
+
+    Returns:
+        dict con la entrada restaurada
+
+    Raises:
+        ValueError: si el respaldo no existe, no es restaurable o está dañado
+    """
+    from core.datos import guardar_texto
+
+    entrada = obtener(id_respaldo, directorio)
+    if entrada is None:
+        raise ValueError('El respaldo no existe')
+    if entrada['archivo'] not in RESTAURABLES:
+        raise ValueError(f"{entrada['archivo']} no se puede restaurar")
+
+    destino = os.path.join(directorio_datos or inventario.actual().datos, entrada['archivo'])
+    datos = leer(entrada, directorio)
+    with bloqueo(destino):
+        respaldar(destino, f"Antes de restaurar el respaldo del {entrada['momento']}",
+                  tipo='restauracion', directorio=directorio)
+        guardar_texto(datos.decode('utf-8'), destino, filas=entrada['filas'])
+    return entrada
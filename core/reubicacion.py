@@ -0,0 +1,271 @@
+"""
+Reubicación masiva: mover de una vez a los huéspedes de varias
+habitaciones (un piso o un ala que se cierra por falta de agua, una
+pérdida, un corte de luz...) a habitaciones libres.
+
+cambiar_habitacion() mueve de a un huésped y relee y reescribe los dos
+CSV en cada cambio. Acá:
+
+- planificar() arma el plan desde el snapshot (core/snapshot.py), sin
+  leer los CSV: para cada habitación de origen busca una habitación
+  libre que tenga capacidad para sus pasajeros y cuya próxima reserva
+  futura no empiece antes del egreso (intervalos de ingreso/egreso de
+  cada reserva). La asignación es un emparejamiento máximo (caminos de
+  aumento): si existe una forma de ubicar a todos, la encuentra, y entre
+  los destinos posibles prefiere la capacidad más justa y el piso más
+  cercano.
+- aplicar() vuelve a validar el plan contra los CSV (bajo bloqueo de los
+  dos archivos), respalda ambos (core/respaldos.py) y escribe cada CSV
+  una sola vez con todos los cambios y sus consumos. Si falla la
+  escritura de consumos, pasajeros.csv vuelve a su contenido anterior.
+
+Las reservas futuras de las habitaciones de origen no se mueven (no se
+sabe si el cierre llega a esas fechas): el plan las informa.
+"""
+
+import os
+from datetime import datetime
+
+from core import inventario, reloj
+from core.datos import bloqueo, guardar_csv, leer_csv
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+
+# Sin egreso válido: la estadía no termina (ninguna reserva futura le deja lugar)
+SIN_EGRESO = 10 ** 9
+
+
+def _ordinal(fecha):
+    try:
+        return datetime.strptime(str(fecha)[:10], '%d/%m/%Y').toordinal()
+    except ValueError:
+        return 0
+
+
+class Ocupacion:
+    """Estado de las habitaciones a una fecha, a partir de los intervalos de cada reserva."""
+
+    def __init__(self, habitaciones, ingresos, egresos, plazas, hoy):
+        """
+        Args:
+            habitaciones, ingresos, egresos, plazas: una entrada por pasajero
+                (fechas como ordinales, plazas = 'Plazas ocupadas' de la fila)
+            hoy: ordinal de la fecha de referencia
+        """
+        self.ocupadas = set()
+        self.personas = {}      # habitación -> pasajeros alojados hoy
+        self.plazas = {}        # habitación -> plazas declaradas
+        self.fin = {}           # habitación -> último egreso de la estadía actual
+        self.proxima = {}       # habitación -> ingreso de la próxima reserva futura
+        for hab, ingreso, egreso, plazas_fila in zip(habitaciones, ingresos, egresos, plazas):
+            if ingreso > hoy:
+                self.proxima[hab] = min(self.proxima.get(hab, ingreso), ingreso)
+                continue
+            # Fecha ilegible (ordinal <= 0): ocupada sin fin conocido, como en calcular_habitaciones_ocupadas
+            self.ocupadas.add(hab)
+            self.personas[hab] = self.personas.get(hab, 0) + 1
+            self.plazas[hab] = max(self.plazas.get(hab, 0), plazas_fila)
+            self.fin[hab] = max(self.fin.get(hab, 0), egreso if egreso > 0 and ingreso > 0 else SIN_EGRESO)
+
+    def necesarias(self, habitacion):
+        """Plazas que necesita el grupo alojado en la habitación."""
+        return max(self.personas.get(habitacion, 0), self.plazas.get(habitacion, 0))
+
+    def motivo_rechazo(self, origen, destino, alojamiento):
+        """Por qué `destino` no sirve para el grupo de `origen` (None si sirve)."""
+        if destino not in alojamiento:
+            return f'la habitación {destino} no existe'
+        if destino in self.ocupadas:
+            return f'la habitación {destino} está ocupada'
+        if alojamiento.plazas_de[destino] < self.necesarias(origen):
+            return f'la habitación {destino} tiene {alojamiento.plazas_de[destino]} plazas y hacen falta {self.necesarias(origen)}'
+        if destino in self.proxima and self.proxima[destino] < self.fin[origen]:
+            ingreso = datetime.fromordinal(self.proxima[destino]).strftime('%d/%m/%Y')
+            return f'la habitación {destino} tiene una reserva que ingresa el {ingreso}'
+        return None
+
+
+def _ocupacion_snapshot(snapshot, hoy):
+    bundle = snapshot.bundle
+    habitaciones = bundle['pas_hab'].tolist()
+    # Plazas declaradas: las del titular de cada habitación ocupada
+    plazas = [snapshot.ocupadas[h].plazas if h in snapshot.ocupadas else 0 for h in habitaciones]
+    return Ocupacion(habitaciones, bundle['pas_ingreso'].tolist(), bundle['pas_egreso'].tolist(), plazas, hoy)
+
+
+def _ocupacion_df(df, hoy):
+    import pandas as pd
+
+    plazas = pd.to_numeric(df['Plazas ocupadas'], errors='coerce').fillna(0).astype(int)
+    return Ocupacion(
+        pd.to_numeric(df['Nro. habitación'], errors='coerce').fillna(0).astype(int).tolist(),
+        [_ordinal(f) for f in df['Fecha de ingreso']],
+        [_ordinal(f) for f in df['Fecha de egreso']],
+        plazas.tolist(),
+        hoy,
+    )
+
+
+def _asignar(origenes, candidatos):
+    """
+    Emparejamiento máximo origen -> destino (algoritmo de caminos de aumento).
+
+    Args:
+        origenes: habitaciones a ubicar
+        candidatos: origen -> destinos posibles, en orden de preferencia
+
+    Returns:
+        dict origen -> destino (solo los que se pudieron ubicar)
+    """
+    ocupante = {}   # destino -> origen
+
+    def ubicar(origen, visitados):
+        for destino in candidatos[origen]:
+            if destino in visitados:
+                continue
+            visitados.add(destino)
+            if destino not in ocupante or ubicar(ocupante[destino], visitados):
+                ocupante[destino] = origen
+                return True
+        return False
+
+    # Los más restringidos primero: la preferencia se respeta mejor
+    for origen in sorted(origenes, key=lambda o: (len(candidatos[o]), o)):
+        ubicar(origen, set())
+    return {origen: destino for destino, origen in ocupante.items()}
+
+
+def planificar(origenes, archivo_pasajeros=DB_PASAJEROS):
+    """
+    Propone destinos para los huéspedes de las habitaciones de origen.
+
+    Args:
+        origenes: habitaciones a desocupar (las que no están ocupadas se ignoran)
+
+    Returns:
+        dict con:
+            'movimientos': lista de dicts (origen, destino, pasajero, plazas, egreso, capacidad)
+            'sin_destino': lista de dicts (origen, pasajero, plazas, egreso) que no entran
+            'reservas': reservas futuras en las habitaciones de origen (Estadia), que no se mueven
+            'libres': habitaciones libres que quedan después del plan
+    """
+    from core.snapshot import obtener_snapshot
+
+    alojamiento = inventario.actual()
+    cerradas = set(origenes)
+    plan = {'movimientos': [], 'sin_destino': [], 'reservas': [], 'libres': []}
+    if not os.path.exists(archivo_pasajeros):
+        return plan
+
+    snapshot = obtener_snapshot(archivo_pasajeros=archivo_pasajeros)
+    ocupacion = _ocupacion_snapshot(snapshot, reloj.hoy().toordinal())
+    ocupadas = snapshot.ocupadas
+    origenes = sorted(o for o in cerradas if o in ocupadas)
+    libres = [h for h in alojamiento.numeros if h not in ocupacion.ocupadas and h not in cerradas]
+
+    candidatos = {}
+    for origen in origenes:
+        piso = alojamiento.piso_de.get(origen, 0)
+        candidatos[origen] = sorted(
+            (d for d in libres if ocupacion.motivo_rechazo(origen, d, alojamiento) is None),
+            key=lambda d: (alojamiento.plazas_de[d] - ocupacion.necesarias(origen),
+                           abs(alojamiento.piso_de[d] - piso), d))
+    asignacion = _asignar(origenes, candidatos)
+
+    for origen in origenes:
+        estadia = ocupadas[origen]
+        fila = {'origen': origen, 'pasajero': estadia.pasajero, 'plazas': ocupacion.necesarias(origen),
+                'egreso': estadia.egreso}
+        if origen in asignacion:
+            destino = asignacion[origen]
+            plan['movimientos'].append(dict(fila, destino=destino, capacidad=alojamiento.plazas_de[destino]))
+        else:
+            plan['sin_destino'].append(fila)
+    plan['reservas'] = [snapshot.reservadas[o] for o in sorted(cerradas) if o in snapshot.reservadas]
+    plan['libres'] = [h for h in libres if h not in set(asignacion.values())]
+    return plan
+
+
+def aplicar(movimientos, motivo='', cerradas=(), archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS):
+    """
+    Aplica un plan de reubicación: todos los movimientos o ninguno.
+
+    Args:
+        movimientos: dict origen -> destino (ver planificar)
+        motivo: razón del cambio, se agrega a las Observaciones
+        cerradas: habitaciones que se cierran (ninguna puede ser destino)
+
+    Returns:
+        tuple: (bool_exito, str_mensaje)
+    """
+    from core.respaldos import respaldar
+
+    if not movimientos:
+        return False, "No hay movimientos para aplicar"
+    if not os.path.exists(archivo_pasajeros):
+        return False, "No existe el archivo de pasajeros"
+    if len(set(movimientos.values())) != len(movimientos):
+        return False, "Dos habitaciones de origen tienen el mismo destino"
+
+    alojamiento = inventario.actual()
+    hoy = reloj.hoy().toordinal()
+    try:
+        with bloqueo(archivo_pasajeros), bloqueo(archivo_consumos):
+            df_pasajeros = leer_csv(archivo_pasajeros)
+            ocupacion = _ocupacion_df(df_pasajeros, hoy)
+
+            # 1. Validar todo el plan contra los datos actuales
+            for origen, destino in movimientos.items():
+                if origen not in ocupacion.ocupadas:
+                    return False, f"La habitación {origen} no está ocupada"
+                if destino in movimientos or destino in cerradas:
+                    return False, f"La habitación {destino} también se está cerrando"
+                rechazo = ocupacion.motivo_rechazo(origen, destino, alojamiento)
+                if rechazo:
+                    return False, f"Hab {origen} → {destino}: {rechazo}"
+
+            # 2. Pasajeros alojados hoy en cada origen -> su destino
+            habitaciones = df_pasajeros['Nro. habitación']
+            actuales = [_ordinal(f) <= hoy for f in df_pasajeros['Fecha de ingreso']]
+            nuevas = [movimientos.get(h, h) if actual else h for h, actual in zip(habitaciones, actuales)]
+            movidos = [h != n for h, n in zip(habitaciones, nuevas)]
+            anterior_pasajeros = df_pasajeros.copy()
+            if 'Observaciones' in df_pasajeros.columns:
+                # Una columna vacía en todo el archivo llega como float (NaN)
+                df_pasajeros['Observaciones'] = df_pasajeros['Observaciones'].astype(object)
+                for i in df_pasajeros.index[movidos]:
+                    obs = str(df_pasajeros.at[i, 'Observaciones'])
+                    obs = '' if obs == 'nan' else obs
+                    nota = f"Cambio desde Hab {habitaciones[i]}" + (f". Motivo: {motivo}" if motivo else '')
+                    df_pasajeros.at[i, 'Observaciones'] = f"{obs} | {nota}" if obs else nota
+            df_pasajeros['Nro. habitación'] = nuevas
+
+            # 3. Consumos de cada origen -> su destino
+            df_consumos = None
+            consumos_movidos = 0
+            if os.path.exists(archivo_consumos):
+                df_consumos = leer_csv(archivo_consumos)
+                trasladar = df_consumos['habitacion'].isin(list(movimientos))
+                consumos_movidos = int(trasladar.sum())
+                df_consumos.loc[trasladar, 'habitacion'] = df_consumos.loc[trasladar, 'habitacion'].map(movimientos)
+
+            # 4. Respaldo y una sola escritura por archivo
+            motivo_respaldo = f'Reubicación masiva ({len(movimientos)} habitaciones)'
+            respaldar(archivo_pasajeros, motivo_respaldo, tipo='reubicacion')
+            if df_consumos is not None and consumos_movidos:
+                respaldar(archivo_consumos, motivo_respaldo, tipo='reubicacion')
+            guardar_csv(df_pasajeros, archivo_pasajeros)
+            if df_consumos is not None and consumos_movidos:
+                try:
+                    guardar_csv(df_consumos, archivo_consumos)
+                except Exception:
+                    guardar_csv(anterior_pasajeros, archivo_pasajeros)
+                    raise
+    except Exception as e:
+        return False, f"Error en la reubicación: {str(e)}"
+
+    mensaje = f"Reubicación completada: {len(movimientos)} habitación(es), {sum(movidos)} pasajero(s)"
+    if consumos_movidos:
+        mensaje += f", {consumos_movidos} consumo(s) trasladado(s)"
+    return True, mensaje
@@ -0,0 +1,331 @@
+"""
+Snapshot compartido del estado de las habitaciones.
+
+Con varios workers (gunicorn multi-proceso), cada uno parseaba su propia
+copia de pasajeros.csv y consumos_diarios.csv. Este módulo calcula el
+estado derivado UNA sola vez por cada cambio de los CSV y lo publica en un
+archivo binario columnar (core/columnar.py) dentro de data/.estado/.
+
+- Los workers lo mapean con mmap (sin copias): la memoria no crece al
+  agregar workers, todos comparten las mismas páginas.
+- La publicación es atómica (temporal + os.replace) y lleva un número de
+  versión. Cada worker compara la firma del archivo y, si cambió, mapea
+  la nueva versión; las peticiones en curso siguen usando la anterior.
+- Solo el primer worker que detecta el cambio reconstruye el snapshot
+  (bajo bloqueo), el resto mapea el resultado: una escritura queda visible
+  en todos los procesos sin N re-lecturas del CSV.
+
+Contenido:
+    - ocupadas:   habitación -> Estadia del titular (nombre, plazas, fechas, servicios...)
+    - reservadas: habitación -> Estadia de la reserva futura
+    - totales:    habitación -> totales de consumos por categoría (matriz
+                  habitación x categoría en centavos, ver core/categorias.py)
+    - arrays de fechas de cada pasajero (ingreso/egreso como ordinales)
+
+Los grupos por voucher (familias en varias habitaciones) salen de las
+columnas de ocupadas: el índice voucher -> habitaciones se arma una vez
+por versión y proceso, junto con los diccionarios.
+"""
+
+import hashlib
+import math
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from core.cache_disco import cargar_columnas
+from core import categorias, dinero, inventario, metricas, reloj
+from core.columnar import escribir_bundle, mapear_bundle
+from core.datos import a_entero, bloqueo, filas_desde_bytes, firma_archivo, leer_filas
+from core.modelos import Estadia
+
+DB_PASAJEROS = inventario.DB_PASAJEROS
+DB_CONSUMOS = inventario.DB_CONSUMOS
+
+# Cambiar si se modifica el contenido del snapshot
+VERSION_FORMATO = 4
+
+# Snapshot mapeado actualmente por este proceso: ruta -> Snapshot
+_actuales = {}
+_actuales_lock = threading.Lock()
+
+
+def _ordinal(fecha_txt):
+    """Convierte DD/MM/YYYY a ordinal de fecha (-1 si es inválida)."""
+    try:
+        return datetime.strptime(fecha_txt, '%d/%m/%Y').toordinal()
+    except (TypeError, ValueError):
+        return -1
+
+
+def _texto(valor):
+    """Normaliza valores de celda a texto (NaN/None -> '')."""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return ''
+    return str(valor)
+
+
+def _ruta_snapshot(archivo_pasajeros, archivo_consumos):
+    clave = f'{os.path.abspath(archivo_pasajeros)}|{os.path.abspath(archivo_consumos)}'
+    nombre = hashlib.md5(clave.encode('utf-8')).hexdigest()[:10]
+    directorio = os.path.join(os.path.dirname(os.path.abspath(archivo_pasajeros)), '.estado')
+    return os.path.join(directorio, f'snapshot_{nombre}.bin')
+
+
+def _clave(archivo_pasajeros, archivo_consumos, fecha_hoy):
+    """Clave de vigencia: firmas de ambos CSV + día de referencia + catálogo de categorías."""
+    return [
+        list(firma_archivo(archivo_pasajeros) or []),
+        list(firma_archivo(archivo_consumos) or []),
+        fecha_hoy,
+        VERSION_FORMATO,
+        list(categorias.catalogo().version),
+    ]
+
+
+def _columnas_pasajeros(filas, fecha_hoy):
+    """Calcula las columnas del snapshot que dependen solo de pasajeros.csv."""
+    from core.dashboard import calcular_habitaciones_ocupadas, calcular_habitaciones_reservadas
+
+    columnas = {}
+    ocupadas = calcular_habitaciones_ocupadas(filas, fecha_hoy)
+    reservadas = calcular_habitaciones_reservadas(filas, fecha_hoy)
+
+    habs = sorted(ocupadas)
+    columnas['ocup_hab'] = np.array(habs, dtype=np.int32)
+    columnas['ocup_plazas'] = np.array([ocupadas[h].plazas for h in habs], dtype=np.int32)
+    columnas['ocup_edad'] = np.array([ocupadas[h].edad for h in habs], dtype=np.int32)
+    for campo in ('pasajero', 'ingreso', 'egreso', 'servicios', 'voucher', 'documento'):
+        columnas[f'ocup_{campo}'] = [_texto(getattr(ocupadas[h], campo)) for h in habs]
+
+    habs = sorted(reservadas)
+    columnas['res_hab'] = np.array(habs, dtype=np.int32)
+    columnas['res_plazas'] = np.array([reservadas[h].plazas for h in habs], dtype=np.int32)
+    for campo in ('pasajero', 'ingreso', 'egreso', 'servicios'):
+        columnas[f'res_{campo}'] = [_texto(getattr(reservadas[h], campo)) for h in habs]
+
+    columnas['pas_hab'] = np.array([a_entero(f['Nro. habitación']) for f in filas], dtype=np.int32)
+    columnas['pas_ingreso'] = np.array([_ordinal(f['Fecha de ingreso']) for f in filas], dtype=np.int32)
+    columnas['pas_egreso'] = np.array([_ordinal(f['Fecha de egreso']) for f in filas], dtype=np.int32)
+    columnas['pas_nombre'] = [_texto(f['Apellido y nombre']) for f in filas]
+    return columnas
+
+
+def _construir_columnas(archivo_pasajeros, archivo_consumos, fecha_hoy):
+    """Parsea los CSV y calcula todas las columnas del snapshot."""
+    # --- Pasajeros: cambian poco, sus columnas tipadas se cachean en disco
+    # (data/.cache/) y sobreviven reinicios; un consumo nuevo no obliga a
+    # re-parsear pasajeros.csv ---
+    if os.path.exists(archivo_pasajeros):
+        columnas = cargar_columnas(
+            archivo_pasajeros, 'estado.bin',
+            lambda datos: _columnas_pasajeros(filas_desde_bytes(datos), fecha_hoy),
+            extra=f'{fecha_hoy}|{VERSION_FORMATO}',
+        )
+    else:
+        columnas = _columnas_pasajeros([], fecha_hoy)
+
+    # --- Consumos: totales por habitación y categoría, todas las categorías
+    # en una pasada (core/categorias.py) ---
+    habitaciones, nombres, montos = [], [], []
+    if os.path.exists(archivo_consumos):
+        for fila in leer_filas(archivo_consumos):
+            try:
+                habitaciones.append(a_entero(fila['habitacion']))
+            except (TypeError, ValueError):
+                continue
+            nombres.append(fila['categoria'])
+            montos.append(fila['monto'])
+    tot_hab, nombres, totales, cantidades = categorias.sumar(
+        habitaciones, nombres, dinero.columna_centavos(montos))
+    columnas['tot_hab'] = tot_hab
+    columnas['tot_cantidad'] = cantidades
+    columnas['tot_monto'] = totales.sum(axis=1)
+    # Matriz habitación x categoría, por filas; cat_nombre da las columnas
+    columnas['tot_categorias'] = totales.ravel()
+    columnas['cat_nombre'] = list(nombres)
+
+    return columnas
+
+
+class Snapshot:
+    """
+    Vista de solo lectura sobre un snapshot mapeado en memoria.
+    Los diccionarios se arman perezosamente una vez por versión y proceso.
+    """
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.meta = bundle.meta
+        self.version = bundle.meta['version']
+        self.fecha_hoy = bundle.meta['fecha_hoy']
+        self._ocupadas = None
+        self._reservadas = None
+        self._con_consumos = None
+        self._categorias = None
+        self._por_voucher = None
+
+    @property
+    def ocupadas(self):
+        """Diccionario habitación -> Estadia del titular (no modificar)."""
+        if self._ocupadas is None:
+            self._ocupadas = Estadia.desde_columnas(self.bundle, 'ocup_')
+        return self._ocupadas
+
+    @property
+    def reservadas(self):
+        """Diccionario habitación -> Estadia de la reserva futura (no modificar)."""
+        if self._reservadas is None:
+            self._reservadas = Estadia.desde_columnas(self.bundle, 'res_')
+        return self._reservadas
+
+    @property
+    def por_voucher(self):
+        """Diccionario voucher -> tupla ordenada de habitaciones ocupadas del voucher."""
+        if self._por_voucher is None:
+            grupos = {}
+            for hab, voucher in zip(self.bundle['ocup_hab'].tolist(), self.bundle['ocup_voucher'].tolist()):
+                if voucher:
+                    grupos.setdefault(voucher, []).append(hab)
+            self._por_voucher = {voucher: tuple(habs) for voucher, habs in grupos.items()}
+        return self._por_voucher
+
+    def grupo_de(self, num_habitacion):
+        """Habitaciones ocupadas con el mismo voucher que la habitación (incluida ella)."""
+        estadia = self.ocupadas.get(num_habitacion)
+        if estadia is None or not estadia.voucher:
+            return (num_habitacion,)
+        return self.por_voucher.get(estadia.voucher, (num_habitacion,))
+
+    @property
+    def con_consumos(self):
+        """Set de habitaciones con al menos un consumo registrado."""
+        if self._con_consumos is None:
+            self._con_consumos = set(int(h) for h in self.bundle['tot_hab'])
+        return self._con_consumos
+
+    def _posicion_totales(self, num_habitacion):
+        tot_hab = self.bundle['tot_hab']
+        i = int(np.searchsorted(tot_hab, num_habitacion))
+        if i < len(tot_hab) and tot_hab[i] == num_habitacion:
+            return i
+        return None
+
+    @property
+    def categorias(self):
+        """Categorías de las columnas de totales (catálogo + las que ya no están en él)."""
+        if self._categorias is None:
+            self._categorias = tuple(self.bundle['cat_nombre'].tolist())
+        return self._categorias
+
+    def totales(self, num_habitacion):
+        """Totales por categoría y total general en centavos (mismo formato que obtener_total_consumos)."""
+        i = self._posicion_totales(num_habitacion)
+        k = len(self.categorias)
+        if i is None:
+            totales = dict.fromkeys(self.categorias, 0)
+        else:
+            totales = dict(zip(self.categorias, self.bundle['tot_categorias'][i * k:(i + 1) * k].tolist()))
+        totales['total'] = sum(totales.values())
+        return totales
+
+    def totales_grupo(self, habitaciones):
+        """Totales por categoría y total general de varias habitaciones juntas (centavos)."""
+        k = len(self.categorias)
+        filas = np.isin(self.bundle['tot_hab'], list(habitaciones))
+        sumas = self.bundle['tot_categorias'].reshape(-1, k)[filas].sum(axis=0) if k else []
+        totales = dict(zip(self.categorias, (int(s) for s in sumas)))
+        totales['total'] = sum(totales.values())
+        return totales
+
+    def saldos(self):
+        """Total de cada categoría sumando todas las habitaciones (centavos)."""
+        k = len(self.categorias)
+        sumas = self.bundle['tot_categorias'].reshape(-1, k).sum(axis=0) if k else []
+        return dict(zip(self.categorias, (int(s) for s in sumas)))
+
+    def monto_total(self, num_habitacion):
+        """Suma de todos los consumos de la habitación (todas las categorías), en centavos."""
+        i = self._posicion_totales(num_habitacion)
+        return 0 if i is None else int(self.bundle['tot_monto'][i])
+
+    def cantidad_consumos(self, num_habitacion):
+        i = self._posicion_totales(num_habitacion)
+        return 0 if i is None else int(self.bundle['tot_cantidad'][i])
+
+    def pasajero_de(self, num_habitacion):
+        """Nombre del primer pasajero registrado en la habitación (None si no hay)."""
+        posiciones = np.flatnonzero(self.bundle['pas_hab'] == num_habitacion)
+        if len(posiciones) == 0:
+            return None
+        return self.bundle['pas_nombre'][int(posiciones[0])]
+
+    def noches_maximas(self, num_habitacion, hoy):
+        """
+        Noches disponibles antes de la próxima reserva futura de la habitación.
+
+        Returns:
+            int: cantidad de noches (0 si no hay reservas futuras)
+        """
+        hoy_ordinal = hoy.toordinal()
+        ingresos = self.bundle['pas_ingreso'][self.bundle['pas_hab'] == num_habitacion]
+        futuros = ingresos[ingresos > hoy_ordinal]
+        return int(futuros.min() - hoy_ordinal) if len(futuros) else 0
+
+
+def _mapear_si_vigente(ruta, clave, actual):
+    """Mapea el snapshot publicado en disco si corresponde a la clave vigente."""
+    if actual is not None and firma_archivo(ruta) == actual.bundle.firma:
+        return None
+    bundle = mapear_bundle(ruta)
+    if bundle is None or bundle.meta.get('clave') != clave:
+        return None
+    snapshot = Snapshot(bundle)
+    with _actuales_lock:
+        _actuales[ruta] = snapshot
+    return snapshot
+
+
+def obtener_snapshot(archivo_pasajeros=DB_PASAJEROS, archivo_consumos=DB_CONSUMOS):
+    """
+    Retorna el snapshot vigente, reconstruyéndolo solo si algún CSV cambió
+    (o cambió el día) desde la última publicación.
+    """
+    fecha_hoy = reloj.fecha_hoy()
+    ruta = _ruta_snapshot(archivo_pasajeros, archivo_consumos)
+    clave = _clave(archivo_pasajeros, archivo_consumos, fecha_hoy)
+
+    actual = _actuales.get(ruta)
+    if actual is not None and actual.meta['clave'] == clave:
+        metricas.lectura_cache('snapshot', True)
+        return actual
+
+    # ¿Otro worker ya publicó la versión vigente?
+    snapshot = _mapear_si_vigente(ruta, clave, actual)
+    if snapshot is not None:
+        metricas.lectura_cache('snapshot', True)
+        return snapshot
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with bloqueo(ruta):
+        snapshot = _mapear_si_vigente(ruta, clave, actual)
+        if snapshot is not None:
+            metricas.lectura_cache('snapshot', True)
+            return snapshot
+
+        metricas.lectura_cache('snapshot', False)
+        anterior = mapear_bundle(ruta)
+        version = (anterior.meta.get('version', 0) if anterior else 0) + 1
+        columnas = _construir_columnas(archivo_pasajeros, archivo_consumos, fecha_hoy)
+        escribir_bundle(ruta, columnas, meta={
+            'clave': clave,
+            'version': version,
+            'fecha_hoy': fecha_hoy,
+        })
+
+        snapshot = Snapshot(mapear_bundle(ruta))
+        with _actuales_lock:
+            _actuales[ruta] = snapshot
+        return snapshot
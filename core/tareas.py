@@ -0,0 +1,269 @@
+"""
+Tareas en segundo plano para las operaciones pesadas (cierres,
+exportaciones, importación del rooming).
+
+Una ruta que antes generaba el archivo dentro del request ahora crea una
+tarea y responde enseguida; la terminal ve el avance en /tareas/<id> y
+descarga el resultado cuando está listo, sin bloquear a nadie más.
+
+- Los reportes corren en un pool de procesos (uno por núcleo, hasta
+  MAX_PROCESOS): reportes de días distintos avanzan en paralelo y el
+  trabajo de pandas no compite con los hilos que atienden requests.
+- Las tareas que escriben los CSV (importación del rooming) corren de a
+  una, en un hilo aparte.
+
+Los reportes se guardan además en core/cache_exportes.py: si se pide el
+mismo reporte y los CSV no cambiaron, la tarea se crea ya terminada con
+el archivo anterior.
+
+La tabla de tareas vive en disco (<datos>/.tareas/<id>.json, escrita de forma
+atómica): el proceso que corre la tarea actualiza ahí su avance y
+cualquier worker del servidor puede mostrar el estado o servir el
+archivo. Las tareas terminadas se borran a las HORAS_RETENCION (se revisa
+al encolar, como mucho cada MINUTOS_LIMPIEZA).
+"""
+
+import contextvars
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core import cache_exportes, inventario, reloj
+
+DIRECTORIO = inventario.DIR_TAREAS
+MAX_PROCESOS = 4
+HORAS_RETENCION = 24
+MINUTOS_LIMPIEZA = 10
+
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+TERMINADA = 'terminada'
+ERROR = 'error'
+FINALES = (TERMINADA, ERROR)
+
+# Tipo de tarea -> (función en core.exportes, corre en el pool de procesos)
+TIPOS = {
+    'cierre_csv': ('cierre_csv', True),
+    'cierre_xlsx': ('cierre_xlsx', True),
+    'salidas_checkouts': ('salidas_checkouts', True),
+    'importar_rooming': ('importar_rooming', False),
+}
+
+# Reportes que solo leen los CSV: su resultado se puede reutilizar
+CACHEABLES = ('cierre_csv', 'cierre_xlsx', 'salidas_checkouts')
+
+_procesos = None
+_escrituras = None
+_pools_lock = threading.Lock()
+
+# Directorio -> time.time() de la última limpieza hecha por este proceso
+_limpiezas = {}
+_limpiezas_lock = threading.Lock()
+
+
+def _ruta(id_tarea, directorio=DIRECTORIO):
+    return os.path.join(directorio, f'{id_tarea}.json')
+
+
+def _guardar(tarea, directorio=DIRECTORIO):
+    """Escribe el estado de la tarea (temporal + os.replace)."""
+    os.makedirs(directorio, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix='.tmp_', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(tarea, f, ensure_ascii=False)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, _ruta(tarea['id'], directorio))
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def obtener(id_tarea, directorio=DIRECTORIO):
+    """Estado de una tarea (dict) o None si no existe."""
+    if not id_tarea.isalnum():
+        return None
+    try:
+        with open(_ruta(id_tarea, directorio), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def listar(directorio=DIRECTORIO, limite=50):
+    """Tareas más recientes primero."""
+    if not os.path.isdir(directorio):
+        return []
+    tareas = []
+    for nombre in os.listdir(directorio):
+        if nombre.endswith('.json') and not nombre.startswith('.'):
+            tarea = obtener(nombre[:-5], directorio)
+            if tarea is not None:
+                tareas.append(tarea)
+    tareas.sort(key=lambda t: t['creada_ts'], reverse=True)
+    return tareas[:limite]
+
+
+def _actualizar(id_tarea, directorio, **cambios):
+    tarea = obtener(id_tarea, directorio)
+    if tarea is None:
+        return
+    tarea.update(cambios)
+    _guardar(tarea, directorio)
+
+
+def _ejecutar(id_tarea, directorio, nombre_funcion, destino, parametros, clave_cache=None):
+    """Corre una tarea (en el proceso o hilo del pool) y registra el resultado."""
+    from core import exportes
+
+    def progreso(porcentaje, mensaje=''):
+        _actualizar(id_tarea, directorio, progreso=int(porcentaje), mensaje=mensaje)
+
+    _actualizar(id_tarea, directorio, estado=EN_CURSO, iniciada_ts=time.time(), mensaje='Iniciando')
+    try:
+        resultado = getattr(exportes, nombre_funcion)(destino, progreso, **parametros)
+    except exportes.SinDatos as e:
+        _actualizar(id_tarea, directorio, estado=ERROR, mensaje=str(e), aviso=True,
+                    terminada_ts=time.time())
+        return
+    except Exception as e:
+        print(f"❌ Error en la tarea {id_tarea} ({nombre_funcion}): {e}")
+        _actualizar(id_tarea, directorio, estado=ERROR, mensaje=f'Error: {e}', terminada_ts=time.time())
+        return
+
+    archivo = destino if resultado.get('nombre_descarga') and os.path.exists(destino) else None
+    if archivo is not None:
+        cache_exportes.guardar(clave_cache, destino, resultado)
+    _actualizar(id_tarea, directorio, estado=TERMINADA, progreso=100, mensaje=resultado['mensaje'],
+                archivo=archivo, nombre_descarga=resultado.get('nombre_descarga'),
+                terminada_ts=time.time())
+
+
+def _pool(en_proceso):
+    global _procesos, _escrituras
+    with _pools_lock:
+        if not en_proceso:
+            if _escrituras is None:
+                _escrituras = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tarea_escritura')
+            return _escrituras
+        if _procesos is None:
+            # spawn: un fork desde el servidor multi-hilo podría copiar bloqueos tomados
+            _procesos = ProcessPoolExecutor(max_workers=min(MAX_PROCESOS, os.cpu_count() or 1),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _procesos
+
+
+def limpiar(directorio=DIRECTORIO, horas=HORAS_RETENCION):
+    """Borra las tareas terminadas (y sus archivos) de hace más de `horas`."""
+    limite = time.time() - horas * 3600
+    for tarea in listar(directorio, limite=None):
+        if tarea['estado'] in FINALES and (tarea.get('terminada_ts') or tarea['creada_ts']) < limite:
+            for ruta in (tarea.get('destino'), tarea.get('origen'), _ruta(tarea['id'], directorio)):
+                if ruta and os.path.exists(ruta):
+                    os.remove(ruta)
+
+
+def _limpiar_cada_tanto(directorio):
+    """limpiar() como mucho una vez cada MINUTOS_LIMPIEZA por directorio (lee todas las tareas)."""
+    clave = os.path.abspath(directorio)
+    ahora = time.time()
+    with _limpiezas_lock:
+        if ahora - _limpiezas.get(clave, 0) < MINUTOS_LIMPIEZA * 60:
+            return
+        _limpiezas[clave] = ahora
+    limpiar(directorio)
+
+
+def enviar(tipo, descripcion, parametros=None, extension='', origen=None, directorio=DIRECTORIO):
+    """
+    Crea una tarea y la pone en cola.
+
+    Args:
+        tipo: clave de TIPOS
+        descripcion: texto para la lista de tareas
+        parametros: argumentos de la función de core.exportes (serializables)
+        extension: extensión del archivo resultado ('.csv', '.xlsx')
+        origen: archivo de entrada ya guardado en `directorio` (se borra al limpiar)
+
+    Returns:
+        str: id de la tarea
+    """
+    nombre_funcion, en_proceso = TIPOS[tipo]
+    _limpiar_cada_tanto(directorio)
+
+    id_tarea = uuid.uuid4().hex[:12]
+    directorio = os.path.abspath(directorio)
+    # Antes de buscar en la caché: el reporte cacheado se enlaza acá
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, f'{id_tarea}{extension}')
+    if origen is not None:
+        # Las tareas sin archivo resultado reciben la entrada como primer argumento
+        destino = origen
+    # Las rutas del alojamiento actual se resuelven acá: el proceso del pool no sabe cuál es
+    parametros = {nombre: os.fspath(valor) if isinstance(valor, os.PathLike) else valor
+                  for nombre, valor in (parametros or {}).items()}
+
+    tarea = {
+        'id': id_tarea,
+        'tipo': tipo,
+        'descripcion': descripcion,
+        'estado': PENDIENTE,
+        'progreso': 0,
+        'mensaje': 'En cola',
+        'creada': reloj.ahora().strftime('%d/%m/%Y %H:%M:%S'),
+        'creada_ts': time.time(),
+        'destino': destino,
+        'origen': origen,
+        'archivo': None,
+        'nombre_descarga': None,
+    }
+
+    clave_cache = cache_exportes.clave(tipo, parametros) if tipo in CACHEABLES else None
+    resultado = cache_exportes.buscar(clave_cache, destino)
+    if resultado is not None:
+        # Mismo reporte con los mismos datos: ya está generado
+        tarea.update(estado=TERMINADA, progreso=100, mensaje=resultado['mensaje'], archivo=destino,
+                     nombre_descarga=resultado['nombre_descarga'], en_cache=True,
+                     terminada_ts=time.time())
+        _guardar(tarea, directorio)
+        return id_tarea
+
+    _guardar(tarea, directorio)
+    argumentos = (_ejecutar, id_tarea, directorio, nombre_funcion, destino, parametros, clave_cache)
+    if not en_proceso:
+        # El hilo de escrituras trabaja con el alojamiento del request que creó la tarea
+        argumentos = (contextvars.copy_context().run,) + argumentos
+    futuro = _pool(en_proceso).submit(*argumentos)
+    futuro.add_done_callback(lambda f: _si_fallo(f, id_tarea, directorio))
+    return id_tarea
+
+
+def _si_fallo(futuro, id_tarea, directorio):
+    """Marca la tarea con error si el proceso del pool murió sin registrarlo."""
+    error = futuro.exception()
+    if error is None:
+        return
+    tarea = obtener(id_tarea, directorio)
+    if tarea is not None and tarea['estado'] not in FINALES:
+        _actualizar(id_tarea, directorio, estado=ERROR, mensaje=f'Error: {error}', terminada_ts=time.time())
+
+
+def esperar(id_tarea, timeout=120, intervalo=0.05, directorio=DIRECTORIO):
+    """
+    Espera a que la tarea termine (scripts y mediciones).
+
+    Returns:
+        dict con el estado final (o el último si se agotó el tiempo)
+    """
+    limite = time.time() + timeout
+    while True:
+        tarea = obtener(id_tarea, directorio)
+        if tarea is None or tarea['estado'] in FINALES or time.time() > limite:
+            return tarea
+        time.sleep(intervalo)
@@ -6,23 +6,20 @@ Permite eliminar y volver a cargar reservas de una fecha específica
 
 import pandas as pd
 import sys
-from datetime import datetime
-import shutil
 
-DB_PASAJEROS = 'data/pasajeros.csv'
-BACKUP_DIR = 'data/backups'
+from core import inventario
+from core.datos import leer_csv, guardar_csv, bloqueo
+from core.esquema import cargar_pasajeros
+from core.respaldos import respaldar
 
-def crear_backup():
-    """Crea un backup del archivo de pasajeros"""
-    import os
-    if not os.path.exists(BACKUP_DIR):
-        os.makedirs(BACKUP_DIR)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_file = f'{BACKUP_DIR}/pasajeros_backup_{timestamp}.csv'
-    shutil.copy(DB_PASAJEROS, backup_file)
-    print(f'✅ Backup creado: {backup_file}')
-    return backup_file
+DB_PASAJEROS = inventario.DB_PASAJEROS
+BACKUP_DIR = inventario.DIR_BACKUPS
+
+def crear_backup(motivo='Gestión de reservas futuras'):
+    """Crea un respaldo del archivo de pasajeros (core/respaldos.py)"""
+    entrada = respaldar(DB_PASAJEROS, motivo, tipo='reservas', directorio=BACKUP_DIR)
+    print(f"✅ Backup creado: {entrada['momento']} ({entrada['almacenado']} bytes en {BACKUP_DIR})")
+    return entrada
 
 def eliminar_reservas_por_fecha(fecha_ingreso):
     """
@@ -32,19 +29,20 @@ def eliminar_reservas_por_fecha(fecha_ingreso):
         fecha_ingreso: Fecha en formato DD/MM/YYYY
     """
     # Crear backup primero
-    crear_backup()
+    crear_backup(f'Eliminar reservas del {fecha_ingreso}')
     
-    # Leer archivo
-    df = pd.read_csv(DB_PASAJEROS)
-    registros_antes = len(df)
+    with bloqueo(DB_PASAJEROS):
+        # Leer archivo
+        df = leer_csv(DB_PASAJEROS)
+        registros_antes = len(df)
     
-    # Filtrar (mantener todos EXCEPTO los de esa fecha)
-    df_filtrado = df[df['Fecha de ingreso'] != fecha_ingreso]
-    registros_despues = len(df_filtrado)
-    eliminados = registros_antes - registros_despues
+        # Filtrar (mantener todos EXCEPTO los de esa fecha)
+        df_filtrado = df[df['Fecha de ingreso'] != fecha_ingreso]
+        registros_despues = len(df_filtrado)
+        eliminados = registros_antes - registros_despues
     
-    # Guardar
-    df_filtrado.to_csv(DB_PASAJEROS, index=False)
+        # Guardar
+        guardar_csv(df_filtrado, DB_PASAJEROS)
     
     print(f'\n📊 RESULTADO:')
     print(f'   Registros antes: {registros_antes}')
@@ -60,21 +58,22 @@ def agregar_reservas_desde_csv(archivo_csv):
         archivo_csv: Ruta al archivo CSV con las nuevas reservas
     """
     # Crear backup primero
-    crear_backup()
+    crear_backup(f'Agregar reservas desde {archivo_csv}')
     
-    # Leer ambos archivos
-    df_actual = pd.read_csv(DB_PASAJEROS)
-    df_nuevas = pd.read_csv(archivo_csv)
+    with bloqueo(DB_PASAJEROS):
+        # Leer ambos archivos
+        df_actual = leer_csv(DB_PASAJEROS)
+        df_nuevas = pd.read_csv(archivo_csv)
     
-    registros_antes = len(df_actual)
+        registros_antes = len(df_actual)
     
-    # Combinar (append)
-    df_combinado = pd.concat([df_actual, df_nuevas], ignore_index=True)
-    registros_despues = len(df_combinado)
-    agregados = registros_despues - registros_antes
+        # Combinar (append)
+        df_combinado = pd.concat([df_actual, df_nuevas], ignore_index=True)
+        registros_despues = len(df_combinado)
+        agregados = registros_despues - registros_antes
     
-    # Guardar
-    df_combinado.to_csv(DB_PASAJEROS, index=False)
+        # Guardar
+        guardar_csv(df_combinado, DB_PASAJEROS)
     
     print(f'\n📊 RESULTADO:')
     print(f'   Registros antes: {registros_antes}')
@@ -84,7 +83,8 @@ def agregar_reservas_desde_csv(archivo_csv):
 
 def mostrar_resumen():
     """Muestra un resumen de las reservas por fecha"""
-    df = pd.read_csv(DB_PASAJEROS)
+    # Solo habitación y fechas; las fechas ya vienen parseadas (orden cronológico)
+    df = cargar_pasajeros('disponibilidad', DB_PASAJEROS)
     
     print('\n📊 RESUMEN DE RESERVAS:')
     print(f'Total registros: {len(df)}\n')
@@ -93,15 +93,15 @@ def mostrar_resumen():
     ingresos = df.groupby('Fecha de ingreso').size().sort_index()
     print('Reservas por fecha de ingreso:')
     for fecha, count in ingresos.items():
-        if '2026' in str(fecha):
-            print(f'  {fecha}: {count} pasajeros')
+        if fecha.year == 2026:
+            print(f'  {fecha:%d/%m/%Y}: {count} pasajeros')
     
     # Contar habitaciones únicas por fecha
     print('\nHabitaciones por fecha de ingreso:')
     habitaciones_por_fecha = df.groupby('Fecha de ingreso')['Nro. habitación'].nunique().sort_index()
     for fecha, count in habitaciones_por_fecha.items():
-        if '2026' in str(fecha):
-            print(f'  {fecha}: {count} habitaciones')
+        if fecha.year == 2026:
+            print(f'  {fecha:%d/%m/%Y}: {count} habitaciones')
 
 def menu_principal():
     """Menú interactivo para gestionar reservas"""
@@ -0,0 +1,20 @@
+"""
+Configuración de gunicorn para el modo multi-proceso (opcional).
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Cada proceso mantiene su propia caché de CSV. La coherencia entre
+procesos la da core/datos.py: cada lectura compara la firma del archivo
+(inodo, tamaño, mtime), de modo que una escritura de cualquier worker
+queda visible para todos en la siguiente petición.
+"""
+
+import os
+
+bind = f"{os.environ.get('HOTEL_HOST', '0.0.0.0')}:{os.environ.get('HOTEL_PUERTO', '5000')}"
+workers = int(os.environ.get('HOTEL_PROCESOS', '3'))
+threads = int(os.environ.get('HOTEL_HILOS', '4'))
+worker_class = 'gthread'
+timeout = 120
+accesslog = '-'
@@ -24,5 +24,9 @@ echo "⚠️  Para detener el servidor: presiona Ctrl+C"
 echo ""
 echo "================================================"
 
-# Ejecutar la aplicación
-python app.py
+# Ejecutar la aplicación en modo producción (./iniciar_recepcion.sh --dev para debug)
+if [ "$1" == "--dev" ]; then
+    python app.py
+else
+    python wsgi.py
+fi
@@ -57,4 +57,13 @@ echo ""
 echo "================================================"
 echo ""
 
-python3 app.py
+# Modo producción (por defecto): multi-hilo, sin debug.
+# HOTEL_PROCESOS>1 usa gunicorn multi-proceso si está instalado.
+# ./run_hotel.sh --dev levanta el servidor de desarrollo con debug.
+if [ "$1" == "--dev" ]; then
+    python3 app.py
+elif [ "${HOTEL_PROCESOS:-1}" -gt 1 ] && python3 -c "import gunicorn" 2>/dev/null; then
+    gunicorn -c gunicorn.conf.py wsgi:application
+else
+    python3 wsgi.py
+fi
@@ -0,0 +1,21 @@
+"""
+Configuración común de los tests: el paquete `core` se importa desde la
+raíz del repositorio y cada test deja el reloj del sistema como estaba.
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import reloj  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reloj_real():
+    yield
+    reloj.restablecer()
@@ -0,0 +1,158 @@
+"""Montos en centavos (core/dinero.py) y consumos con montos vacíos o inválidos."""
+
+import csv
+import os
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from core import dinero, exportes, reloj
+from core.consumos import listar_consumos_habitacion
+from core.snapshot import obtener_snapshot
+
+
+@pytest.mark.parametrize('valor, centavos', [
+    ('1500', 150000),
+    ('1500.0', 150000),
+    ('11000.00', 1100000),
+    ('1500,50', 150050),
+    (' 0.5 ', 50),
+    ('-12.34', -1234),
+    ('1e3', 100000),
+    (1500, 150000),
+    (np.int64(7), 700),
+    (12.34, 1234),
+    (1500.5, 150050),
+    (Decimal('9.99'), 999),
+])
+def test_a_centavos(valor, centavos):
+    assert dinero.a_centavos(valor) == centavos
+    assert type(dinero.a_centavos(valor)) is int
+
+
+@pytest.mark.parametrize('valor', ['', '  ', 'abc', '1.500,50', '1,2,3', 'nan', 'inf', None, float('nan')])
+def test_a_centavos_rechaza_montos_invalidos(valor):
+    with pytest.raises(ValueError):
+        dinero.a_centavos(valor)
+
+
+@pytest.mark.parametrize('valor', ['12,345', '12.345', '1.500', '-12.345', '0.125', '1500.500', '0.005',
+                                   12.345, 0.1 + 0.2, Decimal('9.995')])
+def test_a_centavos_rechaza_mas_de_dos_decimales(valor):
+    """'1.500' en recepción son mil quinientos: no se toma como $1.50."""
+    with pytest.raises(ValueError):
+        dinero.a_centavos(valor)
+
+
+@pytest.mark.parametrize('valor', ['', '   ', None, float('nan')])
+def test_centavos_o_cero_vacios(valor):
+    assert dinero.centavos_o_cero(valor) == 0
+
+
+def test_columna_centavos_numerica():
+    columna = dinero.columna_centavos(['11000.0', '0.1', '0.2', 1500, 2.67, '0.29', '1e3'])
+    assert columna.dtype == np.int64
+    assert columna.tolist() == [1100000, 10, 20, 150000, 267, 29, 100000]
+    assert dinero.columna_centavos([]).tolist() == []
+
+
+def test_columna_centavos_vacios_cuentan_cero():
+    assert dinero.columna_centavos(['1500.0', '', None, float('nan')]).tolist() == [150000, 0, 0, 0]
+
+
+def test_columna_centavos_coma_decimal_e_invalidos(capsys):
+    assert dinero.columna_centavos(['1500,50', 'abc', '2']).tolist() == [150050, 0, 200]
+    assert '1 montos inválidos' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('valores', [
+    ['0.125', '12.345', '1.500', '2.675', '0.005'],
+    [0.125, 12.345, 1.5, 2.675],
+    ['1500,50', '-0,01', '12,345', '99999999.99', '0.07', '-3.30'],
+])
+def test_columna_centavos_igual_que_a_centavos(valores, capsys):
+    """El camino en bloque (snapshot, cierres) y el de a una celda (historial) dan los mismos centavos."""
+    esperado = []
+    for valor in valores:
+        try:
+            esperado.append(dinero.a_centavos(valor))
+        except ValueError:
+            esperado.append(0)
+    assert dinero.columna_centavos(valores).tolist() == esperado
+    assert [dinero.celda_centavos(valor) for valor in valores] == esperado
+
+
+def test_formatear():
+    assert dinero.formatear(12345) == '123.45'
+    assert dinero.formatear(5) == '0.05'
+    assert dinero.formatear(-5) == '-0.05'
+    assert dinero.formatear(np.int64(-150050)) == '-1500.50'
+    assert dinero.moneda(None) == '0.00'
+    assert dinero.a_pesos(150050) == 1500.5
+
+
+def test_ida_y_vuelta_texto():
+    for centavos in (0, 1, 99, 100, 150050, -1, 10 ** 12 + 7):
+        assert dinero.a_centavos(dinero.a_texto(centavos)) == centavos
+
+
+def _habitacion_103(tmp_path, consumos_csv):
+    pasajeros = tmp_path / 'pasajeros.csv'
+    consumos = tmp_path / 'consumos_diarios.csv'
+    with open(pasajeros, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['Cód. Alojamiento', 'Nro. habitación', 'Voucher', 'Fecha de ingreso', 'Fecha de egreso',
+                           'Plazas ocupadas', 'Nro. doc.', 'Apellido y nombre', 'Edad', 'Servicios'])
+        escritor.writerow([900, 103, '30076774', '17/10/2026', '21/10/2026', 2, '11867616',
+                           'GONZALEZ ROBERTO', 55, 'MEDIA PENSION'])
+    with open(consumos, 'w', encoding='utf-8', newline='') as f:
+        f.write('fecha,habitacion,pasajero,categoria,monto\n' + consumos_csv)
+    return str(pasajeros), str(consumos)
+
+
+@pytest.fixture
+def consumos_con_monto_vacio(tmp_path):
+    """Una habitación ocupada con un consumo de 1500 y otro con el monto vacío."""
+    with reloj.fijado(reloj.ahora().replace(year=2026, month=10, day=19)):
+        yield _habitacion_103(tmp_path, '19/10/2026 10:00,103,GONZALEZ ROBERTO,Bebidas,1500.0\n'
+                                        '19/10/2026 11:00,103,GONZALEZ ROBERTO,Bebidas,\n'
+                                        '19/10/2026 11:30,,SIN HABITACION,Bebidas,200\n')
+
+
+def test_snapshot_con_monto_vacio(consumos_con_monto_vacio):
+    pasajeros, consumos = consumos_con_monto_vacio
+    snapshot = obtener_snapshot(pasajeros, consumos)
+    assert snapshot.totales(103)['Bebidas'] == 150000
+    assert snapshot.totales(103)['total'] == 150000
+    assert [c.monto for c in listar_consumos_habitacion(103, consumos)] == [150000, 0]
+
+
+def test_cierre_csv_con_monto_vacio(consumos_con_monto_vacio, tmp_path):
+    _, consumos = consumos_con_monto_vacio
+    destino = str(tmp_path / 'cierre.csv')
+    exportes.cierre_csv(destino, fecha='19/10/2026', archivo_consumos=consumos)
+    with open(destino, encoding='utf-8') as f:
+        filas = list(csv.DictReader(f))
+    assert len(filas) == 1
+    assert float(filas[0]['Bebidas']) == 1500.0
+    assert float(filas[0]['TOTAL_GENERAL']) == 1500.0
+    assert os.path.getsize(destino) > 0
+
+
+def test_tres_decimales_dan_lo_mismo_en_todos_los_totales(tmp_path, capsys):
+    """'1.500' y '0.125' no cuentan distinto en el snapshot, el cierre y el historial."""
+    filas = ['1500.0', '1.500', '0.125', '2.50', '"12,34"']
+    csv_consumos = ''.join(f'19/10/2026 1{i}:00,103,GONZALEZ ROBERTO,Bebidas,{monto}\n'
+                           for i, monto in enumerate(filas))
+    with reloj.fijado(reloj.ahora().replace(year=2026, month=10, day=19)):
+        pasajeros, consumos = _habitacion_103(tmp_path, csv_consumos)
+        snapshot = obtener_snapshot(pasajeros, consumos).totales(103)['Bebidas']
+        destino = str(tmp_path / 'cierre.csv')
+        exportes.cierre_csv(destino, fecha='19/10/2026', archivo_consumos=consumos)
+    with open(destino, encoding='utf-8') as f:
+        cierre = dinero.a_centavos(next(csv.DictReader(f))['Bebidas'])
+    a_mano = sum(dinero.celda_centavos(monto.strip('"')) for monto in filas)
+
+    assert snapshot == cierre == a_mano == 150000 + 250 + 1234
+    assert [c.monto for c in listar_consumos_habitacion(103, consumos)] == [150000, 0, 0, 250, 1234]
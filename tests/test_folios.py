@@ -0,0 +1,105 @@
+"""Archivo de folios cerrados (core/folios.py): numeración, índice y cortes a mitad de escritura."""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from core import folios, reloj
+from core.modelos import Consumo, Estadia, Folio
+
+CIERRE = datetime(2026, 3, 5, 10, 30)
+
+
+def _folio(habitacion, pasajero, documento, montos):
+    estadia = Estadia(habitacion, pasajero, 2, '01/03/2026', '05/03/2026', 'MEDIA PENSION',
+                      voucher='30076774', documento=documento)
+    consumos = [Consumo(i, '02/03/2026 12:00', categoria, monto) for i, (categoria, monto) in enumerate(montos)]
+    return Folio(habitacion, estadia, consumos, {})
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    with reloj.fijado(CIERRE):
+        yield str(tmp_path / 'folios')
+
+
+def _lineas(directorio, nombre):
+    with open(os.path.join(directorio, nombre), 'rb') as f:
+        return f.read().split(b'\n')
+
+
+def test_archivar_numera_y_suma_en_centavos(directorio):
+    numeros = folios.archivar([
+        _folio(101, 'GONZALEZ ROBERTO', '11.867.616', [('Bebidas', 150050), ('Bebidas', 1), ('Map', 200000)]),
+        _folio(102, 'MOLINA GRACIELA', '31600678', []),
+    ], directorio)
+    assert numeros == [1, 2]
+    assert folios.archivar([], directorio) == []
+
+    primero = folios.obtener(1, directorio)
+    assert primero['habitacion'] == 101
+    assert primero['documento'] == '11867616'
+    assert primero['totales']['Bebidas'] == 150051
+    assert primero['total'] == 350051
+    assert folios.obtener(2, directorio)['total'] == 0
+    assert folios.obtener(3, directorio) is None
+
+
+def test_buscar_por_documento_pasajero_y_fecha(directorio):
+    folios.archivar([_folio(101, 'GONZÁLEZ ROBERTO', '11867616', [('Map', 100)])], directorio)
+    folios.archivar([_folio(102, 'MOLINA GRACIELA', '31600678', [])], directorio)
+
+    assert [e['numero'] for e in folios.buscar('11.867.616', directorio=directorio)] == [1]
+    assert [e['numero'] for e in folios.buscar('gonzalez', directorio=directorio)] == [1]
+    assert [e['numero'] for e in folios.buscar(directorio=directorio)] == [2, 1]
+    assert [e['numero'] for e in folios.buscar(fecha='05/03/2026', directorio=directorio)] == [2, 1]
+    assert folios.buscar(fecha='06/03/2026', directorio=directorio) == []
+
+
+def test_linea_cortada_se_cierra_y_se_saltea(directorio):
+    """Un corte a mitad del write deja una línea sin '\\n': el próximo archivar no la pega a la suya."""
+    folios.archivar([_folio(101, 'GONZALEZ ROBERTO', '11867616', [('Map', 100)])], directorio)
+    with open(os.path.join(directorio, folios.ARCHIVO), 'ab') as f:
+        f.write(b'{"numero": 2, "habitacion": 10')
+
+    assert folios.archivar([_folio(102, 'MOLINA GRACIELA', '31600678', [('Bebidas', 500)])], directorio) == [2]
+
+    assert folios.obtener(1, directorio)['habitacion'] == 101
+    assert folios.obtener(2, directorio)['habitacion'] == 102
+    lineas = _lineas(directorio, folios.ARCHIVO)
+    assert lineas[1] == b'{"numero": 2, "habitacion": 10'
+    assert lineas[-1] == b''
+    assert json.loads(lineas[2])['pasajero'] == 'MOLINA GRACIELA'
+
+
+def test_indice_atrasado_se_completa_antes_de_agregar(directorio):
+    """Corte entre la escritura del folio y la del índice: el folio no se pierde ni se repite su número."""
+    folios.archivar([_folio(101, 'GONZALEZ ROBERTO', '11867616', [])], directorio)
+    folios.archivar([_folio(102, 'MOLINA GRACIELA', '31600678', [])], directorio)
+
+    ruta_indice = os.path.join(directorio, folios.INDICE)
+    with open(ruta_indice, 'rb') as f:
+        primera = f.readline()
+    with open(ruta_indice, 'wb') as f:
+        f.write(primera)
+    folios._indices.clear()   # proceso nuevo
+
+    assert folios.obtener(2, directorio) is None
+    assert folios.archivar([_folio(103, 'PEREZ ANA', '22333444', [])], directorio) == [3]
+    assert [folios.obtener(n, directorio)['habitacion'] for n in (1, 2, 3)] == [101, 102, 103]
+    assert len([l for l in _lineas(directorio, folios.INDICE) if l]) == 3
+
+
+def test_indice_de_otro_worker_se_lee_desde_el_ultimo_offset(directorio):
+    folios.archivar([_folio(101, 'GONZALEZ ROBERTO', '11867616', [])], directorio)
+    indice = folios._indice(os.path.abspath(directorio))
+    offset = indice.offset
+
+    # Otro worker agrega un folio: este proceso solo lee lo nuevo
+    folios._indices.clear()
+    folios.archivar([_folio(102, 'MOLINA GRACIELA', '31600678', [])], directorio)
+    folios._indices[os.path.abspath(directorio)] = indice
+    assert folios.obtener(2, directorio)['habitacion'] == 102
+    assert indice.offset > offset
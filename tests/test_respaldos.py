@@ -0,0 +1,134 @@
+"""Respaldos por diferencias (core/respaldos.py): ida y vuelta, retención y restauración."""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import reloj, respaldos
+
+ENCABEZADO = 'fecha,habitacion,pasajero,categoria,monto\n'
+INICIO = datetime(2026, 3, 1, 10, 0)
+
+
+def _consumos(n, extra=''):
+    return ENCABEZADO + ''.join(f'01/03/2026 10:00,{101 + i % 20},PASAJERO {i},Bebidas,{i}.00\n'
+                                for i in range(n)) + extra
+
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        f.write(texto)
+
+
+def _leer(ruta):
+    with open(ruta, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def directorios(tmp_path):
+    datos = tmp_path / 'data'
+    backups = datos / 'backups'
+    backups.mkdir(parents=True)
+    return str(datos), str(backups)
+
+
+@pytest.mark.parametrize('base, nuevas', [
+    ([], []),
+    ([], ['a\n', 'b\n']),
+    (['a\n', 'b\n', 'c\n'], []),
+    (['a\n', 'b\n', 'c\n'], ['a\n', 'b\n', 'c\n']),
+    (['a\n', 'b\n', 'c\n'], ['a\n', 'x\n', 'b\n', 'c\n', 'y\n']),      # filas agregadas
+    (['a\n', 'b\n', 'c\n', 'd\n'], ['a\n', 'd\n']),                    # filas borradas
+    (['a\n', 'b\n', 'c\n'], ['c\n', 'b\n', 'a\n']),                    # reordenadas
+    (['a\n', 'a\n', 'b\n'], ['a\n', 'a\n', 'a\n', 'b\n', 'b\n']),      # repetidas
+    (['a\n', 'b'], ['a\n', 'b\n', 'c']),                               # sin salto final
+])
+def test_diferencia_aplicar_ida_y_vuelta(base, nuevas):
+    assert respaldos.aplicar(base, respaldos.diferencia(base, nuevas)) == nuevas
+
+
+def test_diferencia_agrupa_rangos_contiguos():
+    base = [f'{i}\n' for i in range(100)]
+    nuevas = base[:50] + ['nueva\n'] + base[50:]
+    assert respaldos.diferencia(base, nuevas) == [[0, 50], 'nueva\n', [50, 50]]
+
+
+def test_respaldos_sucesivos_se_guardan_como_diferencia(directorios):
+    datos, backups = directorios
+    archivo = os.path.join(datos, 'consumos_diarios.csv')
+    versiones = []
+    for i in range(4):
+        _escribir(archivo, _consumos(200 + i))
+        with reloj.fijado(INICIO + timedelta(hours=i)):
+            versiones.append((respaldos.respaldar(archivo, f'v{i}', directorio=backups), _leer(archivo)))
+
+    assert len(versiones[0][0]['cadena']) == 1
+    assert [len(e['cadena']) for e, _ in versiones[1:]] == [2, 3, 4]
+    for entrada, contenido in versiones:
+        assert respaldos.leer(entrada, backups) == contenido
+
+
+def test_mismo_contenido_reutiliza_el_objeto(directorios):
+    datos, backups = directorios
+    archivo = os.path.join(datos, 'pasajeros.csv')
+    _escribir(archivo, _consumos(10))
+    primera = respaldos.respaldar(archivo, 'uno', directorio=backups)
+    segunda = respaldos.respaldar(archivo, 'dos', directorio=backups)
+    assert segunda['cadena'] == primera['cadena']
+    assert segunda['almacenado'] == 0
+
+
+def test_respaldo_danado_no_se_lee(directorios):
+    datos, backups = directorios
+    archivo = os.path.join(datos, 'pasajeros.csv')
+    _escribir(archivo, _consumos(10))
+    entrada = respaldos.respaldar(archivo, 'uno', directorio=backups)
+    with pytest.raises(ValueError):
+        respaldos.leer({**entrada, 'hash': '0' * 32}, backups)
+
+
+def test_restaurar_despues_de_la_retencion(directorios):
+    """La retención borra entradas viejas pero no los objetos de las cadenas que se conservan."""
+    datos, backups = directorios
+    archivo = os.path.join(datos, 'consumos_diarios.csv')
+    contenidos = {}
+    for dia in range(60):
+        _escribir(archivo, _consumos(50, extra=''.join(f'0{d % 9 + 1}/03/2026 12:00,105,DIA {d},Map,1.00\n'
+                                                          for d in range(dia))))
+        with reloj.fijado(INICIO + timedelta(days=dia)):
+            entrada = respaldos.respaldar(archivo, f'día {dia}', directorio=backups)
+        contenidos[entrada['id']] = _leer(archivo)
+
+    conservadas = respaldos.listar(backups)
+    assert len(conservadas) < 60
+    # El más viejo que queda todavía depende de objetos de días ya descartados
+    assert any(len(e['cadena']) > 1 for e in conservadas)
+    for entrada in conservadas:
+        assert respaldos.leer(entrada, backups) == contenidos[entrada['id']]
+
+    objetos = os.listdir(os.path.join(backups, respaldos.OBJETOS))
+    necesarios = {h for e in conservadas for h in e['cadena']}
+    assert {nombre.split('.')[0] for nombre in objetos} == necesarios
+
+    mas_viejo = conservadas[-1]
+    with reloj.fijado(INICIO + timedelta(days=60)):
+        respaldos.restaurar(mas_viejo['id'], directorio=backups, directorio_datos=datos)
+    assert _leer(archivo) == contenidos[mas_viejo['id']]
+
+    # El estado anterior a restaurar quedó respaldado: la restauración se puede deshacer
+    ultimo = respaldos.listar(backups)[0]
+    assert ultimo['tipo'] == 'restauracion'
+    assert respaldos.leer(ultimo, backups) == contenidos[conservadas[0]['id']]
+
+
+def test_restaurar_rechaza_lo_que_no_es_restaurable(directorios):
+    datos, backups = directorios
+    with pytest.raises(ValueError):
+        respaldos.restaurar('no-existe', directorio=backups, directorio_datos=datos)
+    otro = os.path.join(datos, 'otro.csv')
+    _escribir(otro, 'a,b\n1,2\n')
+    entrada = respaldos.respaldar(otro, 'otro', directorio=backups)
+    with pytest.raises(ValueError):
+        respaldos.restaurar(entrada['id'], directorio=backups, directorio_datos=datos)
@@ -0,0 +1,173 @@
+"""Reubicación masiva (core/reubicacion.py): emparejamiento, reservas, planes vencidos y rollback."""
+
+import csv
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from core import inventario, reloj, reubicacion
+
+HOY = date(2026, 10, 19)
+
+COLUMNAS = ['Cód. Alojamiento', 'Descripción', 'Nro. habitación', 'Tipo habitación', 'Observación habitación',
+            'Cantidad plazas', 'Voucher', 'Sede', 'Fecha de ingreso', 'Fecha de egreso', 'Plazas ocupadas',
+            'Tipo documento', 'Nro. doc.', 'Apellido y nombre', 'Edad', 'Entidad', 'Servicios', 'Paquete',
+            'Transporte', 'Fecha viaje', 'Hora viaje', 'Parada', 'Email', 'Estado', 'Fecha de nacimiento',
+            'Teléfono', 'Celular', 'Usuario', 'Observaciones']
+
+
+def _fecha(dias):
+    return (HOY + timedelta(days=dias)).strftime('%d/%m/%Y')
+
+
+def _pasajero(habitacion, nombre, ingreso, egreso, plazas, documento):
+    fila = dict.fromkeys(COLUMNAS, '')
+    fila.update({
+        'Cód. Alojamiento': 990, 'Nro. habitación': habitacion, 'Voucher': f'V{habitacion}{ingreso}',
+        'Fecha de ingreso': _fecha(ingreso), 'Fecha de egreso': _fecha(egreso), 'Plazas ocupadas': plazas,
+        'Nro. doc.': documento, 'Apellido y nombre': nombre, 'Edad': 40, 'Servicios': 'MEDIA PENSION',
+    })
+    return fila
+
+
+# 101 y 103: dos pasajeros hasta dentro de 5 días. 102: cuatro pasajeros, se van mañana.
+# 203 tiene una reserva que ingresa pasado mañana: solo le sirve a 102.
+PASAJEROS = [
+    _pasajero(101, 'ALVAREZ ANA', -2, 5, 2, '20000001'),
+    _pasajero(101, 'ALVAREZ LUIS', -2, 5, 2, '20000002'),
+    _pasajero(102, 'BENITEZ JUAN', -3, 1, 4, '20000003'),
+    _pasajero(102, 'BENITEZ ROSA', -3, 1, 4, '20000004'),
+    _pasajero(102, 'BENITEZ EVA', -3, 1, 4, '20000005'),
+    _pasajero(102, 'BENITEZ TOMAS', -3, 1, 4, '20000006'),
+    _pasajero(103, 'CASTRO MARIA', -1, 5, 2, '20000007'),
+    _pasajero(103, 'CASTRO PEDRO', -1, 5, 2, '20000008'),
+    _pasajero(203, 'DIAZ SOFIA', 2, 6, 2, '20000009'),
+]
+
+CONSUMOS = [
+    {'fecha': f'{_fecha(-1)} 12:00', 'habitacion': 101, 'pasajero': 'ALVAREZ ANA', 'categoria': 'Bebidas',
+     'monto': '1500.00'},
+    {'fecha': f'{_fecha(-1)} 13:00', 'habitacion': 102, 'pasajero': 'BENITEZ JUAN', 'categoria': 'Map',
+     'monto': '2500.00'},
+]
+
+
+@pytest.fixture
+def hotel(tmp_path, monkeypatch):
+    """Alojamiento de prueba: piso 1 con los orígenes, piso 2 con 201 (doble), 202 y 203 (cuádruples)."""
+    datos = tmp_path / 'data'
+    datos.mkdir()
+    config = tmp_path / 'inventario.json'
+    config.write_text(json.dumps({'alojamientos': [{
+        'codigo': 990, 'nombre': 'HOTEL DE PRUEBA', 'datos': str(datos),
+        'tipos': {'DOBLE': {'plazas': 2}, 'CUADRUPLE': {'plazas': 4}},
+        'pisos': {'1': {'101-103': 'CUADRUPLE'}, '2': {'201': 'DOBLE', '202-203': 'CUADRUPLE'}},
+    }]}), encoding='utf-8')
+    monkeypatch.setattr(inventario, 'RUTA_CONFIG', str(config))
+
+    pasajeros = str(datos / 'pasajeros.csv')
+    consumos = str(datos / 'consumos_diarios.csv')
+    _escribir(pasajeros, COLUMNAS, PASAJEROS)
+    _escribir(consumos, list(CONSUMOS[0]), CONSUMOS)
+    with reloj.fijado(HOY):
+        yield pasajeros, consumos
+
+
+def _escribir(ruta, columnas, filas):
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas)
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def _habitaciones(ruta, columna):
+    with open(ruta, encoding='utf-8', newline='') as f:
+        return [int(float(fila[columna])) for fila in csv.DictReader(f)]
+
+
+def test_asignar_encuentra_lo_que_el_primero_libre_no():
+    """Tomando el primer destino de cada uno, 103 se queda sin lugar; con caminos de aumento entran los tres."""
+    candidatos = {101: [201, 202], 102: [202, 203], 103: [201, 202]}
+    asignacion = reubicacion._asignar([101, 102, 103], candidatos)
+    assert len(asignacion) == 3
+    assert len(set(asignacion.values())) == 3
+    assert all(destino in candidatos[origen] for origen, destino in asignacion.items())
+
+
+def test_planificar_ubica_a_todos(hotel):
+    pasajeros, _ = hotel
+    plan = reubicacion.planificar([101, 102, 103], archivo_pasajeros=pasajeros)
+
+    assert plan['sin_destino'] == []
+    destinos = {m['origen']: m['destino'] for m in plan['movimientos']}
+    assert destinos == {101: 202, 102: 203, 103: 201}
+    assert plan['libres'] == []
+
+
+def test_reserva_futura_antes_del_egreso_no_sirve_de_destino(hotel):
+    pasajeros, consumos = hotel
+    plan = reubicacion.planificar([101], archivo_pasajeros=pasajeros)
+    assert [m['destino'] for m in plan['movimientos']] == [201]
+
+    antes = _habitaciones(pasajeros, 'Nro. habitación')
+    exito, mensaje = reubicacion.aplicar({101: 203}, archivo_pasajeros=pasajeros, archivo_consumos=consumos)
+    assert not exito
+    assert 'reserva' in mensaje and _fecha(2) in mensaje
+    assert _habitaciones(pasajeros, 'Nro. habitación') == antes
+
+    # 102 se va antes de que llegue la reserva: 203 le sirve
+    exito, _ = reubicacion.aplicar({102: 203}, archivo_pasajeros=pasajeros, archivo_consumos=consumos)
+    assert exito
+
+
+def test_plan_vencido_no_se_aplica(hotel):
+    """Un walk-in entra en un destino del plan entre planificar() y aplicar()."""
+    pasajeros, consumos = hotel
+    plan = reubicacion.planificar([101, 102, 103], archivo_pasajeros=pasajeros)
+    movimientos = {m['origen']: m['destino'] for m in plan['movimientos']}
+
+    _escribir(pasajeros, COLUMNAS, PASAJEROS + [_pasajero(201, 'WALK IN', 0, 2, 1, '20000010')])
+    antes_pasajeros = _habitaciones(pasajeros, 'Nro. habitación')
+    antes_consumos = _habitaciones(consumos, 'habitacion')
+
+    exito, mensaje = reubicacion.aplicar(movimientos, archivo_pasajeros=pasajeros, archivo_consumos=consumos)
+    assert not exito
+    assert '201' in mensaje and 'ocupada' in mensaje
+    assert _habitaciones(pasajeros, 'Nro. habitación') == antes_pasajeros
+    assert _habitaciones(consumos, 'habitacion') == antes_consumos
+
+
+def test_aplicar_mueve_pasajeros_y_consumos(hotel):
+    pasajeros, consumos = hotel
+    exito, mensaje = reubicacion.aplicar({101: 202, 103: 201}, motivo='Pérdida de agua',
+                                         archivo_pasajeros=pasajeros, archivo_consumos=consumos)
+    assert exito, mensaje
+    assert _habitaciones(pasajeros, 'Nro. habitación') == [202, 202, 102, 102, 102, 102, 201, 201, 203]
+    assert _habitaciones(consumos, 'habitacion') == [202, 102]
+    with open(pasajeros, encoding='utf-8', newline='') as f:
+        assert next(csv.DictReader(f))['Observaciones'] == 'Cambio desde Hab 101. Motivo: Pérdida de agua'
+
+
+def test_falla_al_escribir_consumos_deja_pasajeros_como_estaban(hotel, monkeypatch):
+    pasajeros, consumos = hotel
+    guardar_csv = reubicacion.guardar_csv
+
+    def guardar_fallando(df, archivo):
+        if os.path.abspath(archivo) == os.path.abspath(consumos):
+            raise OSError('disco lleno')
+        guardar_csv(df, archivo)
+
+    monkeypatch.setattr(reubicacion, 'guardar_csv', guardar_fallando)
+    antes_pasajeros = _habitaciones(pasajeros, 'Nro. habitación')
+    antes_consumos = _habitaciones(consumos, 'habitacion')
+
+    exito, mensaje = reubicacion.aplicar({101: 202, 103: 201}, archivo_pasajeros=pasajeros,
+                                         archivo_consumos=consumos)
+    assert not exito
+    assert 'disco lleno' in mensaje
+    assert _habitaciones(pasajeros, 'Nro. habitación') == antes_pasajeros
+    assert _habitaciones(consumos, 'habitacion') == antes_consumos
+    with open(pasajeros, encoding='utf-8', newline='') as f:
+        assert all(not fila['Observaciones'] for fila in csv.DictReader(f))
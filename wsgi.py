@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada WSGI para producción (modo recepción).
+
+A diferencia de `python app.py` (servidor de desarrollo con debug y
+recargador), este módulo sirve la aplicación con varios hilos y sin debug,
+para que las terminales de recepción no queden en cola detrás de una sola.
+
+Uso:
+    python3 wsgi.py                                 # waitress, multi-hilo
+    gunicorn -c gunicorn.conf.py wsgi:application   # multi-proceso (opcional)
+
+Configuración por variables de entorno:
+    HOTEL_HOST      (por defecto 0.0.0.0)
+    HOTEL_PUERTO    (por defecto 5000)
+    HOTEL_HILOS     (por defecto 8)
+
+Todo funciona sin conexión a internet: waitress y gunicorn son paquetes
+Python puros que quedan instalados en el .venv.
+"""
+
+import os
+import sys
+
+# Los directorios de datos de config/inventario.json ('data', ...) son relativos al proyecto
+DIR_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+os.chdir(DIR_PROYECTO)
+if DIR_PROYECTO not in sys.path:
+    sys.path.insert(0, DIR_PROYECTO)
+
+from app import app
+
+app.debug = False
+application = app
+
+
+def main():
+    host = os.environ.get('HOTEL_HOST', '0.0.0.0')
+    puerto = int(os.environ.get('HOTEL_PUERTO', '5000'))
+    hilos = int(os.environ.get('HOTEL_HILOS', '8'))
+
+    try:
+        from waitress import serve
+    except ImportError:
+        # Sin waitress: servidor de werkzeug en modo multi-hilo (sin debug)
+        from werkzeug.serving import run_simple
+        print('⚠️  waitress no está instalado, usando servidor multi-hilo de werkzeug')
+        run_simple(host, puerto, application, threaded=True, use_reloader=False, use_debugger=False)
+        return
+
+    print(f'🚀 Servidor de producción en http://{host}:{puerto} ({hilos} hilos)')
+    serve(application, host=host, port=puerto, threads=hilos)
+
+
+if __name__ == '__main__':
+    main()